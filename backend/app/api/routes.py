@@ -1,12 +1,14 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 import asyncio
 import logging
 from urllib.parse import urlparse
 
-from app.schemas.article import Article, ArticleCreate, AIAnalysis, MetricPoint, SourceRef, DeepSeekEvaluation
+from app.schemas.article import Article, ArticleCreate, AIAnalysis, MetricPoint, SourceRef, DeepSeekEvaluation, RelatedArticle
+from app.schemas.watchlist import Notification, WatchlistRule, WatchlistRuleCreate
 from app.services.fetcher_base import BaseFetcher
 from app.services.hn_fetcher import HackerNewsFetcher
 from app.services.ph_fetcher import ProductHuntFetcher
@@ -14,9 +16,16 @@ from app.services.betalist_fetcher import BetaListFetcher
 from app.services.hf_fetcher import HuggingFaceFetcher
 from app.services.analyzer import LLMAnalyzer
 from app.services.deepseek import DeepSeekEvaluator
-from app.services.utils import normalize_url
-from app.db.database import get_db, engine, Base
-from app.db.models import ArticleModel, ArticleMetricModel, ArticleEvaluationModel
+from app.services.feed_serializer import fetch_article_payloads, json_response
+from app.services.resilience import breakers
+from app.services.triage import Triage
+from app.services import ingestion
+from app.services.changes import broker, current_change_seq, event_stream, mark_changed
+from app.services.embeddings import EmbeddingIndex, article_text, embed_texts
+from app.services.exporter import FORMATS as EXPORT_FORMATS, ExportError, check_format, resolve_window, stream_export
+from app.services.watchlist import watchlists
+from app.db.database import get_db, get_read_db, stick_to_primary, engine, Base, SessionLocal, ReadSessionLocal
+from app.db.models import ArticleModel, ArticleEvaluationModel, NotificationModel, WatchlistRuleModel
 
 # Create tables on startup
 Base.metadata.create_all(bind=engine)
@@ -35,116 +44,112 @@ FETCHERS: List[BaseFetcher] = [
 ]
 
 analyzer = LLMAnalyzer()
+triage = Triage()
+embedding_index = EmbeddingIndex()
 deepseek_evaluator = DeepSeekEvaluator()
 
 async def ingest_all_sources(limit: int, db: Session) -> List[Article]:
-    # 1. Parallel Fetching from all sources
-    fetch_tasks = [f.fetch_latest(limit=limit) for f in FETCHERS]
-    results = await asyncio.gather(*fetch_tasks, return_exceptions=True)
-    
-    all_raw_articles = []
-    for res in results:
-        if isinstance(res, list):
-            all_raw_articles.extend(res)
-        else:
-            logger.error(f"Fetcher error during ingestion: {res}")
-    
-    # Normalize URLs for cross-platform dedupe
-    for raw in all_raw_articles:
-        raw.url = normalize_url(raw.url)
-        raw.sources = [SourceRef(source=raw.source, source_id=raw.source_id)]
-    
-    incoming_urls = [raw.url for raw in all_raw_articles]
-    existing_articles = db.query(ArticleModel).filter(ArticleModel.url.in_(incoming_urls)).all()
-    existing_map = {article.url: article for article in existing_articles}
-    
-    processed_articles: List[Article] = []
-    
-    for raw in all_raw_articles:
-        # Check if exists (by normalized URL)
-        db_article = existing_map.get(raw.url)
-        source_entry = {"source": raw.source, "source_id": raw.source_id}
-        
-        if db_article:
-            # --- UPDATE EXISTING ---
-            db_article.last_seen_at = datetime.utcnow()
-            db_article.seen_count += 1
-            
-            # Merge sources list
-            existing_sources = db_article.sources or []
-            if source_entry not in existing_sources:
-                existing_sources.append(source_entry)
-            db_article.sources = existing_sources
-
-            # Add metric point
-            metric = ArticleMetricModel(
-                article=db_article,
-                metric_value=raw.current_metric_value,
-                rank=raw.current_rank
-            )
-            db.add(metric)
-            db.commit()
-            db.refresh(db_article)
-            processed_articles.append(_db_to_schema(db_article))
-            
-        else:
-            # --- CREATE NEW ---
-            # Analyze first
-            try:
-                analysis = await analyzer.analyze(raw)
-            except Exception as e:
-                logger.error(f"Analysis failed for {raw.url}: {e}")
-                continue
-            
-            db_article = ArticleModel(
-                title=raw.title,
-                url=raw.url,
-                source=raw.source,
-                source_id=raw.source_id,
-                publish_date=raw.publish_date,
-                first_seen_at=datetime.utcnow(),
-                last_seen_at=datetime.utcnow(),
-                seen_count=1,
-                analyzed_at=datetime.utcnow(),
-                analysis_summary=analysis.summary,
-                analysis_category=analysis.category,
-                analysis_score=analysis.score,
-                analysis_reasoning=analysis.reasoning,
-                analysis_tags=analysis.tags,
-                sources=[source_entry],
-            )
-            db.add(db_article)
-            db.flush() # Get ID
-            
-            # Update map to handle duplicate URLs within the same batch (e.g. same link on HN and PH)
-            existing_map[raw.url] = db_article
-            
-            # Add first metric point
-            metric = ArticleMetricModel(
-                article_id=db_article.id,
-                metric_value=raw.current_metric_value,
-                rank=raw.current_rank
-            )
-            db.add(metric)
-            db.commit()
-            db.refresh(db_article)
-            processed_articles.append(_db_to_schema(db_article))
-        
-    return processed_articles
+    # Streaming pipeline: items from fast sources are persisted while slow ones are still fetching
+    return await ingestion.ingest(
+        db, FETCHERS, limit, analyzer=analyzer, triage=triage, embedding_index=embedding_index,
+        watchlist=watchlists,
+    )
 
 @router.post("/ingest", response_model=List[Article])
-async def trigger_ingestion(limit: int = 20, db: Session = Depends(get_db)):
+async def trigger_ingestion(response: Response, limit: int = 20, db: Session = Depends(get_db)):
+    stick_to_primary(response)
     return await ingest_all_sources(limit=limit, db=db)
 
+@router.get("/ingest/pipeline")
+async def get_ingest_pipeline():
+    """Per-stage queue depth and counters of the current (or last) ingest run in this process."""
+    return ingestion.snapshot()
+
 @router.get("/feed", response_model=List[Article])
-async def get_feed(db: Session = Depends(get_db)):
+async def get_feed(request: Request, db: Session = Depends(get_read_db)):
     # Get all articles, sorted by last_seen desc (freshness) and score
     # For MVP, just simple sort by analysis score
-    articles = db.query(ArticleModel).order_by(ArticleModel.analysis_score.desc()).all()
-    return [_db_to_schema(a) for a in articles]
+    # Fast path: plain rows -> dicts -> orjson, skipping per-row Pydantic validation.
+    # Output matches List[Article]; response_model is kept for the OpenAPI schema.
+    # Read the cursor first: anything committed meanwhile is re-sent by the next delta
+    cursor = current_change_seq(db)
+    payload = fetch_article_payloads(db, order_by=ArticleModel.analysis_score.desc())
+    return json_response(payload, request.headers.get("accept-encoding"), headers={"X-Change-Cursor": str(cursor)})
+
+@router.get("/feed/delta")
+async def get_feed_delta(request: Request, since: int = 0, db: Session = Depends(get_read_db)):
+    """Articles whose metrics, analysis or evaluations changed after change cursor `since`.
+
+    Returns `{"cursor": <new cursor>, "articles": [Article, ...]}`; pass `cursor` as
+    `since` on the next call.
+    """
+    cursor = current_change_seq(db)
+    payload = fetch_article_payloads(db, ArticleModel.change_seq > since, ArticleModel.change_seq <= cursor)
+    return json_response({"cursor": max(cursor, since), "articles": payload}, request.headers.get("accept-encoding"))
+
+@router.get("/feed/stream")
+async def stream_feed_changes(request: Request, since: int = 0):
+    """Server-sent events: a `change` event carrying the new cursor whenever the feed changes."""
+    def read_cursor() -> int:
+        db = ReadSessionLocal()
+        try:
+            return current_change_seq(db)
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        event_stream(since, read_cursor, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/articles/{article_id}", response_model=Article)
+async def get_article(article_id: int, request: Request, db: Session = Depends(get_read_db)):
+    payload = fetch_article_payloads(db, ArticleModel.id == article_id)
+    if not payload:
+        raise HTTPException(status_code=404, detail="Article not found")
+    return json_response(payload[0], request.headers.get("accept-encoding"))
+
+@router.get("/articles/{article_id}/related", response_model=List[RelatedArticle])
+async def get_related_articles(article_id: int, k: int = 10, db: Session = Depends(get_read_db)):
+    """Nearest articles by local text embedding (title, summary, reasoning)."""
+    row = (
+        db.query(ArticleModel.title, ArticleModel.analysis_summary, ArticleModel.analysis_reasoning)
+        .filter(ArticleModel.id == article_id)
+        .first()
+    )
+    if not row:
+        raise HTTPException(status_code=404, detail="Article not found")
+
+    vector = embedding_index.vector(article_id)
+    if vector is None:
+        # Not indexed yet (e.g. index rebuilt elsewhere): embed on the fly
+        vector = embed_texts([article_text(*row)])[0]
+    # NumPy scoring (and, if the IVF cells are stale, k-means) must not block the event loop
+    hits = await asyncio.to_thread(embedding_index.search, vector, k=max(1, min(k, 100)), exclude=[article_id])
+
+    found = {
+        r.id: r
+        for r in db.query(
+            ArticleModel.id, ArticleModel.title, ArticleModel.url,
+            ArticleModel.analysis_category, ArticleModel.analysis_score,
+        ).filter(ArticleModel.id.in_([hit_id for hit_id, _ in hits]))
+    }
+    return [
+        RelatedArticle(
+            id=hit_id,
+            title=found[hit_id].title,
+            url=found[hit_id].url,
+            category=found[hit_id].analysis_category,
+            score=found[hit_id].analysis_score,
+            similarity=round(similarity, 4),
+        )
+        for hit_id, similarity in hits
+        if hit_id in found
+    ]
 
 @router.post("/articles/{article_id}/evaluate", response_model=DeepSeekEvaluation)
-async def evaluate_article(article_id: int, db: Session = Depends(get_db)):
+async def evaluate_article(article_id: int, response: Response, db: Session = Depends(get_db)):
     article = db.query(ArticleModel).filter(ArticleModel.id == article_id).first()
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
@@ -164,13 +169,16 @@ async def evaluate_article(article_id: int, db: Session = Depends(get_db)):
         content=content_json,
     )
     db.add(db_eval)
+    mark_changed(db, article)
     db.commit()
     db.refresh(db_eval)
+    broker.publish(current_change_seq(db), [article.id])
+    stick_to_primary(response)
 
     return _eval_to_schema(db_eval)
 
 @router.post("/articles/{article_id}/evaluate/full", response_model=DeepSeekEvaluation)
-async def evaluate_article_full(article_id: int, db: Session = Depends(get_db)):
+async def evaluate_article_full(article_id: int, response: Response, db: Session = Depends(get_db)):
     article = db.query(ArticleModel).filter(ArticleModel.id == article_id).first()
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
@@ -189,11 +197,106 @@ async def evaluate_article_full(article_id: int, db: Session = Depends(get_db)):
         full_evaluation=evaluation.full_evaluation,
     )
     db.add(db_eval)
+    mark_changed(db, article)
     db.commit()
     db.refresh(db_eval)
+    broker.publish(current_change_seq(db), [article.id])
+    stick_to_primary(response)
 
     return _eval_to_schema(db_eval)
 
+@router.get("/export/{dataset}")
+def export_dataset(
+    dataset: str,
+    format: str = "ndjson",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    since_last: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """Stream `articles`, `metrics`, `evaluations` or `sources` as NDJSON/CSV/Parquet.
+
+    `since_last=<name>` continues from the previous complete export with that name
+    (for `articles`, by change cursor: every article changed since then);
+    `X-Export-Until` is the exclusive upper bound to pass as `since` next time.
+    """
+    try:
+        check_format(format)
+        since, until = resolve_window(db, dataset, since, until, since_last)
+    except ExportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    headers = {
+        "Content-Disposition": f'attachment; filename="{dataset}.{format}"',
+        "X-Export-Until": until.isoformat(),
+    }
+    if since is not None:
+        headers["X-Export-Since"] = since.isoformat()
+    return StreamingResponse(
+        stream_export(SessionLocal, dataset, format, since, until, since_last),
+        media_type=EXPORT_FORMATS[format],
+        headers=headers,
+    )
+
+@router.get("/watchlists", response_model=List[WatchlistRule])
+def list_watchlists(db: Session = Depends(get_db)):
+    return db.query(WatchlistRuleModel).order_by(WatchlistRuleModel.id).all()
+
+@router.post("/watchlists", response_model=WatchlistRule, status_code=201)
+def create_watchlist(rule: WatchlistRuleCreate, db: Session = Depends(get_db)):
+    """Save an alert rule; it is checked against every article written by later ingests."""
+    db_rule = WatchlistRuleModel(**rule.model_dump())
+    db.add(db_rule)
+    db.commit()
+    db.refresh(db_rule)
+    watchlists.invalidate()
+    return db_rule
+
+@router.put("/watchlists/{rule_id}", response_model=WatchlistRule)
+def update_watchlist(rule_id: int, rule: WatchlistRuleCreate, db: Session = Depends(get_db)):
+    db_rule = db.get(WatchlistRuleModel, rule_id)
+    if not db_rule:
+        raise HTTPException(status_code=404, detail="Watchlist rule not found")
+    for key, value in rule.model_dump().items():
+        setattr(db_rule, key, value)
+    db.commit()
+    db.refresh(db_rule)
+    watchlists.invalidate()
+    return db_rule
+
+@router.delete("/watchlists/{rule_id}", status_code=204)
+def delete_watchlist(rule_id: int, db: Session = Depends(get_db)):
+    db_rule = db.get(WatchlistRuleModel, rule_id)
+    if not db_rule:
+        raise HTTPException(status_code=404, detail="Watchlist rule not found")
+    db.delete(db_rule)
+    db.commit()
+    watchlists.invalidate()
+    return Response(status_code=204)
+
+@router.get("/notifications", response_model=List[Notification])
+def list_notifications(rule_id: Optional[int] = None, limit: int = 50, db: Session = Depends(get_read_db)):
+    """Most recent watchlist matches, newest first."""
+    query = (
+        db.query(
+            NotificationModel.id, NotificationModel.rule_id, WatchlistRuleModel.name.label("rule_name"),
+            NotificationModel.article_id, ArticleModel.title.label("article_title"),
+            ArticleModel.url.label("article_url"), NotificationModel.created_at, NotificationModel.delivered_at,
+            NotificationModel.attempts, NotificationModel.last_error,
+        )
+        .join(WatchlistRuleModel, WatchlistRuleModel.id == NotificationModel.rule_id)
+        .join(ArticleModel, ArticleModel.id == NotificationModel.article_id)
+    )
+    if rule_id is not None:
+        query = query.filter(NotificationModel.rule_id == rule_id)
+    rows = query.order_by(NotificationModel.id.desc()).limit(max(1, min(limit, 500))).all()
+    return [Notification(**row._asdict()) for row in rows]
+
+@router.get("/resilience/breakers")
+async def get_circuit_breakers():
+    """Per-host circuit breaker state for outbound calls (this process only)."""
+    return breakers.snapshot()
+
 def _db_to_schema(db_item: ArticleModel) -> Article:
     """Helper to convert DB model to Pydantic schema"""
     analysis = None
@@ -208,7 +311,9 @@ def _db_to_schema(db_item: ArticleModel) -> Article:
     
     # Sort history by date desc
     history = sorted(db_item.metrics_history, key=lambda x: x.recorded_at, reverse=True)
-    sources_list = db_item.sources or [{"source": db_item.source, "source_id": db_item.source_id}]
+    sources_list = [
+        SourceRef(source=s.source, source_id=s.source_id) for s in db_item.source_entries
+    ] or [SourceRef(source=db_item.source, source_id=db_item.source_id)]
     
     return Article(
         id=db_item.id,
@@ -220,8 +325,9 @@ def _db_to_schema(db_item: ArticleModel) -> Article:
         first_seen_at=db_item.first_seen_at,
         last_seen_at=db_item.last_seen_at,
         seen_count=db_item.seen_count,
-        sources=[SourceRef(**s) for s in sources_list],
-        platforms_count=len(sources_list),
+        sources=sources_list,
+        platforms_count=db_item.platforms_count or len(sources_list),
+        heat_score=db_item.heat_score,
         analyzed_at=db_item.analyzed_at,
         analysis=analysis,
         metrics_history=[
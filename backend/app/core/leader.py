@@ -0,0 +1,84 @@
+import logging
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderElector:
+    """Cluster-wide leader election on a Postgres session-level advisory lock.
+
+    Every process (uvicorn worker or replica) calls `try_acquire()` periodically.
+    The first one to take `pg_try_advisory_lock(key)` keeps it on a dedicated
+    connection and is the leader; when that process dies its connection drops,
+    Postgres releases the lock, and the next `try_acquire()` elsewhere wins.
+
+    Non-Postgres databases (e.g. SQLite in tests) have no advisory locks and are
+    assumed to run a single process, so the elector always reports leadership.
+    """
+
+    def __init__(self, engine: Engine, lock_key: int):
+        self.engine = engine
+        self.lock_key = lock_key
+        self._conn: Optional[Connection] = None
+        self._is_leader = False
+        self._supported = engine.dialect.name == "postgresql"
+
+    @property
+    def is_leader(self) -> bool:
+        return self._is_leader if self._supported else True
+
+    def try_acquire(self) -> bool:
+        """Acquire leadership if free, or confirm we still hold it. Safe to call often."""
+        if not self._supported:
+            return True
+
+        try:
+            if self._is_leader:
+                # Lock lives as long as the session; a dead connection means we lost it.
+                self._conn.execute(text("SELECT 1"))
+                # End the autobegun transaction, or the session sits "idle in transaction"
+                # (and idle_in_transaction_session_timeout would drop the lock)
+                self._conn.rollback()
+                return True
+
+            if self._conn is None:
+                self._conn = self.engine.connect()
+            acquired = self._conn.execute(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": self.lock_key}
+            ).scalar()
+            # Leave no transaction open on the long-lived connection
+            self._conn.commit()
+        except Exception as e:
+            if self._is_leader:
+                logger.error("Lost scheduler leadership (lock_key=%s): %r", self.lock_key, e)
+            else:
+                logger.warning("Leader election attempt failed (lock_key=%s): %r", self.lock_key, e)
+            self._reset()
+            return False
+
+        if acquired:
+            logger.info("Acquired scheduler leadership (lock_key=%s)", self.lock_key)
+        self._is_leader = bool(acquired)
+        return self._is_leader
+
+    def release(self) -> None:
+        if self._conn is not None and self._is_leader:
+            try:
+                self._conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.lock_key})
+                self._conn.commit()
+                logger.info("Released scheduler leadership (lock_key=%s)", self.lock_key)
+            except Exception as e:
+                logger.warning("Failed to release advisory lock (lock_key=%s): %r", self.lock_key, e)
+        self._reset()
+
+    def _reset(self) -> None:
+        self._is_leader = False
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
@@ -1,14 +1,36 @@
+import asyncio
+import logging
+from datetime import datetime
+
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 from sqlalchemy.orm import Session
 
 from app.api.routes import ingest_all_sources
-from app.db.database import SessionLocal
+from app.core.config import settings
+from app.core.leader import LeaderElector
+from app.db.database import SessionLocal, engine
+from app.services.changes import current_change_seq
+from app.services.heat import refresh_heat
+from app.services.watchlist import deliver_pending, watchlists
+
+logger = logging.getLogger(__name__)
 
 scheduler = AsyncIOScheduler()
+# 每个 worker / 副本都运行调度器，但只有持有 advisory lock 的 leader 执行定时任务
+leader = LeaderElector(engine, settings.SCHEDULER_LOCK_KEY)
+
+
+async def _run_election():
+    await asyncio.to_thread(leader.try_acquire)
 
 
 async def _run_ingestion_job():
+    if not leader.is_leader:
+        logger.info("Skipping daily_ingest: this process is not the scheduler leader")
+        return
+
     db: Session = SessionLocal()
     try:
         await ingest_all_sources(limit=20, db=db)
@@ -16,12 +38,69 @@ async def _run_ingestion_job():
         db.close()
 
 
+def _refresh_heat_once():
+    db: Session = SessionLocal()
+    try:
+        before = current_change_seq(db)
+        refresh_heat(db)
+        # heat_score 刚更新：min_heat 规则在入库时通常还匹配不到，这里补上
+        watchlists.record_heat_matches(db, before)
+    finally:
+        db.close()
+
+
+async def _run_heat_job():
+    if not leader.is_leader:
+        return
+    try:
+        await asyncio.to_thread(_refresh_heat_once)
+    except Exception as e:
+        logger.error("heat_refresh failed: %r", e)
+
+
+async def _run_watchlist_delivery():
+    if not leader.is_leader:
+        return
+    db: Session = SessionLocal()
+    try:
+        await deliver_pending(db)
+    except Exception as e:
+        db.rollback()
+        logger.error("watchlist_delivery failed: %r", e)
+    finally:
+        db.close()
+
+
 def start_scheduler():
+    # 周期性竞选 leader；leader 宕机后连接断开、锁释放，其他进程在下一轮接管
+    scheduler.add_job(
+        _run_election,
+        IntervalTrigger(seconds=settings.SCHEDULER_ELECTION_INTERVAL_SECONDS),
+        id="leader_election",
+        next_run_time=datetime.now(),
+        replace_existing=True,
+    )
     # 每天 10:00 am 自动抓取/分析
     scheduler.add_job(_run_ingestion_job, CronTrigger(hour=10, minute=0), id="daily_ingest", replace_existing=True)
+    # 定期把各平台指标归一化为可比较的热度
+    scheduler.add_job(
+        _run_heat_job,
+        IntervalTrigger(minutes=settings.HEAT_REFRESH_MINUTES),
+        id="heat_refresh",
+        replace_existing=True,
+    )
+    # 告警 webhook 在入库流程之外投递，慢的 webhook 不会拖住 ingestion
+    scheduler.add_job(
+        _run_watchlist_delivery,
+        IntervalTrigger(seconds=settings.WATCHLIST_DELIVERY_SECONDS),
+        id="watchlist_delivery",
+        max_instances=1,
+        replace_existing=True,
+    )
     scheduler.start()
 
 
 def stop_scheduler():
     if scheduler.running:
         scheduler.shutdown()
+    leader.release()
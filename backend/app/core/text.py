@@ -0,0 +1,16 @@
+"""Word tokenizer shared by watchlist matching and rule validation."""
+import re
+from typing import List, Optional
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+# Keyword characters the tokenizer would silently drop (CJK, "+", "#", ...), besides separators
+_UNMATCHABLE_RE = re.compile(r"[^a-z0-9\s\-_./'&,:]", re.IGNORECASE)
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def matchable_keyword(keyword: str) -> bool:
+    """Whether `keyword` survives tokenization as written ("C++" would shrink to "c", "智能体" to nothing)."""
+    return bool(tokenize(keyword)) and _UNMATCHABLE_RE.search(keyword) is None
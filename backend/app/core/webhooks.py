@@ -0,0 +1,32 @@
+"""Which outbound webhook URLs watchlist matches may be POSTed to."""
+from typing import Optional
+from urllib.parse import urlsplit
+
+from app.core.config import settings
+
+WEBHOOK_SCHEMES = ("http", "https")
+
+
+def webhook_host(url: str) -> Optional[str]:
+    """Lower-cased host of an http(s) URL, or None for anything else."""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return None
+    if parts.scheme.lower() not in WEBHOOK_SCHEMES or not parts.hostname:
+        return None
+    return parts.hostname.lower()
+
+
+def webhook_allowed(url: Optional[str]) -> bool:
+    """Only `WATCHLIST_WEBHOOK_URL` itself or http(s) URLs on `WATCHLIST_WEBHOOK_ALLOWED_HOSTS`.
+
+    Rules are editable through the API, so the server must not POST to wherever
+    a rule points (internal services, cloud metadata endpoints, ...).
+    """
+    if not url:
+        return False
+    if settings.WATCHLIST_WEBHOOK_URL and url == settings.WATCHLIST_WEBHOOK_URL:
+        return True
+    host = webhook_host(url)
+    return host is not None and host in {h.strip().lower() for h in settings.WATCHLIST_WEBHOOK_ALLOWED_HOSTS}
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, ForeignKey, Float
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Text, JSON, ForeignKey, Float, Boolean, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.database import Base
@@ -18,8 +18,10 @@ class ArticleModel(Base):
     last_seen_at = Column(DateTime, default=datetime.utcnow)
     seen_count = Column(Integer, default=1)
 
-    # List of sources where this item appeared (to aggregate duplicates across platforms)
-    sources = Column(JSON, default=list)
+    # Number of distinct platform listings in article_sources, kept in step by ingestion
+    platforms_count = Column(Integer, default=1, nullable=False)
+    # Cross-source normalized popularity, 0-100 (app/services/heat.py); NULL without recent metrics
+    heat_score = Column(Float, nullable=True)
     
     # AI Analysis (Static snapshot, or could be updated)
     analyzed_at = Column(DateTime, nullable=True)
@@ -28,14 +30,51 @@ class ArticleModel(Base):
     analysis_score = Column(Integer, nullable=True)
     analysis_reasoning = Column(Text, nullable=True)
     analysis_tags = Column(JSON, nullable=True)
+    # Which analyzer produced the fields above ("local-triage" marks a provisional pre-score)
+    analysis_model = Column(String, nullable=True)
+    # LLMAnalyzer.PROMPT_VERSION used for the analysis (NULL for provisional pre-scores)
+    analysis_prompt_version = Column(String, nullable=True)
+
+    # Stamped on every change visible in the feed (metrics, analysis, evaluations); see app/services/changes.py
+    change_seq = Column(BigInteger, nullable=True, index=True)
 
     # Relationship to metrics history
     metrics_history = relationship("ArticleMetricModel", back_populates="article", cascade="all, delete-orphan")
     # Relationship to DeepSeek evaluations (multiple versions)
     evaluations = relationship("ArticleEvaluationModel", back_populates="article", cascade="all, delete-orphan")
+    # Platforms this item appeared on (to aggregate duplicates across platforms), first seen first
+    source_entries = relationship(
+        "ArticleSourceModel",
+        back_populates="article",
+        cascade="all, delete-orphan",
+        order_by="(ArticleSourceModel.first_seen, ArticleSourceModel.id)",
+    )
+
+class ArticleSourceModel(Base):
+    __tablename__ = "article_sources"
+    __table_args__ = (
+        UniqueConstraint("article_id", "source", "source_id", name="uq_article_sources_article_source"),
+        # "which article is HN item 123", "everything seen on Product Hunt"
+        Index("ix_article_sources_source_source_id", "source", "source_id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    article_id = Column(Integer, ForeignKey("articles.id", ondelete="CASCADE"), nullable=False)
+    source = Column(String, nullable=False)
+    source_id = Column(String, nullable=False)
+    first_seen = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_seen = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Latest metric reported by this platform (votes, score, likes)
+    last_metric = Column(Integer, nullable=True)
+
+    article = relationship("ArticleModel", back_populates="source_entries")
 
 class ArticleMetricModel(Base):
     __tablename__ = "article_metrics"
+    __table_args__ = (
+        # Heat job: one source's points inside the window
+        Index("idx_article_metrics_source_recorded_at", "source", "recorded_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     article_id = Column(Integer, ForeignKey("articles.id"))
@@ -48,6 +87,8 @@ class ArticleMetricModel(Base):
     
     # Rank in the feed (optional, good for trend analysis)
     rank = Column(Integer, nullable=True)
+    # Platform that reported this point (an article merged across platforms gets points from each)
+    source = Column(String, nullable=True)
     
     article = relationship("ArticleModel", back_populates="metrics_history")
 
@@ -65,3 +106,50 @@ class ArticleEvaluationModel(Base):
     full_evaluation = Column(Text, nullable=True)
 
     article = relationship("ArticleModel", back_populates="evaluations")
+
+class ExportCursorModel(Base):
+    __tablename__ = "export_cursors"
+
+    # Named incremental export ("since last export") per dataset
+    name = Column(String, primary_key=True)
+    dataset = Column(String, primary_key=True)
+    last_until = Column(DateTime, nullable=False)
+    # Change cursor reached, for datasets exported by change stamp (articles)
+    last_change_seq = Column(BigInteger, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+class WatchlistRuleModel(Base):
+    __tablename__ = "watchlist_rules"
+
+    # Saved alert; every non-empty condition must hold (see app/services/watchlist.py)
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    categories = Column(JSON, nullable=False, default=list)  # any of
+    tags = Column(JSON, nullable=False, default=list)  # any of
+    sources = Column(JSON, nullable=False, default=list)  # listed on any of
+    keywords = Column(JSON, nullable=False, default=list)  # any of, whole words in title/summary
+    min_score = Column(Integer, nullable=True)
+    min_platforms = Column(Integer, nullable=True)
+    min_heat = Column(Float, nullable=True)
+    # Overrides WATCHLIST_WEBHOOK_URL for this rule
+    webhook_url = Column(String, nullable=True)
+    enabled = Column(Boolean, default=True, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class NotificationModel(Base):
+    __tablename__ = "notifications"
+    __table_args__ = (
+        # An article triggers each rule once, however often it is seen again
+        UniqueConstraint("rule_id", "article_id", name="uq_notifications_rule_article"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    rule_id = Column(Integer, ForeignKey("watchlist_rules.id", ondelete="CASCADE"), nullable=False)
+    article_id = Column(Integer, ForeignKey("articles.id", ondelete="CASCADE"), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    # Destination resolved at match time; NULL = stored only
+    webhook_url = Column(String, nullable=True)
+    delivered_at = Column(DateTime, nullable=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(Text, nullable=True)
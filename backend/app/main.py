@@ -3,7 +3,7 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
 from app.api.routes import router as api_router
-from app.core.scheduler import start_scheduler, stop_scheduler
+from app.core.scheduler import start_scheduler, stop_scheduler, leader
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -17,6 +17,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Change-Cursor", "X-Export-Until", "X-Export-Since", "X-Read-Primary-Until"],
 )
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
@@ -35,4 +36,4 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "ok", "version": settings.VERSION}
+    return {"status": "ok", "version": settings.VERSION, "scheduler_leader": leader.is_leader}
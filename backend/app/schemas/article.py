@@ -43,12 +43,22 @@ class DeepSeekEvaluation(BaseModel):
     created_at: datetime
     full_evaluation: str | None = None
 
+class RelatedArticle(BaseModel):
+    id: int
+    title: str
+    url: str
+    category: Optional[str] = None
+    score: Optional[int] = None
+    similarity: float
+
 class Article(ArticleBase):
     id: int
     first_seen_at: datetime
     last_seen_at: datetime
     seen_count: int
     platforms_count: int = 1
+    # Popularity normalized across sources, 0-100 (None until the heat job has seen recent metrics)
+    heat_score: Optional[float] = None
     
     analyzed_at: Optional[datetime] = None
     analysis: Optional[AIAnalysis] = None
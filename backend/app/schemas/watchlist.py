@@ -0,0 +1,77 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from app.core.text import matchable_keyword
+from app.core.webhooks import webhook_allowed, webhook_host
+
+
+class WatchlistRuleBase(BaseModel):
+    """All non-empty conditions must hold; list conditions match if any entry does."""
+
+    name: str
+    categories: List[str] = []
+    tags: List[str] = []
+    sources: List[str] = []
+    # Whole words or phrases, matched case-insensitively in title and summary
+    keywords: List[str] = []
+    min_score: Optional[int] = Field(default=None, ge=0, le=100)
+    min_platforms: Optional[int] = Field(default=None, ge=1)
+    min_heat: Optional[float] = Field(default=None, ge=0, le=100)
+    webhook_url: Optional[str] = None
+    enabled: bool = True
+
+    @field_validator("keywords")
+    @classmethod
+    def _matchable_keywords(cls, keywords: List[str]) -> List[str]:
+        bad = [k for k in keywords if not matchable_keyword(k)]
+        if bad:
+            raise ValueError(
+                f"keywords {bad} can't be matched: use letters a-z, digits, spaces and - _ . / ' & , :"
+            )
+        return keywords
+
+    @model_validator(mode="after")
+    def _has_condition(self):
+        if not any([self.categories, self.tags, self.sources, self.keywords]) and all(
+            v is None for v in (self.min_score, self.min_platforms, self.min_heat)
+        ):
+            raise ValueError("a watchlist rule needs at least one condition")
+        return self
+
+
+class WatchlistRuleCreate(WatchlistRuleBase):
+    @field_validator("webhook_url")
+    @classmethod
+    def _allowed_webhook(cls, url: Optional[str]) -> Optional[str]:
+        if not url:
+            return None
+        host = webhook_host(url)
+        if host is None:
+            raise ValueError("webhook_url must be an http:// or https:// URL")
+        if not webhook_allowed(url):
+            raise ValueError(f"webhook host {host!r} is not in WATCHLIST_WEBHOOK_ALLOWED_HOSTS")
+        return url
+
+
+class WatchlistRule(WatchlistRuleBase):
+    id: int
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class Notification(BaseModel):
+    id: int
+    rule_id: int
+    rule_name: str
+    article_id: int
+    article_title: str
+    article_url: str
+    created_at: datetime
+    delivered_at: Optional[datetime] = None
+    attempts: int = 0
+    last_error: Optional[str] = None
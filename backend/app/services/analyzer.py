@@ -1,24 +1,49 @@
 import os
 from typing import Optional
+from urllib.parse import urlparse
+from app.core.config import settings
 from app.schemas.article import ArticleCreate, AIAnalysis
+from app.services.resilience import breakers, CircuitOpenError
 from langchain_openai import ChatOpenAI
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 
+MOCK_MODEL = "mock"
+# Rows analyzed before analysis_model was stored are only recognisable by this
+MOCK_REASONING = "Automated mock scoring based on keywords."
+
 class LLMAnalyzer:
+    # Bump whenever the prompt below changes; stored with every analysis so
+    # stale rows can be found and re-analyzed (see app/services/backfill.py)
+    PROMPT_VERSION = "v1"
+
     def __init__(self):
         self.openai_key = os.getenv("OPENAI_API_KEY")
         self.google_key = os.getenv("GOOGLE_API_KEY")
+        # Any OpenAI-compatible endpoint (e.g. scripts/fake_upstreams.py for load tests)
+        self.openai_base_url = os.getenv("OPENAI_BASE_URL")
         
         self.llm = None
+        self.breaker = None
+        self.model_name = MOCK_MODEL
         
         if self.google_key:
              print("Using Google Gemini Pro")
-             self.llm = ChatGoogleGenerativeAI(model="gemini-pro", google_api_key=self.google_key, temperature=0)
+             self.llm = ChatGoogleGenerativeAI(
+                 model="gemini-pro", google_api_key=self.google_key, temperature=0,
+                 timeout=settings.LLM_TIMEOUT_SECONDS, max_retries=settings.LLM_MAX_RETRIES,
+             )
+             self.breaker = breakers.get("generativelanguage.googleapis.com")
+             self.model_name = "gemini-pro"
         elif self.openai_key:
             print("Using OpenAI GPT-3.5")
-            self.llm = ChatOpenAI(model="gpt-3.5-turbo", temperature=0, api_key=self.openai_key)
+            self.llm = ChatOpenAI(
+                model="gpt-3.5-turbo", temperature=0, api_key=self.openai_key, base_url=self.openai_base_url,
+                timeout=settings.LLM_TIMEOUT_SECONDS, max_retries=settings.LLM_MAX_RETRIES,
+            )
+            self.breaker = breakers.get(urlparse(self.openai_base_url).netloc.lower() if self.openai_base_url else "api.openai.com")
+            self.model_name = "gpt-3.5-turbo"
         
         if self.llm:
             self.parser = JsonOutputParser(pydantic_object=AIAnalysis)
@@ -28,9 +53,15 @@ class LLMAnalyzer:
             ])
             self.chain = self.prompt | self.llm | self.parser
 
-    async def analyze(self, article: ArticleCreate) -> AIAnalysis:
+    async def analyze(self, article: ArticleCreate, fallback: bool = True) -> AIAnalysis:
+        """Analyze via the LLM. With `fallback=False`, failures raise instead of returning mock output."""
         if not self.llm:
-            return self._mock_analysis(article)
+            return self.mock_analysis(article)
+        if not self.breaker.allow():
+            # Host known bad: fail fast instead of waiting out the timeout again
+            if not fallback:
+                raise CircuitOpenError(self.breaker.host, self.breaker.retry_in())
+            return self.mock_analysis(article)
 
         try:
             response = await self.chain.ainvoke({
@@ -38,12 +69,18 @@ class LLMAnalyzer:
                 "url": article.url,
                 "format_instructions": self.parser.get_format_instructions()
             })
-            return AIAnalysis(**response)
+            analysis = AIAnalysis(**response)
+            self.breaker.record_success()
+            return analysis
         except Exception as e:
+            # Bad JSON or a schema mismatch is the model's answer, not a host outage
+            self.breaker.record_error(e)
             print(f"Analysis failed for {article.title}: {e}")
-            return self._mock_analysis(article)
+            if not fallback:
+                raise
+            return self.mock_analysis(article)
 
-    def _mock_analysis(self, article: ArticleCreate) -> AIAnalysis:
+    def mock_analysis(self, article: ArticleCreate) -> AIAnalysis:
         """Fallback mock analysis for testing without API keys."""
         import random
         scores = [65, 72, 85, 91, 58]
@@ -53,6 +90,6 @@ class LLMAnalyzer:
             summary=f"Mock analysis for: {article.title}. A potential market disruptor in its field.",
             category=random.choice(categories),
             score=random.choice(scores),
-            reasoning="Automated mock scoring based on keywords.",
+            reasoning=MOCK_REASONING,
             tags=["Startup", "Tech", "MockData"]
         )
\ No newline at end of file
@@ -0,0 +1,323 @@
+"""Parallel, resumable re-analysis / re-evaluation of stored articles.
+
+Ingestion only analyzes brand-new items, so changing the analyzer prompt or
+model leaves existing `analysis_*` fields stale. This job selects articles by
+date, score, category or producing model/prompt, runs them through
+`LLMAnalyzer` (or `DeepSeekEvaluator`) concurrently under a rate limit, and
+writes results back in bulk, one batch per transaction.
+
+    cd backend
+    python -m app.services.backfill analyze --stale --concurrency 8 --rate 4
+    python -m app.services.backfill analyze --model local-triage --model mock
+    python -m app.services.backfill evaluate --category DevTool --min-score 80
+
+Progress is checkpointed after every batch (highest finished article id), so
+an interrupted run picks up where it stopped; pass `--restart` to start over.
+LLM failures are not replaced with mock output: those articles are left
+untouched and listed in the checkpoint.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import func, or_, update
+from sqlalchemy.orm import Session
+
+from app.db.models import ArticleModel, ArticleEvaluationModel
+from app.schemas.article import Article, ArticleCreate
+from app.services.analyzer import LLMAnalyzer, MOCK_MODEL
+from app.services.changes import next_change_seqs
+from app.services.deepseek import DeepSeekEvaluator
+from app.services.embeddings import EmbeddingIndex, index_articles
+from app.services.feed_serializer import fetch_article_payloads
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart across all concurrent workers."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+@dataclass
+class Checkpoint:
+    path: str
+    last_id: int = 0
+    done: int = 0
+    failed: List[int] = field(default_factory=list)
+    filters: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: str, filters: Dict[str, Any], restart: bool) -> "Checkpoint":
+        if restart or not os.path.exists(path):
+            return cls(path, filters=filters)
+        with open(path) as fh:
+            data = json.load(fh)
+        if data.get("filters") != filters:
+            raise SystemExit(f"Checkpoint {path} was written for different filters; use --restart or --checkpoint")
+        return cls(path, data["last_id"], data["done"], data["failed"], filters)
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as fh:
+            json.dump(
+                {"last_id": self.last_id, "done": self.done, "failed": self.failed,
+                 "filters": self.filters, "updated_at": datetime.utcnow().isoformat()},
+                fh,
+            )
+        os.replace(tmp, self.path)  # atomic: a crash never leaves a torn checkpoint
+
+
+# How a run proceeds, not which articles it covers: free to change between resumes
+# (`--limit` is this run's budget, so a resumed run may take a different slice)
+_RUN_OPTIONS = {"concurrency", "rate", "batch_size", "checkpoint", "restart", "allow_mock", "dry_run", "limit"}
+
+
+def checkpoint_filters(args: argparse.Namespace) -> Dict[str, Any]:
+    """The arguments that select articles; a checkpoint only resumes under the same ones."""
+    return {k: (v.isoformat() if isinstance(v, datetime) else v) for k, v in sorted(vars(args).items())
+            if k not in _RUN_OPTIONS}
+
+
+def build_filters(args: argparse.Namespace, analyzer_model: str) -> List[Any]:
+    criteria = []
+    if args.since:
+        criteria.append(ArticleModel.first_seen_at >= args.since)
+    if args.until:
+        criteria.append(ArticleModel.first_seen_at < args.until)
+    if args.min_score is not None:
+        criteria.append(ArticleModel.analysis_score >= args.min_score)
+    if args.max_score is not None:
+        criteria.append(ArticleModel.analysis_score <= args.max_score)
+    if args.category:
+        criteria.append(ArticleModel.analysis_category.in_(args.category))
+    if args.model:
+        criteria.append(ArticleModel.analysis_model.in_(args.model))
+    if args.prompt_version:
+        criteria.append(ArticleModel.analysis_prompt_version.in_(args.prompt_version))
+    if args.stale:
+        # Anything not produced by the current analyzer model + prompt
+        criteria.append(or_(
+            ArticleModel.analysis_model.is_(None),
+            ArticleModel.analysis_model != analyzer_model,
+            ArticleModel.analysis_prompt_version.is_(None),
+            ArticleModel.analysis_prompt_version != LLMAnalyzer.PROMPT_VERSION,
+        ))
+    return criteria
+
+
+async def _run_limited(items: Sequence[Any], worker, concurrency: int, limiter: RateLimiter) -> List[Any]:
+    """Apply async `worker` to every item; exceptions are returned in place of results."""
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(item):
+        async with sem:
+            await limiter.wait()
+            try:
+                return await worker(item)
+            except Exception as e:
+                return e
+
+    return await asyncio.gather(*(one(i) for i in items))
+
+
+async def analyze_batch(
+    db: Session, ids: List[int], analyzer: LLMAnalyzer, limiter: RateLimiter, concurrency: int,
+    index: Optional[EmbeddingIndex] = None,
+):
+    rows = (
+        db.query(ArticleModel.id, ArticleModel.title, ArticleModel.url, ArticleModel.source, ArticleModel.source_id)
+        .filter(ArticleModel.id.in_(ids))
+        .order_by(ArticleModel.id)
+        .all()
+    )
+    items = [ArticleCreate(title=r.title, url=r.url, source=r.source, source_id=r.source_id) for r in rows]
+    results = await _run_limited(items, lambda item: analyzer.analyze(item, fallback=False), concurrency, limiter)
+
+    ok = [(r, res) for r, res in zip(rows, results) if not isinstance(res, Exception)]
+    failed = [r.id for r, res in zip(rows, results) if isinstance(res, Exception)]
+    for r, res in zip(rows, results):
+        if isinstance(res, Exception):
+            logger.warning("Analysis failed for article %s: %r", r.id, res)
+
+    now = datetime.utcnow()
+    seqs = next_change_seqs(db, len(ok))
+    if ok:
+        # ORM bulk UPDATE by primary key: one executemany for the whole batch
+        db.execute(update(ArticleModel), [
+            {
+                "id": r.id,
+                "analyzed_at": now,
+                "analysis_summary": a.summary,
+                "analysis_category": a.category,
+                "analysis_score": a.score,
+                "analysis_reasoning": a.reasoning,
+                "analysis_tags": a.tags,
+                "analysis_model": analyzer.model_name,
+                "analysis_prompt_version": LLMAnalyzer.PROMPT_VERSION,
+                "change_seq": seq,
+            }
+            for (r, a), seq in zip(ok, seqs)
+        ])
+    db.commit()
+
+    if ok and index is not None:
+        try:
+            index_articles(index, [(r.id, r.title, a.summary, a.reasoning) for r, a in ok])
+        except Exception as e:
+            logger.error("Embedding index update failed: %r", e)
+    return len(ok), failed
+
+
+async def evaluate_batch(
+    db: Session, ids: List[int], evaluator: DeepSeekEvaluator, limiter: RateLimiter, concurrency: int, full: bool
+):
+    payloads = fetch_article_payloads(db, ArticleModel.id.in_(ids), order_by=ArticleModel.id)
+    articles = [Article.model_validate(p) for p in payloads]
+    versions = dict(
+        db.query(ArticleEvaluationModel.article_id, func.max(ArticleEvaluationModel.version))
+        .filter(ArticleEvaluationModel.article_id.in_(ids))
+        .group_by(ArticleEvaluationModel.article_id)
+        .all()
+    )
+
+    async def run(article: Article):
+        version = versions.get(article.id, 0) + 1
+        if full:
+            return await evaluator.evaluate_full(article, version, fallback=False)
+        return await evaluator.evaluate(article, version, fallback=False)
+
+    results = await _run_limited(articles, run, concurrency, limiter)
+    ok = [(a, ev) for a, ev in zip(articles, results) if not isinstance(ev, Exception)]
+    failed = [a.id for a, ev in zip(articles, results) if isinstance(ev, Exception)]
+    for a, ev in zip(articles, results):
+        if isinstance(ev, Exception):
+            logger.warning("Evaluation failed for article %s: %r", a.id, ev)
+
+    db.add_all([
+        ArticleEvaluationModel(
+            article_id=a.id,
+            version=ev.version,
+            model_name=ev.model,
+            overall_score=ev.overall_score,
+            content=ev.model_dump(mode="json"),
+            full_evaluation=ev.full_evaluation,
+        )
+        for a, ev in ok
+    ])
+    seqs = next_change_seqs(db, len(ok))
+    if ok:
+        db.execute(update(ArticleModel), [{"id": a.id, "change_seq": seq} for (a, _), seq in zip(ok, seqs)])
+    db.commit()
+    return len(ok), failed
+
+
+async def run_backfill(args: argparse.Namespace) -> None:
+    from app.db.database import SessionLocal
+
+    analyzer = LLMAnalyzer() if args.mode == "analyze" else None
+    evaluator = DeepSeekEvaluator() if args.mode == "evaluate" else None
+    if analyzer is not None and analyzer.model_name == MOCK_MODEL and not args.allow_mock:
+        raise SystemExit("No LLM configured (OPENAI_API_KEY / GOOGLE_API_KEY); refusing to overwrite analyses with mock output")
+    if evaluator is not None and evaluator.client is None and not args.allow_mock:
+        raise SystemExit("DEEPSEEK_API_KEY not set; refusing to store mock evaluations")
+
+    checkpoint_path = args.checkpoint or os.path.join("data", f"backfill_{args.mode}.json")
+    checkpoint = Checkpoint.load(checkpoint_path, checkpoint_filters(args), args.restart)
+
+    db = SessionLocal()
+    try:
+        criteria = build_filters(args, analyzer.model_name if analyzer else "")
+        ids = [
+            r[0] for r in db.query(ArticleModel.id)
+            .filter(*criteria, ArticleModel.id > checkpoint.last_id)
+            .order_by(ArticleModel.id)
+            .limit(args.limit)
+            .all()
+        ]
+        total = len(ids)
+        print(f"{args.mode}: {total} articles to process (resuming after id {checkpoint.last_id}, {checkpoint.done} done before)")
+        if args.dry_run or not ids:
+            return
+
+        limiter = RateLimiter(args.rate)
+        index = EmbeddingIndex() if analyzer is not None else None
+        started = time.monotonic()
+        processed = 0
+        for start in range(0, total, args.batch_size):
+            batch = ids[start:start + args.batch_size]
+            if analyzer is not None:
+                ok, failed = await analyze_batch(db, batch, analyzer, limiter, args.concurrency, index)
+            else:
+                ok, failed = await evaluate_batch(db, batch, evaluator, limiter, args.concurrency, args.full)
+
+            checkpoint.last_id = batch[-1]
+            checkpoint.done += ok
+            checkpoint.failed.extend(failed)
+            checkpoint.save()
+
+            processed += len(batch)
+            elapsed = time.monotonic() - started
+            rate = processed / elapsed if elapsed else 0.0
+            eta = (total - processed) / rate if rate else 0.0
+            print(
+                f"[{processed}/{total}] ok={ok} failed={len(failed)} "
+                f"{rate:.2f} articles/s, ETA {eta / 60:.1f} min",
+                flush=True,
+            )
+    finally:
+        db.close()
+
+    if checkpoint.failed:
+        print(f"{len(checkpoint.failed)} articles failed; see {checkpoint_path}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Re-analyze or re-evaluate stored articles in bulk.")
+    parser.add_argument("mode", choices=["analyze", "evaluate"])
+    parser.add_argument("--since", type=datetime.fromisoformat, help="first_seen_at >= (ISO timestamp)")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="first_seen_at < (ISO timestamp)")
+    parser.add_argument("--min-score", type=int)
+    parser.add_argument("--max-score", type=int)
+    parser.add_argument("--category", action="append", help="repeatable")
+    parser.add_argument("--model", action="append", help="analysis_model to select, repeatable (e.g. local-triage, mock)")
+    parser.add_argument("--prompt-version", action="append", help="analysis_prompt_version to select, repeatable")
+    parser.add_argument("--stale", action="store_true", help="only rows not produced by the current model + prompt")
+    parser.add_argument("--full", action="store_true", help="evaluate mode: long-form evaluation")
+    parser.add_argument("--limit", type=int, help="process at most this many articles in this run (resumable)")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=2.0, help="max LLM calls per second (0 = unlimited)")
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--checkpoint", help="checkpoint file (default data/backfill_<mode>.json)")
+    parser.add_argument("--restart", action="store_true", help="ignore an existing checkpoint")
+    parser.add_argument("--allow-mock", action="store_true", help="permit running without an LLM configured")
+    parser.add_argument("--dry-run", action="store_true", help="only count matching articles")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    asyncio.run(run_backfill(args))
+
+
+if __name__ == "__main__":
+    main()
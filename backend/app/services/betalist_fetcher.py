@@ -3,14 +3,16 @@ import logging
 from typing import Callable, List
 from datetime import datetime
 from bs4 import BeautifulSoup
+from app.core.config import settings
 from app.services.fetcher_base import BaseFetcher
+from app.services.resilience import default_timeout, request_with_resilience
 from app.schemas.article import ArticleCreate
 
 logger = logging.getLogger(__name__)
 
 class BetaListFetcher(BaseFetcher):
-    RSS_URL = "https://betalist.com/rss"
-    FALLBACK_URL = "https://betalist.com/startups/feed"
+    RSS_URL = settings.BETALIST_RSS_URL
+    FALLBACK_URL = settings.BETALIST_FALLBACK_URL
 
     def __init__(self, client_factory: Callable[..., httpx.AsyncClient] | None = None) -> None:
         # 允许在测试中注入自定义 AsyncClient（例如 MockTransport）
@@ -21,11 +23,11 @@ class BetaListFetcher(BaseFetcher):
         return "BetaList"
 
     async def _get_feed(self, client: httpx.AsyncClient, url: str) -> httpx.Response:
-        return await client.get(url, follow_redirects=True)
+        return await request_with_resilience(client, "GET", url, follow_redirects=True)
 
     async def fetch_latest(self, limit: int = 10) -> List[ArticleCreate]:
         # trust_env=False 避免继承本地代理；follow_redirects 处理 301 -> startups/feed
-        async with self.client_factory(trust_env=False, follow_redirects=True) as client:
+        async with self.client_factory(trust_env=False, follow_redirects=True, timeout=default_timeout()) as client:
             try:
                 resp = await self._get_feed(client, self.RSS_URL)
                 if resp.status_code != 200:
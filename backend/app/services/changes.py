@@ -0,0 +1,156 @@
+"""Change tracking for the delta feed and push notifications.
+
+Every write that changes what `/feed` would return for an article (new metric
+point, analysis, evaluation) stamps the article with a change stamp. Clients
+remember the highest cursor they have seen and ask `/feed/delta?since=<cursor>`
+for anything newer.
+
+On PostgreSQL the stamp is the writing transaction's id (offset by
+`XID_BASE`), not a sequence value. A sequence value is taken before commit,
+so transactions can commit out of order: a reader could see N+1, hand out
+cursor N+1 and never send N once it commits. Every transaction that can still
+commit has an id at or above the snapshot's `pg_snapshot_xmin`, so
+`current_change_seq` caps the cursor just below it. Rows past the cursor may
+be sent twice, never skipped.
+
+`broker` fans change events out to server-sent-event subscribers in this
+process. Writes made by another worker or replica are picked up by the SSE
+loop polling the current cursor whenever it is idle.
+"""
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from app.db.models import ArticleModel
+
+logger = logging.getLogger(__name__)
+
+SSE_KEEPALIVE_SECONDS = 15.0
+
+
+# Stamps used to come from the article_change_seq sequence; transaction ids are
+# shifted above anything it handed out, so cursors saved before the switch stay valid
+XID_BASE = 1 << 40
+
+_PG_STAMP = text(f"SELECT pg_current_xact_id()::text::bigint + {XID_BASE}")
+_PG_CURSOR = text(
+    f"SELECT least(coalesce(max(change_seq), 0), pg_snapshot_xmin(pg_current_snapshot())::text::bigint + {XID_BASE} - 1) "
+    "FROM articles"
+)
+
+
+def _is_postgres(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def next_change_seq(db: Session) -> int:
+    """Change stamp for writes made in the current transaction."""
+    if _is_postgres(db):
+        return db.scalar(_PG_STAMP)
+    # SQLite (tests): single writer, max + 1 is good enough
+    return (db.query(func.max(ArticleModel.change_seq)).scalar() or 0) + 1
+
+
+def next_change_seqs(db: Session, n: int) -> List[int]:
+    """Stamps for `n` articles written by a bulk writer in one transaction."""
+    if n <= 0:
+        return []
+    if _is_postgres(db):
+        return [next_change_seq(db)] * n
+    start = next_change_seq(db)
+    return list(range(start, start + n))
+
+
+def mark_changed(db: Session, article: ArticleModel) -> int:
+    """Stamp `article` as changed by the current transaction."""
+    article.change_seq = next_change_seq(db)
+    return article.change_seq
+
+
+def current_change_seq(db: Session) -> int:
+    """Cursor for readers: every change at or below it is already visible.
+
+    Publish this (read after commit), not a writer's own stamp: an older
+    transaction may still be about to commit below that stamp.
+    """
+    if _is_postgres(db):
+        return db.scalar(_PG_CURSOR) or 0
+    return db.query(func.max(ArticleModel.change_seq)).scalar() or 0
+
+
+class ChangeBroker:
+    """In-process fan-out of change events to SSE subscribers."""
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscribers: Set[asyncio.Queue] = set()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+    def publish(self, cursor: int, article_ids: Iterable[int]) -> None:
+        event = {"cursor": cursor, "article_ids": sorted(set(article_ids))}
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Slow consumer: it will still see the newest cursor on its next event
+                logger.warning("Dropping change event for a slow SSE subscriber")
+
+
+broker = ChangeBroker()
+
+
+def _sse(event: Dict[str, Any]) -> str:
+    return f"id: {event['cursor']}\nevent: change\ndata: {json.dumps(event)}\n\n"
+
+
+async def event_stream(
+    since: int,
+    read_cursor: Callable[[], int],
+    is_disconnected: Callable[[], Any],
+    keepalive: float = SSE_KEEPALIVE_SECONDS,
+) -> AsyncIterator[str]:
+    """SSE body: a `change` event whenever the sequence moves past what the client has seen.
+
+    `read_cursor` is a blocking DB read of the current sequence; it is only used
+    while idle, to catch writes made by other processes.
+    """
+    queue = broker.subscribe()
+    last_sent = since
+    try:
+        # Catch up immediately if the client is already behind
+        current = await asyncio.to_thread(read_cursor)
+        if current > last_sent:
+            last_sent = current
+            yield _sse({"cursor": current, "article_ids": []})
+
+        while not await is_disconnected():
+            try:
+                event: Optional[Dict[str, Any]] = await asyncio.wait_for(queue.get(), timeout=keepalive)
+            except asyncio.TimeoutError:
+                event = None
+                current = await asyncio.to_thread(read_cursor)
+                if current > last_sent:
+                    event = {"cursor": current, "article_ids": []}
+
+            if event is None:
+                yield ": keepalive\n\n"
+            elif event["cursor"] > last_sent:
+                last_sent = event["cursor"]
+                yield _sse(event)
+    finally:
+        broker.unsubscribe(queue)
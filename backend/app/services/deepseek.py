@@ -3,11 +3,14 @@ import os
 import logging
 from datetime import datetime
 from typing import Optional
+from urllib.parse import urlparse
 
 from dotenv import load_dotenv
 from openai import AsyncOpenAI
 
+from app.core.config import settings
 from app.schemas.article import Article, DeepSeekEvaluation
+from app.services.resilience import breakers, CircuitOpenError
 
 # Ensure .env is loaded so DEEPSEEK_* variables are available when not exported
 load_dotenv()
@@ -20,16 +23,30 @@ class DeepSeekEvaluator:
         self.model = os.getenv("DEEPSEEK_MODEL", "deepseek-chat")
         self.base_url = os.getenv("DEEPSEEK_BASE_URL", "https://api.deepseek.com")
 
+        self.breaker = breakers.get(urlparse(self.base_url).netloc.lower())
+
         self.client: Optional[AsyncOpenAI] = None
         if self.api_key:
-            self.client = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url)
+            # Explicit deadline; the SDK retries with jittered backoff up to max_retries
+            self.client = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                timeout=settings.LLM_TIMEOUT_SECONDS,
+                max_retries=settings.LLM_MAX_RETRIES,
+            )
         else:
             logger.warning("DEEPSEEK_API_KEY not set, DeepSeekEvaluator will use mock responses.")
 
-    async def evaluate(self, article: Article, version: int) -> DeepSeekEvaluation:
+    async def evaluate(self, article: Article, version: int, fallback: bool = True) -> DeepSeekEvaluation:
+        """Short structured evaluation. With `fallback=False`, API failures raise instead of returning mock output."""
         if not self.client:
             logger.info("DeepSeek mock: client not initialized, skip real call (article_id=%s, version=%s)", getattr(article, "id", None), version)
             return self._mock(article, version)
+        if not self.breaker.allow():
+            if not fallback:
+                raise CircuitOpenError(self.breaker.host, self.breaker.retry_in())
+            logger.warning("DeepSeek circuit open, using mock without calling (article_id=%s, version=%s)", getattr(article, "id", None), version)
+            return self._mock(article, version)
 
         prompt = (
             "You are a senior product manager + investor + market analyst. "
@@ -60,10 +77,9 @@ class DeepSeekEvaluator:
                 ],
                 response_format={"type": "json_object"},
             )
-            logger.info("DeepSeek success: article_id=%s version=%s", getattr(article, "id", None), version)
             content = completion.choices[0].message.content or "{}"
             data = json.loads(content)
-            return DeepSeekEvaluation(
+            evaluation = DeepSeekEvaluation(
                 version=version,
                 model=self.model,
                 overall_score=int(data.get("overall_score", 0)),
@@ -73,18 +89,32 @@ class DeepSeekEvaluator:
                 recommendation=data.get("recommendation", ""),
                 created_at=datetime.utcnow(),
             )
+            # Only a usable answer proves the host healthy
+            self.breaker.record_success()
+            logger.info("DeepSeek success: article_id=%s version=%s", getattr(article, "id", None), version)
+            return evaluation
         except Exception as e:
+            self.breaker.record_error(e)
+            if not fallback:
+                raise
             logger.error("DeepSeek evaluation failed, falling back to mock (article_id=%s version=%s): %r", getattr(article, "id", None), version, e)
             # 回退到 mock，避免请求失败阻断流程
             return self._mock(article, version)
 
-    async def evaluate_full(self, article: Article, version: int) -> DeepSeekEvaluation:
+    async def evaluate_full(self, article: Article, version: int, fallback: bool = True) -> DeepSeekEvaluation:
         """Produce a long-form, multi-perspective evaluation; returns same schema with full_evaluation populated."""
         if not self.client:
             logger.info("DeepSeek mock (full): client not initialized (article_id=%s, version=%s)", getattr(article, "id", None), version)
             base = self._mock(article, version)
             base.full_evaluation = self._mock_full_text(article)
             return base
+        if not self.breaker.allow():
+            if not fallback:
+                raise CircuitOpenError(self.breaker.host, self.breaker.retry_in())
+            logger.warning("DeepSeek circuit open, using mock without calling (article_id=%s, version=%s)", getattr(article, "id", None), version)
+            base = self._mock(article, version)
+            base.full_evaluation = self._mock_full_text(article)
+            return base
 
         detailed_prompt = (
             "You are a senior product leader, investor, and market strategist. "
@@ -117,18 +147,24 @@ class DeepSeekEvaluator:
                     },
                 ],
             )
-            logger.info("DeepSeek full success: article_id=%s version=%s", getattr(article, "id", None), version)
             full_text = completion.choices[0].message.content or ""
-            # Reuse base eval for score/short fields; mock short fields if needed
-            base = await self.evaluate(article, version)
-            base.full_evaluation = full_text
-            return base
+            self.breaker.record_success()
+            logger.info("DeepSeek full success: article_id=%s version=%s", getattr(article, "id", None), version)
         except Exception as e:
+            self.breaker.record_error(e)
+            if not fallback:
+                raise
             logger.error("DeepSeek full evaluation failed, falling back to mock (article_id=%s version=%s): %r", getattr(article, "id", None), version, e)
             base = self._mock(article, version)
             base.full_evaluation = self._mock_full_text(article)
             return base
 
+        # Reuse base eval for score/short fields; it records its own success/failure
+        # (and mocks the short fields if needed), so it stays outside the try above
+        base = await self.evaluate(article, version, fallback=fallback)
+        base.full_evaluation = full_text
+        return base
+
     def _mock(self, article: Article, version: int) -> DeepSeekEvaluation:
         logger.debug("DeepSeek mock used for article_id=%s version=%s", getattr(article, "id", None), version)
         return DeepSeekEvaluation(
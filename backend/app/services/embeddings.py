@@ -0,0 +1,361 @@
+"""Offline article embeddings and "related products" search.
+
+Vectors come from a hashing vectorizer folded straight into a sparse random
+projection: every unigram/bigram of title + summary + reasoning is hashed to a
+few signed coordinates of a `EMBEDDING_DIM`-wide vector, so no vocabulary or
+model download is needed and the same text always maps to the same vector.
+
+`EmbeddingIndex` keeps vectors in an append-only float32 file opened with
+`np.memmap`, next to an int64 file of article ids (the id map). Up to
+`EMBEDDING_APPROX_THRESHOLD` rows, search is one matrix-vector product; beyond
+that an IVF index (k-means coarse cells, probe the nearest few) restricts the
+exact scoring to a candidate subset. The IVF cells are trained off the request
+path (`prepare`, after ingest batches and rebuilds); searches run in a worker
+thread.
+
+Rebuild everything from the database with:
+
+    cd backend
+    python -m app.services.embeddings rebuild
+"""
+import argparse
+import fcntl
+import hashlib
+import logging
+import os
+import re
+import shutil
+import threading
+from contextlib import contextmanager, suppress
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+# Signed coordinates each hashed feature is spread over
+_PROJECTIONS_PER_TOKEN = 4
+
+
+def article_text(title: Optional[str], summary: Optional[str], reasoning: Optional[str]) -> str:
+    # Title weighs double: it's the most specific signal we have for a product
+    return " ".join(filter(None, [title, title, summary, reasoning]))
+
+
+@lru_cache(maxsize=200_000)
+def _projection(token: str, dim: int) -> Tuple[Tuple[int, ...], Tuple[float, ...]]:
+    digest = hashlib.blake2b(token.encode("utf-8"), digest_size=4 * _PROJECTIONS_PER_TOKEN).digest()
+    cols, signs = [], []
+    for i in range(_PROJECTIONS_PER_TOKEN):
+        h = int.from_bytes(digest[4 * i:4 * i + 4], "little")
+        cols.append((h >> 1) % dim)
+        signs.append(1.0 if h & 1 else -1.0)
+    return tuple(cols), tuple(signs)
+
+
+def embed_texts(texts: Sequence[str], dim: int = settings.EMBEDDING_DIM) -> np.ndarray:
+    """L2-normalized float32 embeddings, one row per text, computed as one batch."""
+    rows: List[int] = []
+    cols: List[int] = []
+    vals: List[float] = []
+    for r, text in enumerate(texts):
+        tokens = _TOKEN_RE.findall((text or "").lower())
+        counts: Dict[str, int] = {}
+        for tok in tokens:
+            counts[tok] = counts.get(tok, 0) + 1
+        for a, b in zip(tokens, tokens[1:]):
+            key = f"{a} {b}"
+            counts[key] = counts.get(key, 0) + 1
+        for tok, n in counts.items():
+            weight = 1.0 + np.log(n)  # sublinear tf
+            c, s = _projection(tok, dim)
+            rows.extend([r] * len(c))
+            cols.extend(c)
+            vals.extend(weight * x for x in s)
+
+    out = np.zeros((len(texts), dim), dtype=np.float32)
+    if rows:
+        np.add.at(out, (np.asarray(rows), np.asarray(cols)), np.asarray(vals, dtype=np.float32))
+    norms = np.linalg.norm(out, axis=1, keepdims=True)
+    np.divide(out, norms, out=out, where=norms > 0)
+    return out
+
+
+def _kmeans(X: np.ndarray, k: int, iters: int = 10, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """Spherical k-means on unit vectors; returns (centroids, assignment)."""
+    rng = np.random.default_rng(seed)
+    centroids = X[rng.choice(len(X), size=k, replace=False)].copy()
+    assign = np.zeros(len(X), dtype=np.int32)
+    for _ in range(iters):
+        assign = np.argmax(X @ centroids.T, axis=1).astype(np.int32)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, X)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        empty = norms[:, 0] == 0
+        sums[empty] = centroids[empty]  # keep stale centroid for empty cells
+        norms[empty] = 1.0
+        centroids = (sums / norms).astype(np.float32)
+    return centroids, assign
+
+
+class _Snapshot(NamedTuple):
+    """One mapping of the files. Published with a single assignment, so a reader
+    thread never pairs the vectors of one version with the ids of another."""
+
+    # (inode, size, mtime) of the id map when mapped; a rebuild swaps in new files
+    key: Optional[Tuple[int, int, int]]
+    vectors: Optional[np.ndarray]
+    ids: np.ndarray
+    row_of: Dict[int, int]
+
+
+_EMPTY = _Snapshot(None, None, np.zeros(0, dtype=np.int64), {})
+
+
+class EmbeddingIndex:
+    VECTORS = "vectors.f32"
+    IDS = "ids.i64"
+    IVF = "ivf.npz"
+    # Sibling of the directory (not inside it), so `rebuild` can swap the directory under the lock
+    LOCK_SUFFIX = ".lock"
+
+    def __init__(
+        self,
+        directory: str = settings.EMBEDDING_INDEX_DIR,
+        dim: int = settings.EMBEDDING_DIM,
+        approx_threshold: int = settings.EMBEDDING_APPROX_THRESHOLD,
+        nprobe: int = settings.EMBEDDING_NPROBE,
+    ):
+        self.directory = directory
+        self.dim = dim
+        self.approx_threshold = approx_threshold
+        self.nprobe = nprobe
+        self._snapshot = _EMPTY
+        self._ivf: Optional[Tuple[np.ndarray, List[np.ndarray], int]] = None
+        # Inode of the id map `_ivf` was built for: cells of replaced files are never reused
+        self._ivf_inode: Optional[int] = None
+        # Searches run in worker threads: only one of them trains k-means
+        self._ivf_lock = threading.Lock()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    @contextmanager
+    def _write_lock(self):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.directory.rstrip("/") + self.LOCK_SUFFIX, "w") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _stat_on_disk(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(self._path(self.IDS))
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_size, st.st_mtime_ns
+
+    def _refresh(self) -> _Snapshot:
+        """Re-map the files if another writer (or process) appended rows or rebuilt the index.
+
+        A row count alone misses a rebuild that happens to produce as many rows,
+        so the id map's inode and mtime are compared too. Callers work on the
+        returned snapshot only; other threads may publish a newer one meanwhile.
+        """
+        snapshot = self._snapshot
+        key = self._stat_on_disk()
+        if key == snapshot.key:
+            return snapshot
+        count = key[1] // 8 if key else 0
+        if count == 0:
+            snapshot = _Snapshot(key, None, np.zeros(0, dtype=np.int64), {})
+        else:
+            ids = np.fromfile(self._path(self.IDS), dtype=np.int64, count=count)
+            vectors = np.memmap(self._path(self.VECTORS), dtype=np.float32, mode="r", shape=(count, self.dim))
+            snapshot = _Snapshot(key, vectors, ids, {int(i): r for r, i in enumerate(ids)})
+        self._snapshot = snapshot
+        return snapshot
+
+    def __len__(self) -> int:
+        return len(self._refresh().ids)
+
+    def add(self, ids: Sequence[int], vectors: np.ndarray) -> None:
+        """Insert or overwrite vectors for `ids`. Appends go vectors-first, so readers never see a partial row."""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with self._write_lock():
+            snapshot = self._refresh()
+            row_of = snapshot.row_of
+            updates = [(row_of[int(i)], v) for i, v in zip(ids, vectors) if int(i) in row_of]
+            fresh: Dict[int, np.ndarray] = {}
+            for i, v in zip(ids, vectors):
+                if int(i) not in row_of:
+                    fresh[int(i)] = v  # last one wins within a batch
+
+            if updates:
+                mm = np.memmap(self._path(self.VECTORS), dtype=np.float32, mode="r+", shape=(len(snapshot.ids), self.dim))
+                for row, v in updates:
+                    mm[row] = v
+                mm.flush()
+                del mm
+            if fresh:
+                with open(self._path(self.VECTORS), "ab") as fh:
+                    fh.write(np.stack(list(fresh.values())).astype(np.float32).tobytes())
+                with open(self._path(self.IDS), "ab") as fh:
+                    fh.write(np.fromiter(fresh.keys(), dtype=np.int64).tobytes())
+
+    def vector(self, article_id: int) -> Optional[np.ndarray]:
+        snapshot = self._refresh()
+        row = snapshot.row_of.get(article_id)
+        return None if row is None else np.asarray(snapshot.vectors[row])
+
+    def prepare(self) -> None:
+        """Load or train the IVF cells now if searches will need them (k-means is seconds of CPU)."""
+        snapshot = self._refresh()
+        if len(snapshot.ids) > self.approx_threshold:
+            self._ivf_index(snapshot)
+
+    def _ivf_index(self, snapshot: _Snapshot) -> Tuple[np.ndarray, List[np.ndarray], int]:
+        with self._ivf_lock:
+            return self._load_or_train_ivf(snapshot)
+
+    def _load_or_train_ivf(self, snapshot: _Snapshot) -> Tuple[np.ndarray, List[np.ndarray], int]:
+        """(centroids, row lists per cell, rows covered). Rebuilt once the index grows 50% past it."""
+        n = len(snapshot.ids)
+        if self._ivf_inode != snapshot.key[0]:
+            # Different files: the IVF cells describe the old rows
+            self._ivf, self._ivf_inode = None, snapshot.key[0]
+        if self._ivf is None:
+            path = self._path(self.IVF)
+            if os.path.exists(path):
+                data = np.load(path)
+                assign, centroids = data["assign"], data["centroids"]
+                self._ivf = (centroids, [np.flatnonzero(assign == c) for c in range(len(centroids))], len(assign))
+
+        if self._ivf is None or self._ivf[2] > n or n > 1.5 * self._ivf[2]:
+            nlist = max(1, int(np.sqrt(n)))
+            # Train on a sample, then assign every row in bounded-size chunks
+            rng = np.random.default_rng(0)
+            sample_rows = np.sort(rng.choice(n, size=min(n, 64 * nlist), replace=False))
+            centroids, _ = _kmeans(np.asarray(snapshot.vectors[sample_rows]), nlist)
+            assign = np.concatenate([
+                np.argmax(np.asarray(snapshot.vectors[start:start + 50_000]) @ centroids.T, axis=1)
+                for start in range(0, n, 50_000)
+            ]).astype(np.int32)
+            with self._write_lock():
+                np.savez(self._path(self.IVF), centroids=centroids, assign=assign)
+            self._ivf = (centroids, [np.flatnonzero(assign == c) for c in range(nlist)], n)
+            logger.info("Rebuilt IVF embedding index: %s rows, %s cells", n, nlist)
+        return self._ivf
+
+    def search(self, query: np.ndarray, k: int = 10, exclude: Iterable[int] = ()) -> List[Tuple[int, float]]:
+        """Top-k (article_id, cosine similarity), best first."""
+        snapshot = self._refresh()
+        n = len(snapshot.ids)
+        if n == 0:
+            return []
+        query = np.asarray(query, dtype=np.float32)
+
+        if n <= self.approx_threshold:
+            candidates = None
+            scores = np.asarray(snapshot.vectors[:n]) @ query
+        else:
+            centroids, lists, covered = self._ivf_index(snapshot)
+            cells = np.argsort(-(centroids @ query))[: self.nprobe]
+            # Rows appended since the last IVF build are always scored exactly
+            candidates = np.concatenate([lists[c] for c in cells] + [np.arange(covered, n)])
+            scores = np.asarray(snapshot.vectors[candidates]) @ query
+
+        if len(scores) == 0:
+            # Every probed cell is empty
+            return []
+        excluded = {int(e) for e in exclude}
+        want = min(len(scores), k + len(excluded))
+        top = np.argpartition(-scores, want - 1)[:want]
+        top = top[np.argsort(-scores[top])]
+
+        results = []
+        for pos in top:
+            row = pos if candidates is None else candidates[pos]
+            article_id = int(snapshot.ids[row])
+            if article_id in excluded:
+                continue
+            results.append((article_id, float(scores[pos])))
+            if len(results) == k:
+                break
+        return results
+
+
+def index_articles(index: EmbeddingIndex, rows: Iterable[Tuple[int, str, str, str]]) -> int:
+    """Embed and store (id, title, summary, reasoning) rows in one batch."""
+    rows = list(rows)
+    if not rows:
+        return 0
+    vectors = embed_texts([article_text(t, s, r) for _, t, s, r in rows], dim=index.dim)
+    index.add([r[0] for r in rows], vectors)
+    return len(rows)
+
+
+def rebuild(db, directory: str = settings.EMBEDDING_INDEX_DIR, batch_size: int = 2000) -> int:
+    """Re-embed every article into a fresh index directory, then swap it in.
+
+    The swap holds the same lock as appenders, and rows they appended while
+    the rebuild was running are carried over into the new index.
+    """
+    from app.db.models import ArticleModel
+
+    directory = directory.rstrip("/")
+    tmp_dir, old_dir = directory + ".rebuild", directory + ".old"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    live = EmbeddingIndex(directory)
+    appended_from = len(live)
+    index = EmbeddingIndex(tmp_dir)
+    query = db.query(
+        ArticleModel.id, ArticleModel.title, ArticleModel.analysis_summary, ArticleModel.analysis_reasoning
+    ).order_by(ArticleModel.id).yield_per(batch_size)
+
+    total, batch = 0, []
+    for row in query:
+        batch.append(tuple(row))
+        if len(batch) == batch_size:
+            total += index_articles(index, batch)
+            batch = []
+    total += index_articles(index, batch)
+    index.prepare()
+
+    with live._write_lock():
+        current = live._refresh()
+        if len(current.ids) > appended_from:
+            index.add(current.ids[appended_from:].tolist(), np.asarray(current.vectors[appended_from:]))
+        shutil.rmtree(old_dir, ignore_errors=True)
+        os.replace(directory, old_dir)
+        os.replace(tmp_dir, directory)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    with suppress(FileNotFoundError):
+        os.remove(tmp_dir + EmbeddingIndex.LOCK_SUFFIX)
+    return total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Maintain the local article embedding index.")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.add_argument("--dir", default=settings.EMBEDDING_INDEX_DIR)
+    args = parser.parse_args()
+
+    from app.db.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        total = rebuild(db, args.dir)
+    finally:
+        db.close()
+    print(f"Indexed {total} articles into {args.dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+"""Streaming bulk export of articles, metric history, evaluations and platform listings.
+
+Rows are read through a server-side cursor (`yield_per`) and encoded batch by
+batch as NDJSON, CSV or Parquet, so memory stays flat regardless of table
+size. Used by `GET /export/{dataset}` and from the command line:
+
+    cd backend
+    python -m app.services.exporter metrics --format csv --since 2024-05-01 -o metrics.csv
+    python -m app.services.exporter articles --since-last notebook -o articles.ndjson
+
+`--since-last NAME` resumes from where the previous export with that name
+stopped; the cursor is only advanced once an export has been fully written.
+Articles are updated in place, so their incremental exports follow the change
+cursor (`change_seq`, see app/services/changes.py) rather than a timestamp.
+Time windows end `EXPORT_LAG_SECONDS` in the past: timestamps are set in
+Python before the row commits, so the newest rows may still be in flight.
+"""
+import argparse
+import csv
+import io
+import logging
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import DateTime, Float, Integer, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import (
+    ArticleModel,
+    ArticleMetricModel,
+    ArticleEvaluationModel,
+    ArticleSourceModel,
+    ExportCursorModel,
+)
+from app.services.changes import current_change_seq
+from app.services.feed_serializer import dumps
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+DEFAULT_BATCH_SIZE = 5000
+
+
+@dataclass(frozen=True)
+class Dataset:
+    model: Any
+    columns: Tuple[str, ...]
+    time_column: str
+    # Columns holding JSON documents; flattened to JSON text in CSV/Parquet
+    json_columns: Tuple[str, ...] = ()
+    # Change stamp followed by "since last export" instead of `time_column` (rows updated in place)
+    change_column: Optional[str] = None
+
+
+DATASETS: Dict[str, Dataset] = {
+    "articles": Dataset(
+        ArticleModel,
+        (
+            "id", "title", "url", "source", "source_id", "publish_date", "first_seen_at", "last_seen_at",
+            "seen_count", "platforms_count", "analyzed_at", "analysis_summary", "analysis_category", "analysis_score",
+            "analysis_reasoning", "analysis_tags", "analysis_model", "analysis_prompt_version", "heat_score",
+            "change_seq",
+        ),
+        time_column="last_seen_at",
+        json_columns=("analysis_tags",),
+        change_column="change_seq",
+    ),
+    "metrics": Dataset(
+        ArticleMetricModel,
+        ("id", "article_id", "recorded_at", "metric_value", "rank", "source"),
+        time_column="recorded_at",
+    ),
+    "evaluations": Dataset(
+        ArticleEvaluationModel,
+        ("id", "article_id", "version", "model_name", "overall_score", "content", "full_evaluation", "created_at"),
+        time_column="created_at",
+        json_columns=("content",),
+    ),
+    "sources": Dataset(
+        ArticleSourceModel,
+        ("id", "article_id", "source", "source_id", "first_seen", "last_seen", "last_metric"),
+        time_column="last_seen",
+    ),
+}
+
+
+class ExportError(ValueError):
+    pass
+
+
+def check_format(fmt: str) -> None:
+    if fmt not in ENCODERS:
+        raise ExportError(f"Unknown format {fmt!r}; expected one of {sorted(ENCODERS)}")
+    if fmt == "parquet" and pa is None:
+        raise ExportError("Parquet export requires the optional 'pyarrow' package")
+
+
+def resolve_window(
+    db: Session,
+    dataset: str,
+    since: Optional[datetime],
+    until: Optional[datetime],
+    since_last: Optional[str],
+) -> Tuple[Optional[datetime], datetime]:
+    """Lower/upper time bounds for an export; `until` is pinned to now (minus the lag) so incremental windows don't overlap."""
+    if dataset not in DATASETS:
+        raise ExportError(f"Unknown dataset {dataset!r}; expected one of {sorted(DATASETS)}")
+    if since_last and DATASETS[dataset].change_column is None:
+        cursor = db.get(ExportCursorModel, (since_last, dataset))
+        if cursor is not None:
+            since = cursor.last_until
+    now = datetime.utcnow() - timedelta(seconds=settings.EXPORT_LAG_SECONDS)
+    return since, min(until, now) if until else now
+
+
+def resolve_changes(db: Session, dataset: str, since_last: Optional[str]) -> Optional[Tuple[int, int]]:
+    """Change-cursor bounds `(after, upto]` for an incremental export of a `change_column` dataset, else None."""
+    if not since_last or DATASETS[dataset].change_column is None:
+        return None
+    cursor = db.get(ExportCursorModel, (since_last, dataset))
+    after = cursor.last_change_seq if cursor is not None and cursor.last_change_seq is not None else 0
+    # Capped below transactions still in flight, so nothing at or under it can still appear
+    return after, max(after, current_change_seq(db))
+
+
+def iter_batches(
+    db: Session,
+    dataset: str,
+    since: Optional[datetime],
+    until: Optional[datetime],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    changes: Optional[Tuple[int, int]] = None,
+) -> Iterator[Sequence[Tuple]]:
+    """Yield row tuples in id order, `batch_size` at a time, from a server-side cursor.
+
+    With `changes`, rows are selected by change stamp instead of the time window.
+    """
+    spec = DATASETS[dataset]
+    stmt = select(*(getattr(spec.model, c) for c in spec.columns)).order_by(spec.model.id)
+    if changes is not None:
+        change_col = getattr(spec.model, spec.change_column)
+        stmt = stmt.where(change_col > changes[0], change_col <= changes[1])
+    else:
+        time_col = getattr(spec.model, spec.time_column)
+        if since is not None:
+            stmt = stmt.where(time_col >= since)
+        if until is not None:
+            stmt = stmt.where(time_col < until)
+
+    result = db.execute(stmt.execution_options(yield_per=batch_size))
+    for partition in result.partitions():
+        yield partition
+
+
+def _ndjson(spec: Dataset, batches: Iterator[Sequence[Tuple]]) -> Iterator[bytes]:
+    for batch in batches:
+        yield b"".join(dumps(dict(zip(spec.columns, row))) + b"\n" for row in batch)
+
+
+def _flatten(spec: Dataset, row: Tuple) -> List[Any]:
+    values = list(row)
+    for i, col in enumerate(spec.columns):
+        if col in spec.json_columns and values[i] is not None:
+            values[i] = dumps(values[i]).decode("utf-8")
+    return values
+
+
+def _csv(spec: Dataset, batches: Iterator[Sequence[Tuple]]) -> Iterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(spec.columns)
+    for batch in batches:
+        for row in batch:
+            writer.writerow([v.isoformat() if isinstance(v, datetime) else v for v in _flatten(spec, row)])
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+
+class _DrainableSink(io.RawIOBase):
+    """Write-only file object that hands back whatever was written since the last drain."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._chunks.append(bytes(b))
+        self._pos += len(b)
+        return len(b)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def drain(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+def _arrow_schema(spec: Dataset) -> "pa.Schema":
+    fields = []
+    for name in spec.columns:
+        column_type = getattr(spec.model, name).type
+        if isinstance(column_type, Integer):
+            arrow_type = pa.int64()
+        elif isinstance(column_type, Float):
+            arrow_type = pa.float64()
+        elif isinstance(column_type, DateTime):
+            arrow_type = pa.timestamp("us")
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(name, arrow_type))
+    return pa.schema(fields)
+
+
+def _parquet(spec: Dataset, batches: Iterator[Sequence[Tuple]]) -> Iterator[bytes]:
+    if pa is None:
+        raise ExportError("Parquet export requires the optional 'pyarrow' package")
+    schema = _arrow_schema(spec)
+    sink = _DrainableSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for batch in batches:
+            columns = list(zip(*(_flatten(spec, row) for row in batch)))
+            # One row group per batch, flushed to the client immediately
+            writer.write_table(pa.table([list(values) for values in columns], schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+ENCODERS: Dict[str, Callable[[Dataset, Iterator[Sequence[Tuple]]], Iterator[bytes]]] = {
+    "ndjson": _ndjson,
+    "csv": _csv,
+    "parquet": _parquet,
+}
+
+
+def stream_export(
+    session_factory: Callable[[], Session],
+    dataset: str,
+    fmt: str,
+    since: Optional[datetime],
+    until: datetime,
+    since_last: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[bytes]:
+    """Encoded export chunks. Owns its session, since it outlives the request handler.
+
+    Call `check_format` first: errors raised here surface only once streaming has started.
+    Incremental exports of a `change_column` dataset ignore `since`/`until` and
+    take every row changed since the named cursor.
+    """
+    spec = DATASETS[dataset]
+    db = session_factory()
+    try:
+        changes = resolve_changes(db, dataset, since_last)
+        yield from ENCODERS[fmt](spec, iter_batches(db, dataset, since, until, batch_size, changes))
+        if since_last:
+            _advance_cursor(db, since_last, dataset, until, changes[1] if changes else None)
+    finally:
+        db.close()
+
+
+def _advance_cursor(db: Session, name: str, dataset: str, until: datetime, change_seq: Optional[int] = None) -> None:
+    cursor = db.get(ExportCursorModel, (name, dataset))
+    if cursor is None:
+        cursor = ExportCursorModel(name=name, dataset=dataset)
+        db.add(cursor)
+    cursor.last_until = until
+    if change_seq is not None:
+        cursor.last_change_seq = change_seq
+    cursor.updated_at = datetime.utcnow()
+    db.commit()
+    logger.info("Export cursor %s/%s advanced to %s (change %s)", name, dataset, until.isoformat(), change_seq)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stream a bulk export of the radar dataset.")
+    parser.add_argument("dataset", choices=sorted(DATASETS))
+    parser.add_argument("--format", dest="fmt", choices=sorted(ENCODERS), default="ndjson")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="inclusive lower bound (ISO timestamp)")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="exclusive upper bound (ISO timestamp)")
+    parser.add_argument("--since-last", metavar="NAME", help="continue from the previous export with this name")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    args = parser.parse_args()
+
+    from app.db.database import SessionLocal
+
+    check_format(args.fmt)
+    db = SessionLocal()
+    try:
+        since, until = resolve_window(db, args.dataset, args.since, args.until, args.since_last)
+    finally:
+        db.close()
+
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        for chunk in stream_export(SessionLocal, args.dataset, args.fmt, since, until, args.since_last, args.batch_size):
+            out.write(chunk)
+    finally:
+        if args.output:
+            out.close()
+    print(f"Exported {args.dataset} [{since or 'beginning'}, {until}) as {args.fmt}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
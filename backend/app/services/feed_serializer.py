@@ -0,0 +1,279 @@
+"""Fast JSON path for article responses.
+
+`_db_to_schema` builds validated Pydantic objects per row, and FastAPI then
+re-validates them against `response_model` before encoding. For large feeds we
+instead read plain row tuples, assemble dicts in the exact field order of
+`app.schemas.article.Article`, and encode them once with orjson. The output is
+byte-identical to `TypeAdapter(List[Article]).dump_json(...)`.
+"""
+import gzip
+import json
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from fastapi import Response
+from sqlalchemy.orm import Session
+
+from app.db.models import ArticleModel, ArticleMetricModel, ArticleEvaluationModel, ArticleSourceModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Column order of the tuples consumed by `build_article_payloads`
+ARTICLE_COLUMNS = (
+    ArticleModel.id,
+    ArticleModel.title,
+    ArticleModel.url,
+    ArticleModel.source,
+    ArticleModel.source_id,
+    ArticleModel.publish_date,
+    ArticleModel.platforms_count,
+    ArticleModel.heat_score,
+    ArticleModel.first_seen_at,
+    ArticleModel.last_seen_at,
+    ArticleModel.seen_count,
+    ArticleModel.analyzed_at,
+    ArticleModel.analysis_summary,
+    ArticleModel.analysis_category,
+    ArticleModel.analysis_score,
+    ArticleModel.analysis_reasoning,
+    ArticleModel.analysis_tags,
+)
+METRIC_COLUMNS = (
+    ArticleMetricModel.article_id,
+    ArticleMetricModel.recorded_at,
+    ArticleMetricModel.metric_value,
+    ArticleMetricModel.rank,
+)
+SOURCE_COLUMNS = (
+    ArticleSourceModel.article_id,
+    ArticleSourceModel.source,
+    ArticleSourceModel.source_id,
+)
+EVALUATION_COLUMNS = (
+    ArticleEvaluationModel.article_id,
+    ArticleEvaluationModel.version,
+    ArticleEvaluationModel.model_name,
+    ArticleEvaluationModel.overall_score,
+    ArticleEvaluationModel.content,
+    ArticleEvaluationModel.full_evaluation,
+    ArticleEvaluationModel.created_at,
+)
+
+# Bodies smaller than this are not worth the compression overhead
+MIN_COMPRESS_BYTES = 1024
+
+
+def _metric_payload(row: Sequence[Any]) -> Dict[str, Any]:
+    _, recorded_at, value, rank = row
+    return {"recorded_at": recorded_at, "value": value, "rank": rank}
+
+
+def _evaluation_payload(row: Sequence[Any]) -> Dict[str, Any]:
+    """Mirror of `routes._eval_to_schema` on a plain row."""
+    _, version, model_name, overall_score, content, full_evaluation, created_at = row
+    content = content or {}
+    score = content.get("overall_score", overall_score)
+    return {
+        "version": version,
+        "model": model_name,
+        "overall_score": int(score) if score is not None else score,
+        "product_view": content.get("product_view", ""),
+        "investor_view": content.get("investor_view", ""),
+        "market_view": content.get("market_view", ""),
+        "recommendation": content.get("recommendation", ""),
+        "created_at": created_at,
+        "full_evaluation": full_evaluation or content.get("full_evaluation", ""),
+    }
+
+
+def _article_payload(
+    row: Sequence[Any],
+    metrics: List[Dict[str, Any]],
+    evaluations: List[Dict[str, Any]],
+    sources: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """Mirror of `routes._db_to_schema` on a plain row."""
+    (
+        article_id, title, url, source, source_id, publish_date, platforms_count, heat_score,
+        first_seen_at, last_seen_at, seen_count, analyzed_at,
+        summary, category, score, reasoning, tags,
+    ) = row
+
+    analysis = None
+    if score is not None:
+        analysis = {
+            "summary": summary or "",
+            "category": category or "Uncategorized",
+            "score": score,
+            "reasoning": reasoning or "",
+            "tags": tags or [],
+        }
+
+    sources_list = sources or [{"source": source, "source_id": source_id}]
+
+    return {
+        "title": title,
+        "url": url,
+        "source": source,
+        "source_id": source_id,
+        "publish_date": publish_date,
+        "sources": sources_list,
+        "id": article_id,
+        "first_seen_at": first_seen_at,
+        "last_seen_at": last_seen_at,
+        "seen_count": seen_count,
+        "platforms_count": platforms_count or len(sources_list),
+        "heat_score": heat_score,
+        "analyzed_at": analyzed_at,
+        "analysis": analysis,
+        "metrics_history": metrics,
+        "evaluations": evaluations,
+    }
+
+
+def build_article_payloads(
+    article_rows: Iterable[Sequence[Any]],
+    metric_rows: Iterable[Sequence[Any]],
+    evaluation_rows: Iterable[Sequence[Any]],
+    source_rows: Iterable[Sequence[Any]] = (),
+) -> List[Dict[str, Any]]:
+    """Assemble `Article`-shaped dicts from row tuples.
+
+    Rows follow `ARTICLE_COLUMNS`, `METRIC_COLUMNS`, `EVALUATION_COLUMNS` and
+    `SOURCE_COLUMNS`. Metric rows must already be ordered newest first within an
+    article; evaluation and source rows in the order they should be listed.
+    """
+    metrics_by_article: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+    for row in metric_rows:
+        metrics_by_article[row[0]].append(_metric_payload(row))
+
+    evals_by_article: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+    for row in evaluation_rows:
+        evals_by_article[row[0]].append(_evaluation_payload(row))
+
+    sources_by_article: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+    for article_id, source, source_id in source_rows:
+        sources_by_article[article_id].append({"source": source, "source_id": source_id})
+
+    return [
+        _article_payload(
+            row,
+            metrics_by_article.get(row[0], []),
+            evals_by_article.get(row[0], []),
+            sources_by_article.get(row[0], []),
+        )
+        for row in article_rows
+    ]
+
+
+def fetch_article_payloads(db: Session, *criteria, order_by=None) -> List[Dict[str, Any]]:
+    """Load articles matching `criteria` with their metrics, evaluations and platform listings.
+
+    Issues four flat queries instead of lazy-loading three relationships per
+    article, and never instantiates ORM objects.
+    """
+    article_query = db.query(*ARTICLE_COLUMNS)
+    if criteria:
+        article_query = article_query.filter(*criteria)
+    if order_by is not None:
+        article_query = article_query.order_by(order_by)
+    article_rows = article_query.all()
+    if not article_rows:
+        return []
+
+    metric_query = db.query(*METRIC_COLUMNS)
+    eval_query = db.query(*EVALUATION_COLUMNS)
+    source_query = db.query(*SOURCE_COLUMNS)
+    if criteria:
+        ids = [row[0] for row in article_rows]
+        metric_query = metric_query.filter(ArticleMetricModel.article_id.in_(ids))
+        eval_query = eval_query.filter(ArticleEvaluationModel.article_id.in_(ids))
+        source_query = source_query.filter(ArticleSourceModel.article_id.in_(ids))
+
+    metric_rows = metric_query.order_by(
+        ArticleMetricModel.article_id,
+        ArticleMetricModel.recorded_at.desc(),
+        ArticleMetricModel.id,
+    ).all()
+    eval_rows = eval_query.order_by(ArticleEvaluationModel.article_id, ArticleEvaluationModel.id).all()
+    source_rows = source_query.order_by(
+        ArticleSourceModel.article_id,
+        ArticleSourceModel.first_seen,
+        ArticleSourceModel.id,
+    ).all()
+
+    return build_article_payloads(article_rows, metric_rows, eval_rows, source_rows)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        text = value.isoformat()
+        if value.utcoffset() is not None and value.utcoffset().total_seconds() == 0:
+            text = text[:-6] + "Z"
+        return text
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(payload: Any) -> bytes:
+    """Encode compactly, formatting datetimes the way Pydantic does (UTC as `Z`)."""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_UTC_Z)
+    return json.dumps(payload, default=_json_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick `br` or `gzip` from an Accept-Encoding header, honouring q-values."""
+    if not accept_encoding:
+        return None
+
+    offers: List[Tuple[float, int, str]] = []
+    # Prefer brotli over gzip when the client weighs them equally
+    preference = {"br": 0, "gzip": 1}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if token not in preference or (token == "br" and brotli is None):
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if q > 0:
+            offers.append((-q, preference[token], token))
+
+    if not offers:
+        return None
+    return min(offers)[2]
+
+
+def json_response(
+    payload: Any,
+    accept_encoding: Optional[str] = None,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """Encode `payload` and compress it according to the client's Accept-Encoding."""
+    body = dumps(payload)
+    headers = {**(headers or {}), "Vary": "Accept-Encoding"}
+
+    encoding = negotiate_encoding(accept_encoding) if len(body) >= MIN_COMPRESS_BYTES else None
+    if encoding == "br":
+        body = brotli.compress(body, quality=4)
+        headers["Content-Encoding"] = "br"
+    elif encoding == "gzip":
+        body = gzip.compress(body, compresslevel=5)
+        headers["Content-Encoding"] = "gzip"
+
+    return Response(content=body, status_code=status_code, media_type="application/json", headers=headers)
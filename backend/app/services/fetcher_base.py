@@ -1,8 +1,12 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import AsyncIterator, List
+from app.core.config import settings
 from app.schemas.article import ArticleCreate
 
 class BaseFetcher(ABC):
+    # Fetch-time budget for one ingest run (time spent waiting on a full pipeline queue is not counted)
+    deadline_seconds: float = settings.FETCH_DEADLINE_SECONDS
+
     @property
     @abstractmethod
     def source_name(self) -> str:
@@ -13,3 +17,8 @@ class BaseFetcher(ABC):
     async def fetch_latest(self, limit: int = 10) -> List[ArticleCreate]:
         """Fetch latest articles from the source."""
         pass
+
+    async def stream_latest(self, limit: int = 10) -> AsyncIterator[ArticleCreate]:
+        """Yield latest articles as they arrive. Sources that need one request per item override this."""
+        for article in await self.fetch_latest(limit=limit):
+            yield article
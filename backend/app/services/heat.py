@@ -0,0 +1,251 @@
+"""Cross-source "heat": platform metrics made comparable with each other.
+
+`article_metrics.metric_value` is whatever a platform reports: HN points, HF
+likes, and the zeros stored for Product Hunt and BetaList. Raw values can't be
+compared across sources. This job loads the last `HEAT_WINDOW_DAYS` of metric
+points into NumPy arrays one source at a time. Each listing is then scored
+against the other listings of the same source:
+
+- percentile of its latest value (log scale, mid-rank for ties),
+- z-score of that latest value,
+- z-score of its growth over the window (log points per day).
+
+The three are blended into a 0-100 heat per listing. An article listed on
+several platforms takes its hottest listing. A source with no spread at all
+(the zeros stored for Product Hunt and BetaList, or a single listing) says
+nothing about its listings, so they get no heat: their articles are scored by
+their other platforms only, or stay NULL. All of it is sorts and segment
+reductions over whole arrays, with no Python loop per row or per article.
+Results go back in one bulk UPDATE, only for articles whose heat moved by at
+least `HEAT_MIN_CHANGE`. Articles that dropped out of the window are reset to
+NULL.
+
+Runs from the scheduler every `HEAT_REFRESH_MINUTES`, or by hand:
+
+    cd backend
+    python -m app.services.heat refresh --window-days 7
+"""
+import argparse
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import Float, Integer, bindparam, cast, extract, func, select, text, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import ArticleModel, ArticleMetricModel
+from app.services.changes import XID_BASE, broker, current_change_seq, next_change_seqs
+
+logger = logging.getLogger(__name__)
+
+# Blend of the per-source signals; sums to 1 so heat stays within 0..100
+LEVEL_PERCENTILE_WEIGHT = 0.5
+LEVEL_Z_WEIGHT = 0.2
+GROWTH_Z_WEIGHT = 0.3
+_Z_CLIP = 3.0
+# Two points less than an hour apart say little about growth; don't divide by tiny spans
+_MIN_GROWTH_SPAN_DAYS = 1 / 24
+_FETCH_ROWS = 100_000
+
+
+@dataclass
+class SourceMetrics:
+    """All metric points of one source inside the window, as parallel arrays."""
+
+    source: str
+    article_ids: np.ndarray  # int64
+    recorded_at: np.ndarray  # float64 epoch seconds
+    values: np.ndarray  # float64
+
+
+def _segment_starts(sorted_keys: np.ndarray) -> np.ndarray:
+    return np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+
+
+def percentile_ranks(values: np.ndarray) -> np.ndarray:
+    """Mid-rank percentile of each value within `values`, in 0..1 (ties share a rank)."""
+    if len(values) < 2:
+        return np.full(len(values), 0.5)
+    ordered = np.sort(values)
+    below = np.searchsorted(ordered, values, side="left")
+    upto = np.searchsorted(ordered, values, side="right")
+    return (below + upto - 1) / (2.0 * (len(values) - 1))
+
+
+def zscores(values: np.ndarray) -> np.ndarray:
+    std = values.std() if len(values) else 0.0
+    if std == 0:
+        return np.zeros(len(values))
+    return (values - values.mean()) / std
+
+
+def _squash(z: np.ndarray) -> np.ndarray:
+    """Map a z-score onto 0..1 (0.5 at the mean)."""
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -_Z_CLIP, _Z_CLIP)))
+
+
+def listing_heat(metrics: SourceMetrics) -> Tuple[np.ndarray, np.ndarray]:
+    """Heat of every listing of one source: (article ids, heat 0..100); empty if the source has no spread."""
+    if not len(metrics.article_ids):
+        return np.empty(0, dtype=np.int64), np.empty(0)
+    order = np.lexsort((metrics.recorded_at, metrics.article_ids))
+    ids = metrics.article_ids[order]
+    days = metrics.recorded_at[order] / 86400.0
+    level = np.log1p(np.maximum(metrics.values[order], 0.0))
+
+    starts = _segment_starts(ids)
+    ends = np.r_[starts[1:], len(ids)] - 1
+    latest = level[ends]
+    span = np.maximum(days[ends] - days[starts], _MIN_GROWTH_SPAN_DAYS)
+    growth = np.where(ends > starts, (latest - level[starts]) / span, 0.0)
+    if np.ptp(latest) == 0 and np.ptp(growth) == 0:
+        # Nothing to rank against: a neutral score would lift cold articles cross-listed here
+        return np.empty(0, dtype=np.int64), np.empty(0)
+
+    heat = 100.0 * (
+        LEVEL_PERCENTILE_WEIGHT * percentile_ranks(latest)
+        + LEVEL_Z_WEIGHT * _squash(zscores(latest))
+        + GROWTH_Z_WEIGHT * _squash(zscores(growth))
+    )
+    return ids[starts], heat
+
+
+def article_heat(listings: Sequence[Tuple[np.ndarray, np.ndarray]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Collapse per-source listing heat to one value per article (its hottest listing)."""
+    if not listings:
+        return np.empty(0, dtype=np.int64), np.empty(0)
+    ids = np.concatenate([ids for ids, _ in listings])
+    heat = np.concatenate([heat for _, heat in listings])
+    if not len(ids):
+        return ids, heat
+    order = np.argsort(ids, kind="stable")
+    ids, heat = ids[order], heat[order]
+    starts = _segment_starts(ids)
+    return ids[starts], np.maximum.reduceat(heat, starts)
+
+
+def _fetch_columns(db: Session, stmt, width: int) -> np.ndarray:
+    """Run `stmt` and stack its numeric rows into a (n, width) float64 array, chunk by chunk."""
+    result = db.connection().execute(stmt.execution_options(yield_per=_FETCH_ROWS))
+    # Plain tuples: NumPy converts those in C, Row objects go through the slow generic path
+    chunks = [np.array([tuple(row) for row in part], dtype=np.float64) for part in result.partitions()]
+    return np.concatenate(chunks) if chunks else np.empty((0, width))
+
+
+def load_source_metrics(db: Session, since: datetime) -> List[SourceMetrics]:
+    """Metric points recorded since `since`, one array set per source (NULL sources are skipped)."""
+    sources = db.scalars(
+        select(ArticleMetricModel.source)
+        .where(ArticleMetricModel.recorded_at >= since, ArticleMetricModel.source.isnot(None))
+        .distinct()
+    ).all()
+    loaded = []
+    for source in sorted(sources):
+        stmt = select(
+            ArticleMetricModel.article_id,
+            cast(extract("epoch", ArticleMetricModel.recorded_at), Float),
+            func.coalesce(ArticleMetricModel.metric_value, 0),
+        ).where(ArticleMetricModel.source == source, ArticleMetricModel.recorded_at >= since)
+        rows = _fetch_columns(db, stmt, 3)
+        loaded.append(SourceMetrics(source, rows[:, 0].astype(np.int64), rows[:, 1], rows[:, 2]))
+    return loaded
+
+
+_PG_HEAT_UPDATE = text(
+    f"UPDATE articles AS a SET heat_score = v.heat, change_seq = pg_current_xact_id()::text::bigint + {XID_BASE} "
+    "FROM unnest(:ids, :heat) AS v(id, heat) WHERE a.id = v.id"
+).bindparams(bindparam("ids", type_=ARRAY(Integer)), bindparam("heat", type_=ARRAY(Float)))
+
+
+def write_heat_scores(db: Session, ids: List[int], heat: List[Optional[float]]) -> None:
+    """Set `heat_score` and stamp each article as changed, in one statement."""
+    if db.get_bind().dialect.name == "postgresql":
+        # Two array parameters instead of an executemany: ~3x faster at 100k rows
+        db.execute(_PG_HEAT_UPDATE, {"ids": ids, "heat": heat})
+        return
+    seqs = next_change_seqs(db, len(ids))
+    # ORM bulk UPDATE by primary key: one executemany
+    db.execute(update(ArticleModel), [
+        {"id": i, "heat_score": h, "change_seq": seq} for i, h, seq in zip(ids, heat, seqs)
+    ])
+
+
+def refresh_heat(
+    db: Session,
+    window_days: int = settings.HEAT_WINDOW_DAYS,
+    min_change: float = settings.HEAT_MIN_CHANGE,
+    now: Optional[datetime] = None,
+    dry_run: bool = False,
+) -> Dict[str, Any]:
+    """Recompute `articles.heat_score` from the metric window and write back what changed."""
+    started = time.perf_counter()
+    now = now or datetime.utcnow()
+    per_source = load_source_metrics(db, now - timedelta(days=window_days))
+    loaded_at = time.perf_counter()
+
+    ids, heat = article_heat([listing_heat(m) for m in per_source])
+    heat = np.round(heat, 1)
+
+    current = _fetch_columns(
+        db, select(ArticleModel.id, ArticleModel.heat_score).where(ArticleModel.heat_score.isnot(None)), 2
+    )
+    current_ids, current_heat = current[:, 0].astype(np.int64), current[:, 1]
+    # Previous heat aligned with `ids` (NaN where there was none); `current_ids` come back unordered
+    previous = np.full(len(ids), np.nan)
+    if len(current_ids):
+        order = np.argsort(current_ids)
+        pos = np.searchsorted(current_ids, ids, sorter=order).clip(max=len(current_ids) - 1)
+        found = current_ids[order[pos]] == ids
+        previous[found] = current_heat[order[pos[found]]]
+    changed = np.isnan(previous) | (np.abs(heat - previous) >= min_change)
+    stale = current_ids[~np.isin(current_ids, ids)]
+
+    write_ids = ids[changed].tolist() + stale.tolist()
+    write_heat = heat[changed].tolist() + [None] * len(stale)
+    computed_at = time.perf_counter()
+
+    if write_ids and not dry_run:
+        write_heat_scores(db, write_ids, write_heat)
+        db.commit()
+        # Ids omitted: subscribers re-read /feed/delta from their cursor
+        broker.publish(current_change_seq(db), [])
+
+    stats = {
+        "sources": {m.source: len(m.article_ids) for m in per_source},
+        "metric_rows": sum(len(m.article_ids) for m in per_source),
+        "articles": int(len(ids)),
+        "updated": int(changed.sum()),
+        "cleared": int(len(stale)),
+        "load_seconds": round(loaded_at - started, 3),
+        "compute_seconds": round(computed_at - loaded_at, 3),
+        "write_seconds": round(time.perf_counter() - computed_at, 3),
+    }
+    logger.info("Heat refresh%s: %s", " (dry run)" if dry_run else "", stats)
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Normalize platform metrics into a cross-source heat score.")
+    parser.add_argument("command", choices=["refresh"])
+    parser.add_argument("--window-days", type=int, default=settings.HEAT_WINDOW_DAYS)
+    parser.add_argument("--min-change", type=float, default=settings.HEAT_MIN_CHANGE)
+    parser.add_argument("--dry-run", action="store_true", help="compute and report, write nothing")
+    args = parser.parse_args()
+
+    from app.db.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        stats = refresh_heat(db, args.window_days, args.min_change, dry_run=args.dry_run)
+    finally:
+        db.close()
+    for key, value in stats.items():
+        print(f"{key}: {value}")
+
+if __name__ == "__main__":
+    main()
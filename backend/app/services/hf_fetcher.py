@@ -1,19 +1,21 @@
 import httpx
 from typing import List
 from datetime import datetime
+from app.core.config import settings
 from app.services.fetcher_base import BaseFetcher
+from app.services.resilience import default_timeout, request_with_resilience
 from app.schemas.article import ArticleCreate
 
 class HuggingFaceFetcher(BaseFetcher):
     # API to get trending spaces
-    API_URL = "https://huggingface.co/api/spaces"
+    API_URL = settings.HUGGINGFACE_SPACES_URL
 
     @property
     def source_name(self) -> str:
         return "Hugging Face"
 
     async def fetch_latest(self, limit: int = 10) -> List[ArticleCreate]:
-        async with httpx.AsyncClient() as client:
+        async with httpx.AsyncClient(timeout=default_timeout()) as client:
             try:
                 # Sort by likes (trending)
                 params = {
@@ -21,7 +23,7 @@ class HuggingFaceFetcher(BaseFetcher):
                     "direction": "-1",
                     "limit": limit
                 }
-                resp = await client.get(self.API_URL, params=params)
+                resp = await request_with_resilience(client, "GET", self.API_URL, params=params)
                 resp.raise_for_status()
                 
                 data = resp.json()
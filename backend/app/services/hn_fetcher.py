@@ -1,29 +1,38 @@
 import httpx
-from typing import List
+from typing import AsyncIterator, List
 from datetime import datetime
+from app.core.config import settings
 from app.services.fetcher_base import BaseFetcher
+from app.services.resilience import default_timeout, request_with_resilience
 from app.schemas.article import ArticleCreate
 
 class HackerNewsFetcher(BaseFetcher):
-    BASE_URL = "https://hacker-news.firebaseio.com/v0"
+    BASE_URL = settings.HN_API_BASE_URL
 
     @property
     def source_name(self) -> str:
         return "Hacker News"
 
     async def fetch_latest(self, limit: int = 10) -> List[ArticleCreate]:
+        return [article async for article in self.stream_latest(limit=limit)]
+
+    async def stream_latest(self, limit: int = 10) -> AsyncIterator[ArticleCreate]:
+        # One request per story: yield each as soon as it is fetched so ingestion can start on it
         # trust_env=False to avoid inheriting local proxy env that can break fetches without socks support
-        async with httpx.AsyncClient(trust_env=False) as client:
+        async with httpx.AsyncClient(trust_env=False, timeout=default_timeout()) as client:
             # 1. Get Top Stories IDs
-            resp = await client.get(f"{self.BASE_URL}/topstories.json")
+            resp = await request_with_resilience(client, "GET", f"{self.BASE_URL}/topstories.json")
             resp.raise_for_status()
             story_ids = resp.json()[:limit]
 
-            articles = []
             for rank, sid in enumerate(story_ids, start=1):
                 # 2. Get Story Details
                 try:
-                    story_resp = await client.get(f"{self.BASE_URL}/item/{sid}.json")
+                    # Item lookups are small and latency-bound: hedge slow ones
+                    story_resp = await request_with_resilience(
+                        client, "GET", f"{self.BASE_URL}/item/{sid}.json",
+                        hedge_after=settings.HN_HEDGE_AFTER_SECONDS,
+                    )
                     if story_resp.status_code != 200:
                         continue
                     
@@ -43,8 +52,7 @@ class HackerNewsFetcher(BaseFetcher):
                         current_metric_value=data.get("score", 0),
                         current_rank=rank
                     )
-                    articles.append(article)
                 except Exception as e:
                     print(f"Error fetching HN story {sid}: {e}")
-            
-            return articles
+                else:
+                    yield article
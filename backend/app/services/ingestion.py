@@ -0,0 +1,487 @@
+"""Streaming ingestion pipeline.
+
+    fetchers ──> normalize ──> dedupe ──> analyze (xN) ──> persist
+
+Every fetcher is an async generator feeding the first queue, and each arrow is
+a bounded `asyncio.Queue`: a slow stage fills its input queue and the stage
+before it blocks on `put`, so memory stays bounded by the queue sizes rather
+than by `limit` × sources. Items from a fast source are deduped, analyzed and
+committed while slower sources are still fetching.
+
+- dedupe looks up known URLs one micro-batch at a time and runs triage on what
+  is new (TRIAGE_TOP_K becomes a budget consumed as batches arrive).
+- analyze runs INGEST_ANALYZE_WORKERS LLM calls concurrently.
+- persist is the only stage that writes; it commits once per micro-batch, then
+  publishes change events, updates the embedding index and records watchlist
+  matches for that batch (webhooks are sent later by a scheduler job).
+
+`snapshot()` reports per-stage queue depth and counters of the current (or
+last) run; it is served at `GET /ingest/pipeline`.
+"""
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import ArticleModel, ArticleMetricModel, ArticleSourceModel
+from app.schemas.article import AIAnalysis, Article, ArticleCreate, SourceRef
+from app.services.analyzer import LLMAnalyzer, MOCK_MODEL
+from app.services.changes import broker, current_change_seq, mark_changed
+from app.services.embeddings import EmbeddingIndex, index_articles
+from app.services.feed_serializer import fetch_article_payloads
+from app.services.fetcher_base import BaseFetcher
+from app.services.triage import Triage, PROVISIONAL_MODEL
+from app.services.utils import normalize_url
+from app.services.watchlist import Watchlists
+
+logger = logging.getLogger(__name__)
+
+_CLOSED = object()
+
+
+@dataclass
+class IngestItem:
+    raw: ArticleCreate
+    # Stored row for this URL, if any (set by dedupe)
+    existing: Optional[ArticleModel] = None
+    # URL is new but an earlier item of this run already carries it
+    duplicate: bool = False
+    send_to_llm: bool = False
+    analysis: Optional[AIAnalysis] = None
+    analysis_model: Optional[str] = None
+    prompt_version: Optional[str] = None
+
+
+class Stage:
+    """Bounded input queue of one pipeline stage, with counters for tuning."""
+
+    def __init__(self, name: str, maxsize: int, consumers: int = 1):
+        self.name = name
+        self.consumers = consumers
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.processed = 0
+        self.high_water = 0
+
+    async def put(self, item: Any) -> None:
+        await self.queue.put(item)
+        self.high_water = max(self.high_water, self.queue.qsize())
+
+    async def close(self) -> None:
+        """Signal end of input; every consumer receives one end marker."""
+        for _ in range(self.consumers):
+            await self.queue.put(_CLOSED)
+
+    async def get_batch(self, max_items: int) -> List[Any]:
+        """Wait for one item, then take whatever else is queued, up to `max_items`. [] once closed."""
+        first = await self.queue.get()
+        if first is _CLOSED:
+            return []
+        batch = [first]
+        while len(batch) < max_items:
+            try:
+                item = self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            if item is _CLOSED:
+                self.queue.put_nowait(item)  # leave it for this consumer's next call
+                break
+            batch.append(item)
+        return batch
+
+    def snapshot(self) -> Dict[str, int]:
+        return {
+            "depth": self.queue.qsize(),
+            "capacity": self.queue.maxsize,
+            "high_water": self.high_water,
+            "processed": self.processed,
+        }
+
+
+def apply_analysis(
+    db_item: ArticleModel, analysis: AIAnalysis, model_name: str, prompt_version: Optional[str] = None
+) -> None:
+    db_item.analyzed_at = datetime.utcnow()
+    db_item.analysis_summary = analysis.summary
+    db_item.analysis_category = analysis.category
+    db_item.analysis_score = analysis.score
+    db_item.analysis_reasoning = analysis.reasoning
+    db_item.analysis_tags = analysis.tags
+    db_item.analysis_model = model_name
+    db_item.analysis_prompt_version = prompt_version
+
+
+def upsert_article_sources(db: Session, rows: Sequence[Dict[str, Any]]) -> None:
+    """Record platform sightings in one statement, then refresh `platforms_count` of the touched articles.
+
+    Each row has article_id, source, source_id, seen_at and metric. New listings are
+    inserted; known ones only move `last_seen` / `last_metric`.
+    """
+    if not rows:
+        return
+    # ON CONFLICT may touch a key only once per statement: the last sighting wins
+    latest = {(r["article_id"], r["source"], r["source_id"]): r for r in rows}
+    values = [
+        {
+            "article_id": r["article_id"], "source": r["source"], "source_id": r["source_id"],
+            "first_seen": r["seen_at"], "last_seen": r["seen_at"], "last_metric": r["metric"],
+        }
+        for r in latest.values()
+    ]
+    insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    stmt = insert(ArticleSourceModel).values(values)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["article_id", "source", "source_id"],
+        set_={"last_seen": stmt.excluded.last_seen, "last_metric": stmt.excluded.last_metric},
+    ))
+
+    listings = (
+        select(func.count(ArticleSourceModel.id))
+        .where(ArticleSourceModel.article_id == ArticleModel.id)
+        .scalar_subquery()
+    )
+    db.execute(
+        update(ArticleModel)
+        .where(ArticleModel.id.in_({key[0] for key in latest}))
+        .values(platforms_count=listings)
+        .execution_options(synchronize_session=False)
+    )
+
+
+class IngestRun:
+    def __init__(
+        self,
+        db: Session,
+        fetchers: Sequence[BaseFetcher],
+        limit: int,
+        analyzer: LLMAnalyzer,
+        triage: Triage,
+        embedding_index: Optional[EmbeddingIndex] = None,
+        watchlist: Optional[Watchlists] = None,
+        queue_size: int = settings.INGEST_QUEUE_SIZE,
+        batch_size: int = settings.INGEST_BATCH_SIZE,
+        analyze_workers: int = settings.INGEST_ANALYZE_WORKERS,
+    ):
+        self.db = db
+        self.fetchers = list(fetchers)
+        self.limit = limit
+        self.analyzer = analyzer
+        self.triage = triage
+        self.embedding_index = embedding_index
+        self.watchlist = watchlist
+        self.batch_size = max(1, batch_size)
+        self.analyze_workers = max(1, analyze_workers)
+
+        self.normalize = Stage("normalize", queue_size)
+        self.dedupe = Stage("dedupe", queue_size)
+        self.analyze = Stage("analyze", queue_size, consumers=self.analyze_workers)
+        self.persist = Stage("persist", queue_size)
+
+        self.sources: Dict[str, Dict[str, Any]] = {
+            f.source_name: {"status": "pending", "items": 0} for f in self.fetchers
+        }
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.llm_calls = 0
+        # Remaining TRIAGE_TOP_K for this run (None = no cap)
+        self.llm_budget: Optional[int] = settings.TRIAGE_TOP_K if settings.TRIAGE_TOP_K > 0 else None
+
+        # dedupe: URL -> stored row (None = new in this run)
+        self._seen: Dict[str, Optional[ArticleModel]] = {}
+        # persist: rows created in this run, duplicates waiting for their original, output order
+        self._created: Dict[str, ArticleModel] = {}
+        self._waiting: Dict[str, List[IngestItem]] = {}
+        self._persisted_ids: List[int] = []
+        self._persisted: set = set()
+
+    # --- driver -------------------------------------------------------------
+
+    async def run(self) -> List[Article]:
+        self.started_at = datetime.utcnow()
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(self._fetch_all())
+                tg.create_task(self._run_stage(self.normalize, self._normalize, self.dedupe))
+                tg.create_task(self._run_stage(self.dedupe, self._dedupe, self.analyze, self.batch_size))
+                tg.create_task(self._run_stage(self.analyze, self._analyze, self.persist, workers=self.analyze_workers))
+                tg.create_task(self._run_stage(self.persist, self._persist, None, self.batch_size))
+        finally:
+            self.finished_at = datetime.utcnow()
+
+        if self._waiting:
+            logger.error("Dropped %s duplicate items whose original was never persisted", sum(map(len, self._waiting.values())))
+        if not self._persisted_ids:
+            return []
+        payloads = {
+            p["id"]: p for p in fetch_article_payloads(self.db, ArticleModel.id.in_(self._persisted_ids))
+        }
+        return [Article.model_validate(payloads[i]) for i in self._persisted_ids if i in payloads]
+
+    async def _run_stage(
+        self,
+        inbox: Stage,
+        handler: Callable[[List[Any]], Awaitable[List[Any]]],
+        outbox: Optional[Stage],
+        batch_size: int = 1,
+        workers: int = 1,
+    ) -> None:
+        async def worker():
+            while batch := await inbox.get_batch(batch_size):
+                out = await handler(batch)
+                inbox.processed += len(batch)
+                if outbox is not None:
+                    for item in out:
+                        await outbox.put(item)
+
+        async with asyncio.TaskGroup() as tg:
+            for _ in range(workers):
+                tg.create_task(worker())
+        if outbox is not None:
+            await outbox.close()
+
+    # --- stages -------------------------------------------------------------
+
+    async def _fetch_all(self) -> None:
+        async with asyncio.TaskGroup() as tg:
+            for fetcher in self.fetchers:
+                tg.create_task(self._fetch(fetcher))
+        await self.normalize.close()
+
+    async def _fetch(self, fetcher: BaseFetcher) -> None:
+        """Pump one source into the pipeline. Its deadline only counts time spent waiting on the source."""
+        state = self.sources[fetcher.source_name]
+        state["status"] = "fetching"
+        budget = fetcher.deadline_seconds
+        loop = asyncio.get_running_loop()
+        items = fetcher.stream_latest(limit=self.limit)
+        try:
+            while True:
+                started = loop.time()
+                try:
+                    async with asyncio.timeout(max(budget, 0)):
+                        raw = await anext(items)
+                except StopAsyncIteration:
+                    break
+                budget -= loop.time() - started
+                state["items"] += 1
+                await self.normalize.put(raw)
+            state["status"] = "done"
+        except TimeoutError:
+            # Whatever the source yielded before the deadline is still ingested
+            state["status"] = "timeout"
+            logger.error(f"Fetcher {fetcher.source_name} exceeded its {fetcher.deadline_seconds}s deadline")
+        except Exception as e:
+            state["status"] = "error"
+            logger.error(f"Fetcher error during ingestion ({fetcher.source_name}): {e!r}")
+        finally:
+            await items.aclose()
+
+    async def _normalize(self, batch: List[ArticleCreate]) -> List[IngestItem]:
+        # Normalize URLs for cross-platform dedupe
+        for raw in batch:
+            raw.url = normalize_url(raw.url)
+            raw.sources = [SourceRef(source=raw.source, source_id=raw.source_id)]
+        return [IngestItem(raw) for raw in batch]
+
+    async def _dedupe(self, batch: List[IngestItem]) -> List[IngestItem]:
+        lookup = {item.raw.url for item in batch} - self._seen.keys()
+        found = {}
+        if lookup:
+            found = {a.url: a for a in self.db.query(ArticleModel).filter(ArticleModel.url.in_(lookup)).all()}
+
+        # Triage before any LLM call: brand-new URLs, plus provisional rows seen again
+        # (a fresh metric may now lift them over the threshold)
+        candidates: List[IngestItem] = []
+        for item in batch:
+            url = item.raw.url
+            if url in self._seen:
+                # Seen earlier in this run: just another sighting, triaged already
+                item.existing = self._seen[url]
+                item.duplicate = item.existing is None
+                continue
+            item.existing = self._seen[url] = found.get(url)
+            if item.existing is None or item.existing.analysis_model == PROVISIONAL_MODEL:
+                candidates.append(item)
+
+        send_flags, provisional = self.triage.select([c.raw for c in candidates], budget=self.llm_budget)
+        for item, send, analysis in zip(candidates, send_flags, provisional):
+            item.send_to_llm = send
+            if not send and item.existing is None:
+                item.analysis, item.analysis_model = analysis, PROVISIONAL_MODEL
+        if self.llm_budget is not None:
+            self.llm_budget -= sum(send_flags)
+        return batch
+
+    async def _analyze(self, batch: List[IngestItem]) -> List[IngestItem]:
+        for item in batch:
+            if not item.send_to_llm:
+                continue
+            self.llm_calls += 1
+            try:
+                item.analysis = await self.analyzer.analyze(item.raw, fallback=False)
+                item.analysis_model = self.analyzer.model_name
+            except Exception as e:
+                if item.existing is not None:
+                    logger.error(f"Analysis upgrade failed for {item.raw.url}: {e}")
+                    continue
+                # Keep the item with mock output, labelled so a backfill can redo it
+                logger.error(f"Analysis failed for {item.raw.url}: {e}")
+                item.analysis = self.analyzer.mock_analysis(item.raw)
+                item.analysis_model = MOCK_MODEL
+            item.prompt_version = LLMAnalyzer.PROMPT_VERSION
+        return batch
+
+    async def _persist(self, batch: List[IngestItem]) -> List[IngestItem]:
+        ready: List[IngestItem] = []
+        for item in batch:
+            if item.duplicate and item.raw.url not in self._created:
+                # Same link on two platforms: the original may still be waiting on the LLM
+                self._waiting.setdefault(item.raw.url, []).append(item)
+            else:
+                ready.append(item)
+
+        changed_ids: List[int] = []
+        sightings: List[Dict[str, Any]] = []
+        # (id, title, summary, reasoning) of articles whose analysis text is new
+        to_embed = []
+        while ready:
+            item = ready.pop(0)
+            db_article, embed = self._write(item)
+            if item.existing is None and not item.duplicate:
+                ready.extend(self._waiting.pop(item.raw.url, []))
+            if embed:
+                to_embed.append((db_article.id, db_article.title, item.analysis.summary, item.analysis.reasoning))
+            mark_changed(self.db, db_article)
+            changed_ids.append(db_article.id)
+            sightings.append({
+                "article_id": db_article.id, "source": item.raw.source, "source_id": item.raw.source_id,
+                "seen_at": datetime.utcnow(), "metric": item.raw.current_metric_value,
+            })
+        if not changed_ids:
+            return []
+        # Merge platforms across sources for the whole batch
+        upsert_article_sources(self.db, sightings)
+        self.db.commit()
+
+        for article_id in changed_ids:
+            if article_id not in self._persisted:
+                self._persisted.add(article_id)
+                self._persisted_ids.append(article_id)
+        # Live dashboards see each batch as soon as it is committed
+        broker.publish(current_change_seq(self.db), changed_ids)
+
+        # The related-products index must never fail ingestion
+        if to_embed and self.embedding_index is not None:
+            try:
+                await asyncio.to_thread(index_articles, self.embedding_index, to_embed)
+                # Retrain the IVF cells here once they are stale, not in a /related request
+                await asyncio.to_thread(self.embedding_index.prepare)
+            except Exception as e:
+                logger.error(f"Embedding index update failed: {e!r}")
+
+        # Same for alerts: a broken rule only costs the notification
+        if self.watchlist is not None:
+            try:
+                self.watchlist.record_matches(self.db, changed_ids)
+            except Exception as e:
+                self.db.rollback()
+                logger.error(f"Watchlist matching failed: {e!r}")
+        return []
+
+    def _write(self, item: IngestItem):
+        """Stage one item's changes in the session; returns (row, whether its analysis text is new)."""
+        raw = item.raw
+        db_article = item.existing or self._created.get(raw.url)
+
+        if db_article is not None:
+            # --- UPDATE EXISTING ---
+            db_article.last_seen_at = datetime.utcnow()
+            db_article.seen_count += 1
+
+            # Upgrade a provisional pre-score once triage lets it through
+            upgraded = (
+                item.existing is not None
+                and item.analysis is not None
+                and db_article.analysis_model == PROVISIONAL_MODEL
+            )
+            if upgraded:
+                apply_analysis(db_article, item.analysis, item.analysis_model, item.prompt_version)
+
+            self.db.add(ArticleMetricModel(
+                article=db_article,
+                metric_value=raw.current_metric_value,
+                rank=raw.current_rank,
+                source=raw.source,
+            ))
+            return db_article, upgraded
+
+        # --- CREATE NEW ---
+        analysis = item.analysis
+        db_article = ArticleModel(
+            title=raw.title,
+            url=raw.url,
+            source=raw.source,
+            source_id=raw.source_id,
+            publish_date=raw.publish_date,
+            first_seen_at=datetime.utcnow(),
+            last_seen_at=datetime.utcnow(),
+            seen_count=1,
+            analyzed_at=datetime.utcnow(),
+            analysis_summary=analysis.summary,
+            analysis_category=analysis.category,
+            analysis_score=analysis.score,
+            analysis_reasoning=analysis.reasoning,
+            analysis_tags=analysis.tags,
+            analysis_model=item.analysis_model,
+            analysis_prompt_version=item.prompt_version,
+        )
+        self.db.add(db_article)
+        self.db.add(ArticleMetricModel(
+            article=db_article,
+            metric_value=raw.current_metric_value,
+            rank=raw.current_rank,
+            source=raw.source,
+        ))
+        self.db.flush()  # Get ID
+        self._created[raw.url] = db_article
+        return db_article, True
+
+    # --- monitoring ---------------------------------------------------------
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "running": self.started_at is not None and self.finished_at is None,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "limit": self.limit,
+            "sources": self.sources,
+            "stages": {s.name: s.snapshot() for s in (self.normalize, self.dedupe, self.analyze, self.persist)},
+            "llm_calls": self.llm_calls,
+            "persisted": len(self._persisted_ids),
+        }
+
+
+# Current or most recent run in this process, for /ingest/pipeline
+latest_run: Optional[IngestRun] = None
+# Overlapping runs would both insert the same new URLs; queue them instead
+_run_lock = asyncio.Lock()
+
+
+async def ingest(db: Session, fetchers: Sequence[BaseFetcher], limit: int, **kwargs: Any) -> List[Article]:
+    global latest_run
+    async with _run_lock:
+        run = IngestRun(db, fetchers, limit, **kwargs)
+        latest_run = run
+        return await run.run()
+
+
+def snapshot() -> Dict[str, Any]:
+    if latest_run is None:
+        return {"running": False, "stages": {}}
+    return latest_run.snapshot()
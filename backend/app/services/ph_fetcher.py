@@ -2,11 +2,13 @@ import httpx
 from typing import List
 from datetime import datetime
 from bs4 import BeautifulSoup
+from app.core.config import settings
 from app.services.fetcher_base import BaseFetcher
+from app.services.resilience import default_timeout, request_with_resilience
 from app.schemas.article import ArticleCreate
 
 class ProductHuntFetcher(BaseFetcher):
-    FEED_URL = "https://www.producthunt.com/feed"
+    FEED_URL = settings.PRODUCT_HUNT_FEED_URL
 
     @property
     def source_name(self) -> str:
@@ -14,9 +16,9 @@ class ProductHuntFetcher(BaseFetcher):
 
     async def fetch_latest(self, limit: int = 10) -> List[ArticleCreate]:
         # trust_env=False to avoid inheriting local proxy env that can break fetches without socks support
-        async with httpx.AsyncClient(trust_env=False) as client:
+        async with httpx.AsyncClient(trust_env=False, timeout=default_timeout()) as client:
             try:
-                resp = await client.get(self.FEED_URL)
+                resp = await request_with_resilience(client, "GET", self.FEED_URL)
                 resp.raise_for_status()
                 
                 # Use XML parser
@@ -0,0 +1,253 @@
+"""Shared resilience layer for outbound calls.
+
+- `RetryPolicy`: bounded attempts with jittered exponential backoff.
+- `CircuitBreaker`: per-host breaker that fails fast while a host is known bad.
+- `request_with_resilience`: an httpx request wrapped in both, with optional
+  hedging (a duplicate request fired if the first is slow; first answer wins).
+
+Breaker state is process-local and exposed via `breakers.snapshot()`.
+"""
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, List, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a host whose breaker is open."""
+
+    def __init__(self, host: str, retry_in: float):
+        super().__init__(f"circuit open for {host}, retry in {retry_in:.1f}s")
+        self.host = host
+        self.retry_in = retry_in
+
+
+@dataclass
+class RetryPolicy:
+    attempts: int = settings.HTTP_RETRY_ATTEMPTS
+    base_delay: float = settings.HTTP_RETRY_BASE_DELAY_SECONDS
+    max_delay: float = 5.0
+    retry_statuses: FrozenSet[int] = frozenset({429, 500, 502, 503, 504})
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter backoff for the given (1-based) failed attempt."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, host: str, failure_threshold: int, reset_timeout: float):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.total_failures = 0
+        self.total_successes = 0
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        """Whether a call may go out now. An open breaker lets one probe through after `reset_timeout`."""
+        if self.state == self.CLOSED:
+            return True
+        # OPEN, or HALF_OPEN with a probe already in flight: wait out reset_timeout
+        # (this also re-probes if an earlier probe never reported back)
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self.opened_at = time.monotonic()
+            return True
+        self.rejected += 1
+        return False
+
+    def retry_in(self) -> float:
+        if self.state == self.CLOSED:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def record_success(self) -> None:
+        self.total_successes += 1
+        self.consecutive_failures = 0
+        if self.state != self.CLOSED:
+            logger.info("Circuit closed for %s", self.host)
+        self.state = self.CLOSED
+        self.opened_at = None
+
+    def record_failure(self) -> None:
+        self.total_failures += 1
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning("Circuit opened for %s after %s consecutive failures", self.host, self.consecutive_failures)
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def record_error(self, exc: BaseException) -> None:
+        """Settle a call that raised. Host failures count against the breaker.
+
+        Any other error still means the host answered. That closes a half-open
+        breaker: otherwise the probe would never report back, and every call
+        would be rejected until the next `reset_timeout` probe.
+        """
+        if is_host_failure(exc):
+            self.record_failure()
+        elif self.state == self.HALF_OPEN:
+            self.record_success()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "host": self.host,
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "total_failures": self.total_failures,
+            "total_successes": self.total_successes,
+            "rejected": self.rejected,
+            "retry_in_seconds": round(self.retry_in(), 2),
+        }
+
+
+@dataclass
+class BreakerRegistry:
+    failure_threshold: int = settings.BREAKER_FAILURE_THRESHOLD
+    reset_timeout: float = settings.BREAKER_RESET_SECONDS
+    _breakers: Dict[str, CircuitBreaker] = field(default_factory=dict)
+
+    def get(self, host: str) -> CircuitBreaker:
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(host, self.failure_threshold, self.reset_timeout)
+            self._breakers[host] = breaker
+        return breaker
+
+    def for_url(self, url: str) -> CircuitBreaker:
+        return self.get(urlparse(str(url)).netloc.lower())
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        return [b.snapshot() for b in sorted(self._breakers.values(), key=lambda b: b.host)]
+
+
+breakers = BreakerRegistry()
+
+
+# SDK errors for an unreachable or timed-out host (openai, google-api-core); matched by
+# name so this module does not import every provider's SDK
+_HOST_ERROR_NAMES = frozenset({"APIConnectionError", "APITimeoutError", "DeadlineExceeded", "ServiceUnavailable"})
+
+
+def is_host_failure(exc: BaseException) -> bool:
+    """Whether an error should count against the host's breaker.
+
+    Only transport errors, timeouts, 429 (throttled: back off like for an
+    outage) and 5xx do. Any other 4xx, an unparseable answer or a schema
+    validation error means the host is up and answering.
+    """
+    while exc is not None:
+        if isinstance(exc, (httpx.TransportError, asyncio.TimeoutError, TimeoutError, ConnectionError)):
+            return True
+        if any(cls.__name__ in _HOST_ERROR_NAMES for cls in type(exc).__mro__):
+            return True
+        status = getattr(exc, "status_code", None) or getattr(exc, "code", None)
+        if isinstance(status, int) and (status == 429 or status >= 500):
+            return True
+        # LangChain wraps provider errors; look at what it wrapped
+        exc = exc.__cause__
+    return False
+
+
+def default_timeout() -> httpx.Timeout:
+    return httpx.Timeout(settings.HTTP_TIMEOUT_SECONDS, connect=settings.HTTP_CONNECT_TIMEOUT_SECONDS)
+
+
+def _retry_after(resp: httpx.Response, cap: float) -> float:
+    """Seconds requested by a numeric Retry-After header (throttling), capped."""
+    try:
+        return min(cap, float(resp.headers.get("retry-after", 0)))
+    except ValueError:
+        return 0.0
+
+
+async def _hedged(client: httpx.AsyncClient, method: str, url: str, hedge_after: float, **kwargs) -> httpx.Response:
+    """Send the request; if no answer within `hedge_after`, send a duplicate and take whichever finishes first."""
+    primary = asyncio.ensure_future(client.request(method, url, **kwargs))
+    pending = {primary}
+    error: Optional[BaseException] = None
+    # Everything after creating a task sits in the try: a cancelled caller must not leak it
+    try:
+        done, _ = await asyncio.wait(pending, timeout=hedge_after)
+        if done:
+            pending = set()
+            return primary.result()
+
+        pending.add(asyncio.ensure_future(client.request(method, url, **kwargs)))
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def request_with_resilience(
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    *,
+    policy: Optional[RetryPolicy] = None,
+    hedge_after: Optional[float] = None,
+    registry: Optional[BreakerRegistry] = None,
+    **kwargs,
+) -> httpx.Response:
+    """Issue an httpx request with retries, the host's circuit breaker and optional hedging.
+
+    Transport errors and `policy.retry_statuses` count as failures; other
+    responses (including 4xx) are returned to the caller as-is. After the last
+    attempt the final response is returned, or the final error re-raised.
+    """
+    policy = policy or RetryPolicy()
+    breaker = (registry or breakers).for_url(url)
+    attempts = max(1, policy.attempts)
+
+    for attempt in range(1, attempts + 1):
+        if not breaker.allow():
+            raise CircuitOpenError(breaker.host, breaker.retry_in())
+
+        try:
+            if hedge_after:
+                resp = await _hedged(client, method, url, hedge_after, **kwargs)
+            else:
+                resp = await client.request(method, url, **kwargs)
+        except httpx.TransportError as e:
+            breaker.record_failure()
+            if attempt == attempts:
+                raise
+            logger.info("Retrying %s %s after %r (attempt %s/%s)", method, url, e, attempt, attempts)
+            delay = policy.backoff(attempt)
+        else:
+            if resp.status_code not in policy.retry_statuses:
+                breaker.record_success()
+                return resp
+            breaker.record_failure()
+            if attempt == attempts:
+                return resp
+            logger.info("Retrying %s %s after HTTP %s (attempt %s/%s)", method, url, resp.status_code, attempt, attempts)
+            delay = max(policy.backoff(attempt), _retry_after(resp, policy.max_delay))
+
+        await asyncio.sleep(delay)
+
+    raise AssertionError("unreachable")
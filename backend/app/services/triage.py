@@ -0,0 +1,233 @@
+"""Local pre-scoring (triage) before the LLM analyzer.
+
+A hashed-feature linear model over title tokens, domain, source and the
+incoming metric predicts `analysis_score` and `analysis_category`. It is
+trained offline from stored LLM analyses:
+
+    cd backend
+    python -m app.services.triage train
+
+During ingestion only items whose pre-score clears `TRIAGE_THRESHOLD` (and,
+if `TRIAGE_TOP_K` is set, the best K of those) go to `LLMAnalyzer`; the rest
+get a provisional analysis marked with `PROVISIONAL_MODEL` that can be
+upgraded later.
+"""
+import argparse
+import hashlib
+import logging
+import math
+import os
+import re
+from typing import List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+import numpy as np
+
+from app.core.config import settings
+from app.schemas.article import AIAnalysis, ArticleCreate
+
+logger = logging.getLogger(__name__)
+
+PROVISIONAL_MODEL = "local-triage"
+
+N_FEATURES = 2 ** 11
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _bucket(key: str) -> int:
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") % (N_FEATURES - 2)
+
+
+def featurize(title: str, url: str, source: str, metric: int) -> np.ndarray:
+    """Dense hashed feature vector. The last two slots are bias and log-metric."""
+    x = np.zeros(N_FEATURES, dtype=np.float64)
+    tokens = _TOKEN_RE.findall((title or "").lower())
+    keys = [f"t:{t}" for t in tokens]
+    keys += [f"b:{a}_{b}" for a, b in zip(tokens, tokens[1:])]
+    keys.append(f"d:{urlparse(url or '').netloc.lower()}")
+    keys.append(f"s:{source}")
+    for key in keys:
+        x[_bucket(key)] += 1.0
+    # Scale token counts so long titles don't dominate
+    norm = math.sqrt(len(keys)) or 1.0
+    x[: N_FEATURES - 2] /= norm
+    x[N_FEATURES - 2] = 1.0
+    x[N_FEATURES - 1] = math.log1p(max(metric or 0, 0))
+    return x
+
+
+class TriageModel:
+    def __init__(self, weights: np.ndarray, categories: List[str]):
+        # weights[:, 0] predicts the score; weights[:, 1:] are one-vs-rest category scores
+        self.weights = weights
+        self.categories = categories
+
+    def predict(self, items: Sequence[ArticleCreate]) -> Tuple[np.ndarray, List[str]]:
+        if not items:
+            return np.zeros(0), []
+        X = np.stack([featurize(i.title, i.url, i.source, i.current_metric_value) for i in items])
+        out = X @ self.weights
+        scores = np.clip(out[:, 0], 0, 100)
+        if self.categories:
+            categories = [self.categories[j] for j in out[:, 1:].argmax(axis=1)]
+        else:
+            categories = ["Uncategorized"] * len(items)
+        return scores, categories
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez_compressed(path, weights=self.weights, categories=np.array(self.categories, dtype=str))
+
+    @classmethod
+    def load(cls, path: str) -> Optional["TriageModel"]:
+        if not os.path.exists(path):
+            return None
+        data = np.load(path)
+        return cls(data["weights"], [str(c) for c in data["categories"]])
+
+    @classmethod
+    def fit(
+        cls,
+        rows: Sequence[Tuple[str, str, str, int, int, str]],
+        l2: float = 1.0,
+        chunk_size: int = 2000,
+    ) -> "TriageModel":
+        """Ridge regression on (title, url, source, metric, score, category) rows.
+
+        Normal equations are accumulated chunk by chunk, so memory is bounded by
+        N_FEATURES^2 rather than by the number of training rows.
+        """
+        categories = sorted({r[5] for r in rows})
+        cat_index = {c: i for i, c in enumerate(categories)}
+        XtX = np.zeros((N_FEATURES, N_FEATURES))
+        XtY = np.zeros((N_FEATURES, 1 + len(categories)))
+
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            X = np.stack([featurize(t, u, s, m) for t, u, s, m, _, _ in chunk])
+            Y = np.zeros((len(chunk), 1 + len(categories)))
+            Y[:, 0] = [r[4] for r in chunk]
+            Y[np.arange(len(chunk)), 1 + np.array([cat_index[r[5]] for r in chunk])] = 1.0
+            XtX += X.T @ X
+            XtY += X.T @ Y
+
+        XtX[np.diag_indices(N_FEATURES)] += l2
+        return cls(np.linalg.solve(XtX, XtY), categories)
+
+
+class Triage:
+    """Decides which new items are worth an LLM call."""
+
+    def __init__(self, model_path: str = settings.TRIAGE_MODEL_PATH):
+        self.model_path = model_path
+        self.model = TriageModel.load(model_path) if settings.TRIAGE_ENABLED else None
+        if settings.TRIAGE_ENABLED and self.model is None:
+            logger.info("No triage model at %s; every new item goes to the LLM", model_path)
+
+    def select(
+        self, items: Sequence[ArticleCreate], budget: Optional[int] = None
+    ) -> Tuple[List[bool], List[Optional[AIAnalysis]]]:
+        """Return, per item, whether to send it to the LLM and its provisional analysis otherwise.
+
+        `budget` caps how many of `items` may go to the LLM (the best-scoring win); the
+        streaming ingest passes what is left of TRIAGE_TOP_K for the run. None = TRIAGE_TOP_K.
+        """
+        if self.model is None or not items:
+            return [True] * len(items), [None] * len(items)
+
+        if budget is None:
+            budget = settings.TRIAGE_TOP_K if settings.TRIAGE_TOP_K > 0 else len(items)
+        scores, categories = self.model.predict(items)
+        chosen = scores >= settings.TRIAGE_THRESHOLD
+        if chosen.sum() > budget:
+            ranked = [i for i in np.argsort(-scores, kind="stable") if chosen[i]]
+            chosen[:] = False
+            chosen[ranked[: max(budget, 0)]] = True
+
+        provisional: List[Optional[AIAnalysis]] = []
+        for item, send, score, category in zip(items, chosen, scores, categories):
+            provisional.append(None if send else self.provisional_analysis(item, int(round(score)), category))
+
+        logger.info("Triage: %s/%s new items sent to the LLM", int(chosen.sum()), len(items))
+        return chosen.tolist(), provisional
+
+    @staticmethod
+    def provisional_analysis(item: ArticleCreate, score: int, category: str) -> AIAnalysis:
+        return AIAnalysis(
+            summary=f"Provisional local pre-score for: {item.title}.",
+            category=category,
+            score=score,
+            reasoning="Scored by the local triage model below the LLM threshold; pending full analysis.",
+            tags=["Provisional"],
+        )
+
+
+def load_training_rows(db) -> List[Tuple[str, str, str, int, int, str]]:
+    """(title, url, source, first metric, score, category) for every LLM-analyzed article.
+
+    Provisional (triage) and mock analyses are not labels: training on them
+    would teach the model its own guesses or random mock scores. Rows from
+    before analysis_model was stored (NULL) are kept unless they carry the
+    mock analyzer's reasoning.
+    """
+    from sqlalchemy import func
+
+    from app.db.models import ArticleModel, ArticleMetricModel
+    from app.services.analyzer import MOCK_MODEL, MOCK_REASONING
+
+    first_metric = (
+        db.query(ArticleMetricModel.article_id, func.min(ArticleMetricModel.id).label("metric_id"))
+        .group_by(ArticleMetricModel.article_id)
+        .subquery()
+    )
+    query = (
+        db.query(
+            ArticleModel.title,
+            ArticleModel.url,
+            ArticleModel.source,
+            func.coalesce(ArticleMetricModel.metric_value, 0),
+            ArticleModel.analysis_score,
+            func.coalesce(ArticleModel.analysis_category, "Uncategorized"),
+        )
+        .outerjoin(first_metric, first_metric.c.article_id == ArticleModel.id)
+        .outerjoin(ArticleMetricModel, ArticleMetricModel.id == first_metric.c.metric_id)
+        .filter(ArticleModel.analysis_score.isnot(None))
+        .filter(
+            (ArticleModel.analysis_model.is_(None) & ArticleModel.analysis_reasoning.is_distinct_from(MOCK_REASONING))
+            | (ArticleModel.analysis_model.notin_([PROVISIONAL_MODEL, MOCK_MODEL]))
+        )
+    )
+    return [tuple(r) for r in query.all()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Train the local triage pre-scorer from stored analyses.")
+    parser.add_argument("command", choices=["train"])
+    parser.add_argument("--output", default=settings.TRIAGE_MODEL_PATH)
+    parser.add_argument("--l2", type=float, default=1.0)
+    args = parser.parse_args()
+
+    from app.db.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        rows = load_training_rows(db)
+    finally:
+        db.close()
+
+    if not rows:
+        print("No analyzed articles to train on.")
+        return
+
+    model = TriageModel.fit(rows, l2=args.l2)
+    scores, _ = model.predict([
+        ArticleCreate(title=t, url=u, source=s, source_id="", current_metric_value=m) for t, u, s, m, _, _ in rows
+    ])
+    mae = float(np.mean(np.abs(scores - np.array([r[4] for r in rows]))))
+    model.save(args.output)
+    print(f"Trained on {len(rows)} articles ({len(model.categories)} categories), train MAE={mae:.1f}; saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
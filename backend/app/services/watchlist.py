@@ -0,0 +1,384 @@
+"""Watchlists: saved alert rules checked against articles as they are ingested.
+
+A rule is a conjunction of optional conditions: category in `categories`, any
+of `tags`, listed on any of `sources`, any of `keywords` (whole words or
+phrases in title + summary), plus `min_score`, `min_platforms` and `min_heat`.
+
+`RuleIndex` compiles the enabled rules into inverted indexes. Each rule is
+filed under one anchor dimension: its keywords, else tags, else categories,
+else sources. Only threshold-only rules land in the always-checked list. An
+article looks up its own tokens, tags, category and platforms, then fully
+evaluates just the rules those lookups return. Matching cost therefore
+follows the article and the rules that could plausibly match it, not the
+total number of rules.
+
+Matches go to `notifications`, once per rule and article. Ingestion only
+records them. A scheduler job (`deliver_pending`, every
+`WATCHLIST_DELIVERY_SECONDS`) POSTs them as JSON to the rule's `webhook_url`
+or `WATCHLIST_WEBHOOK_URL`, so a slow webhook never holds up ingestion. Failed
+deliveries stay pending and are retried on later passes, up to
+`WATCHLIST_DELIVERY_ATTEMPTS` times. Only `WATCHLIST_WEBHOOK_URL` and hosts on
+`WATCHLIST_WEBHOOK_ALLOWED_HOSTS` are ever called (`app.core.webhooks`).
+
+`heat_score` is NULL until the heat job has seen an article's metrics, so
+rules with `min_heat` rarely match at ingest time. They are evaluated again
+for every article the heat job re-scores (`record_heat_matches`).
+"""
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+
+import httpx
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.text import matchable_keyword, tokenize
+from app.core.webhooks import webhook_allowed
+from app.db.models import ArticleModel, ArticleSourceModel, NotificationModel, WatchlistRuleModel
+from app.services.resilience import RetryPolicy, request_with_resilience
+
+logger = logging.getLogger(__name__)
+
+# Pending notifications sent per delivery pass
+_DELIVERY_BATCH = 500
+
+
+def _folded(values: Iterable[Optional[str]]) -> FrozenSet[str]:
+    return frozenset(v.strip().casefold() for v in values if v and v.strip())
+
+
+@dataclass
+class Subject:
+    """What a rule can look at for one article."""
+
+    article_id: int
+    title: str
+    summary: str
+    category: Optional[str]
+    tags: FrozenSet[str]
+    sources: FrozenSet[str]
+    score: Optional[int]
+    platforms_count: int
+    heat_score: Optional[float]
+    tokens: FrozenSet[str] = field(init=False)
+    # Space-padded token stream for phrase matching
+    text: str = field(init=False)
+
+    def __post_init__(self):
+        words = tokenize(self.title) + tokenize(self.summary)
+        self.tokens = frozenset(words)
+        self.text = f" {' '.join(words)} "
+
+
+@dataclass(frozen=True)
+class Rule:
+    id: int
+    name: str
+    categories: FrozenSet[str] = frozenset()
+    tags: FrozenSet[str] = frozenset()
+    sources: FrozenSet[str] = frozenset()
+    keywords: Tuple[Tuple[str, ...], ...] = ()
+    min_score: Optional[int] = None
+    min_platforms: Optional[int] = None
+    min_heat: Optional[float] = None
+    webhook_url: Optional[str] = None
+    # False when a stored condition compiled to nothing (e.g. keywords saved before validation)
+    matchable: bool = True
+
+    @classmethod
+    def from_model(cls, row: WatchlistRuleModel) -> "Rule":
+        keywords = tuple(tuple(tokenize(k)) for k in row.keywords or [] if matchable_keyword(k))
+        rule = cls(
+            id=row.id,
+            name=row.name,
+            categories=_folded(row.categories or []),
+            tags=_folded(row.tags or []),
+            sources=_folded(row.sources or []),
+            keywords=keywords,
+            min_score=row.min_score,
+            min_platforms=row.min_platforms,
+            min_heat=row.min_heat,
+            webhook_url=row.webhook_url,
+        )
+        # A condition that lost all its values must not turn into "no condition": that matches everything
+        lost = [name for name in ("categories", "tags", "sources", "keywords")
+                if getattr(row, name) and not getattr(rule, name)]
+        if lost or not rule.has_conditions:
+            logger.warning("Watchlist rule %s (%r) can never match: unusable %s", row.id, row.name,
+                           ", ".join(lost) or "conditions")
+            return replace(rule, matchable=False)
+        return rule
+
+    @property
+    def has_conditions(self) -> bool:
+        return bool(self.categories or self.tags or self.sources or self.keywords) or any(
+            v is not None for v in (self.min_score, self.min_platforms, self.min_heat)
+        )
+
+    def matches(self, subject: Subject) -> bool:
+        if not self.matchable or not self.has_conditions:
+            return False
+        if self.categories and (subject.category or "").casefold() not in self.categories:
+            return False
+        if self.tags and self.tags.isdisjoint(subject.tags):
+            return False
+        if self.sources and self.sources.isdisjoint(subject.sources):
+            return False
+        if self.keywords and not any(f" {' '.join(p)} " in subject.text for p in self.keywords):
+            return False
+        if self.min_score is not None and (subject.score is None or subject.score < self.min_score):
+            return False
+        if self.min_platforms is not None and subject.platforms_count < self.min_platforms:
+            return False
+        if self.min_heat is not None and (subject.heat_score is None or subject.heat_score < self.min_heat):
+            return False
+        return True
+
+
+class RuleIndex:
+    """Enabled rules compiled into inverted indexes keyed by their anchor condition."""
+
+    def __init__(self, rules: Iterable[Rule]):
+        self.rules: Dict[int, Rule] = {}
+        self.by_keyword: Dict[str, List[Rule]] = defaultdict(list)
+        self.by_tag: Dict[str, List[Rule]] = defaultdict(list)
+        self.by_category: Dict[str, List[Rule]] = defaultdict(list)
+        self.by_source: Dict[str, List[Rule]] = defaultdict(list)
+        self.unanchored: List[Rule] = []
+        self.has_heat_rules = False
+        for rule in rules:
+            self.add(rule)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def add(self, rule: Rule) -> None:
+        if not rule.matchable or not rule.has_conditions:
+            return
+        self.rules[rule.id] = rule
+        self.has_heat_rules = self.has_heat_rules or rule.min_heat is not None
+        if rule.keywords:
+            # A phrase can only match where its longest (rarest) word does
+            for phrase in rule.keywords:
+                self.by_keyword[max(phrase, key=len)].append(rule)
+        elif rule.tags:
+            for tag in rule.tags:
+                self.by_tag[tag].append(rule)
+        elif rule.categories:
+            for category in rule.categories:
+                self.by_category[category].append(rule)
+        elif rule.sources:
+            for source in rule.sources:
+                self.by_source[source].append(rule)
+        else:
+            self.unanchored.append(rule)
+
+    def candidates(self, subject: Subject) -> List[Rule]:
+        found: Dict[int, Rule] = {}
+        lookups = (
+            (self.by_keyword, subject.tokens),
+            (self.by_tag, subject.tags),
+            (self.by_category, _folded([subject.category])),
+            (self.by_source, subject.sources),
+        )
+        for index, keys in lookups:
+            if not index:
+                continue
+            for key in keys:
+                for rule in index.get(key, ()):
+                    found[rule.id] = rule
+        for rule in self.unanchored:
+            found[rule.id] = rule
+        return list(found.values())
+
+    def match(self, subject: Subject) -> List[Rule]:
+        return [rule for rule in self.candidates(subject) if rule.matches(subject)]
+
+
+def load_subjects(db: Session, article_ids: Sequence[int]) -> List[Subject]:
+    """Two flat queries for a batch of articles (no per-article lazy loads)."""
+    if not article_ids:
+        return []
+    platforms: Dict[int, Set[str]] = defaultdict(set)
+    for article_id, source in db.execute(
+        select(ArticleSourceModel.article_id, ArticleSourceModel.source)
+        .where(ArticleSourceModel.article_id.in_(article_ids))
+    ):
+        platforms[article_id].add(source)
+
+    rows = db.execute(
+        select(
+            ArticleModel.id, ArticleModel.title, ArticleModel.analysis_summary, ArticleModel.analysis_category,
+            ArticleModel.analysis_tags, ArticleModel.source, ArticleModel.analysis_score,
+            ArticleModel.platforms_count, ArticleModel.heat_score,
+        ).where(ArticleModel.id.in_(article_ids))
+    ).all()
+    return [
+        Subject(
+            article_id=r.id,
+            title=r.title or "",
+            summary=r.analysis_summary or "",
+            category=r.analysis_category,
+            tags=_folded(r.analysis_tags or []),
+            sources=_folded(platforms.get(r.id) or [r.source]),
+            score=r.analysis_score,
+            platforms_count=r.platforms_count or 1,
+            heat_score=r.heat_score,
+        )
+        for r in rows
+    ]
+
+
+class Watchlists:
+    """Process-wide compiled rule index, rebuilt whenever the stored rules change."""
+
+    def __init__(self):
+        self._index: Optional[RuleIndex] = None
+        self._version: Optional[Tuple[Any, ...]] = None
+
+    def invalidate(self) -> None:
+        self._index = None
+
+    def index(self, db: Session) -> RuleIndex:
+        # Rules may be edited through another worker: compare a cheap fingerprint every time
+        version = tuple(db.execute(
+            select(func.count(WatchlistRuleModel.id), func.max(WatchlistRuleModel.id), func.max(WatchlistRuleModel.updated_at))
+        ).one())
+        if self._index is None or version != self._version:
+            rows = db.scalars(select(WatchlistRuleModel).where(WatchlistRuleModel.enabled.is_(True))).all()
+            self._index = RuleIndex(Rule.from_model(r) for r in rows)
+            self._version = version
+            logger.info("Compiled %s watchlist rules", len(self._index))
+        return self._index
+
+    def record_matches(self, db: Session, article_ids: Sequence[int], heat_rules_only: bool = False) -> int:
+        """Match a batch of just-written articles and store new notifications; returns the match count."""
+        index = self.index(db)
+        if not len(index) or (heat_rules_only and not index.has_heat_rules):
+            return 0
+        values = [
+            {
+                "rule_id": rule.id,
+                "article_id": subject.article_id,
+                "created_at": datetime.utcnow(),
+                "webhook_url": rule.webhook_url or settings.WATCHLIST_WEBHOOK_URL or None,
+                "attempts": 0,
+            }
+            for subject in load_subjects(db, article_ids)
+            for rule in index.match(subject)
+            if not heat_rules_only or rule.min_heat is not None
+        ]
+        if values:
+            insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+            db.execute(insert(NotificationModel).values(values).on_conflict_do_nothing(
+                index_elements=["rule_id", "article_id"],
+            ))
+            db.commit()
+        return len(values)
+
+    def record_heat_matches(self, db: Session, since_cursor: int, batch_size: int = 1000) -> int:
+        """Re-check `min_heat` rules against articles re-scored after change cursor `since_cursor`."""
+        if not self.index(db).has_heat_rules:
+            return 0
+        ids = db.scalars(
+            select(ArticleModel.id)
+            .where(ArticleModel.change_seq > since_cursor, ArticleModel.heat_score.isnot(None))
+            .order_by(ArticleModel.id)
+        ).all()
+        return sum(
+            self.record_matches(db, ids[start:start + batch_size], heat_rules_only=True)
+            for start in range(0, len(ids), batch_size)
+        )
+
+
+async def deliver_pending(db: Session, client: Optional[httpx.AsyncClient] = None) -> int:
+    """POST undelivered notifications, one request per webhook; returns how many were delivered."""
+    pending = db.execute(
+        select(
+            NotificationModel.id, NotificationModel.webhook_url, NotificationModel.created_at,
+            WatchlistRuleModel.id.label("rule_id"), WatchlistRuleModel.name,
+            ArticleModel.id.label("article_id"), ArticleModel.title, ArticleModel.url,
+            ArticleModel.analysis_category, ArticleModel.analysis_score,
+            ArticleModel.platforms_count, ArticleModel.heat_score,
+        )
+        .join(WatchlistRuleModel, WatchlistRuleModel.id == NotificationModel.rule_id)
+        .join(ArticleModel, ArticleModel.id == NotificationModel.article_id)
+        .where(
+            NotificationModel.delivered_at.is_(None),
+            NotificationModel.webhook_url.isnot(None),
+            NotificationModel.attempts < settings.WATCHLIST_DELIVERY_ATTEMPTS,
+        )
+        .order_by(NotificationModel.id)
+        .limit(_DELIVERY_BATCH)
+    ).all()
+    if not pending:
+        return 0
+
+    by_url: Dict[str, List[Any]] = defaultdict(list)
+    for row in pending:
+        by_url[row.webhook_url].append(row)
+
+    delivered = 0
+    owns_client = client is None
+    client = client or httpx.AsyncClient(timeout=settings.WATCHLIST_WEBHOOK_TIMEOUT_SECONDS)
+    try:
+        for url, rows in by_url.items():
+            ids = [r.id for r in rows]
+            if not webhook_allowed(url):
+                # Stored before validation or since dropped from the allowlist: never POST, don't retry
+                logger.warning("Watchlist webhook %s is not allowed; dropping %s notifications", url, len(ids))
+                db.execute(
+                    update(NotificationModel)
+                    .where(NotificationModel.id.in_(ids))
+                    .values(attempts=settings.WATCHLIST_DELIVERY_ATTEMPTS, last_error="webhook host not allowed")
+                )
+                continue
+            body = {
+                "event": "watchlist.match",
+                "matches": [
+                    {
+                        "notification_id": r.id,
+                        "rule": {"id": r.rule_id, "name": r.name},
+                        "article": {
+                            "id": r.article_id, "title": r.title, "url": r.url, "category": r.analysis_category,
+                            "score": r.analysis_score, "platforms_count": r.platforms_count, "heat_score": r.heat_score,
+                        },
+                        "matched_at": r.created_at.isoformat(),
+                    }
+                    for r in rows
+                ],
+            }
+            error = None
+            try:
+                # One attempt here; the notification itself is retried with the next batch
+                resp = await request_with_resilience(client, "POST", url, json=body, policy=RetryPolicy(attempts=1),
+                                                     follow_redirects=False)
+                if resp.status_code >= 400:
+                    error = f"HTTP {resp.status_code}"
+            except Exception as e:
+                error = repr(e)
+
+            if error is None:
+                values: Dict[str, Any] = {"delivered_at": datetime.utcnow(), "last_error": None}
+                delivered += len(ids)
+            else:
+                logger.warning("Watchlist webhook %s failed for %s notifications: %s", url, len(ids), error)
+                values = {"last_error": error}
+            db.execute(
+                update(NotificationModel)
+                .where(NotificationModel.id.in_(ids))
+                .values(attempts=NotificationModel.attempts + 1, **values)
+            )
+        db.commit()
+    finally:
+        if owns_client:
+            await client.aclose()
+    return delivered
+
+
+watchlists = Watchlists()
@@ -0,0 +1,108 @@
+"""Microbenchmark: per-article cost of the /feed serialization paths.
+
+Compares the legacy path (Pydantic `Article` per row, re-validated against
+`response_model`, encoded by FastAPI) with the fast path in
+`app.services.feed_serializer`. Runs on synthetic rows, no database needed.
+
+    cd backend
+    python -m scripts.bench_feed_serialization --articles 3000
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.schemas.article import Article, AIAnalysis, DeepSeekEvaluation, MetricPoint, SourceRef
+from app.services.feed_serializer import build_article_payloads, dumps
+
+
+def make_rows(n_articles: int, metrics_per_article: int, evals_per_article: int):
+    now = datetime(2024, 5, 1, 10, 0, 0, 123456)
+    articles, metrics, evals, sources = [], [], [], []
+    for i in range(1, n_articles + 1):
+        articles.append((
+            i, f"Product {i}", f"https://example.com/p/{i}", "Hacker News", str(i), now,
+            2, 40.0 + i % 60, now, now, 3, now, "A concise summary of the product.", "DevTool", 70 + i % 30,
+            "Reasoning text for the score.", ["AI", "Agents", "DevTool"],
+        ))
+        sources.append((i, "Hacker News", str(i)))
+        sources.append((i, "Product Hunt", f"p-{i}"))
+        for m in range(metrics_per_article):
+            metrics.append((i, now - timedelta(hours=m), 100 - m, m + 1))
+        for v in range(1, evals_per_article + 1):
+            evals.append((
+                i, v, "deepseek-chat", 72,
+                {"overall_score": 72, "product_view": "pv", "investor_view": "iv", "market_view": "mv", "recommendation": "rec"},
+                None, now,
+            ))
+    return articles, metrics, evals, sources
+
+
+def legacy_path(articles, metrics, evals, sources) -> bytes:
+    """Approximates `_db_to_schema` + FastAPI's response_model handling."""
+    by_metric, by_eval, by_source = {}, {}, {}
+    for row in metrics:
+        by_metric.setdefault(row[0], []).append(row)
+    for row in evals:
+        by_eval.setdefault(row[0], []).append(row)
+    for row in sources:
+        by_source.setdefault(row[0], []).append(row)
+
+    items = []
+    for row in articles:
+        items.append(Article(
+            id=row[0], title=row[1], url=row[2], source=row[3], source_id=row[4], publish_date=row[5],
+            first_seen_at=row[8], last_seen_at=row[9], seen_count=row[10],
+            sources=[SourceRef(source=s[1], source_id=s[2]) for s in by_source.get(row[0], [])],
+            platforms_count=row[6], heat_score=row[7], analyzed_at=row[11],
+            analysis=AIAnalysis(summary=row[12], category=row[13], score=row[14], reasoning=row[15], tags=row[16]),
+            metrics_history=[MetricPoint(recorded_at=m[1], value=m[2], rank=m[3]) for m in by_metric.get(row[0], [])],
+            evaluations=[
+                DeepSeekEvaluation(
+                    version=e[1], model=e[2], overall_score=e[4]["overall_score"], product_view=e[4]["product_view"],
+                    investor_view=e[4]["investor_view"], market_view=e[4]["market_view"],
+                    recommendation=e[4]["recommendation"], full_evaluation="", created_at=e[6],
+                )
+                for e in by_eval.get(row[0], [])
+            ],
+        ))
+    # FastAPI validates the returned objects against response_model, then encodes
+    validated = TypeAdapter(List[Article]).validate_python(items, from_attributes=True)
+    return json.dumps(jsonable_encoder(validated), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def fast_path(articles, metrics, evals, sources) -> bytes:
+    return dumps(build_article_payloads(articles, metrics, evals, sources))
+
+
+def bench(fn, rows, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*rows)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=3000)
+    parser.add_argument("--metrics", type=int, default=10, help="metric points per article")
+    parser.add_argument("--evals", type=int, default=1, help="evaluations per article")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = make_rows(args.articles, args.metrics, args.evals)
+    assert json.loads(legacy_path(*rows)) == json.loads(fast_path(*rows))
+
+    for name, fn in (("legacy", legacy_path), ("fast", fast_path)):
+        seconds = bench(fn, rows, args.repeat)
+        print(f"{name:>6}: {seconds * 1000:8.1f} ms total, {seconds / args.articles * 1e6:7.1f} us/article")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Microbenchmark: the array part of the heat job on synthetic metric points.
+
+Times `listing_heat` + `article_heat` (what `refresh_heat` does between loading
+the window and writing back) for a few sources of different scale. No database
+needed.
+
+    cd backend
+    python -m scripts.bench_heat --rows 5000000 --articles 200000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.services.heat import SourceMetrics, article_heat, listing_heat
+
+# name, share of rows, value distribution (log-normal mu, sigma); sigma 0 = constant zeros
+SOURCES = [
+    ("Hacker News", 0.5, (3.0, 1.5)),
+    ("Hugging Face", 0.3, (2.0, 2.0)),
+    ("Product Hunt", 0.1, (0.0, 0.0)),
+    ("BetaList", 0.1, (0.0, 0.0)),
+]
+
+
+def make_metrics(rows: int, articles: int, window_days: int, seed: int):
+    rng = np.random.default_rng(seed)
+    metrics = []
+    for name, share, (mu, sigma) in SOURCES:
+        n = int(rows * share)
+        values = rng.lognormal(mu, sigma, n) if sigma else np.zeros(n)
+        metrics.append(SourceMetrics(
+            name,
+            article_ids=rng.integers(1, articles + 1, n),
+            recorded_at=rng.uniform(0, window_days * 86400.0, n),
+            values=np.floor(values),
+        ))
+    return metrics
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000, help="metric points in the window")
+    parser.add_argument("--articles", type=int, default=100_000)
+    parser.add_argument("--window-days", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    metrics = make_metrics(args.rows, args.articles, args.window_days, args.seed)
+    best = float("inf")
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        ids, heat = article_heat([listing_heat(m) for m in metrics])
+        best = min(best, time.perf_counter() - start)
+    print(f"{args.rows} metric rows -> {len(ids)} articles: {best * 1000:.0f} ms "
+          f"({best / args.rows * 1e9:.0f} ns/row), heat p50={np.median(heat):.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""Local stand-ins for every upstream the backend talks to.
+
+One process serves synthetic Hacker News / Product Hunt / BetaList / Hugging
+Face feeds plus an OpenAI-compatible `/v1/chat/completions` for `LLMAnalyzer`
+and `DeepSeekEvaluator`, with injectable latency, error rate and throttling.
+
+    cd backend
+    python -m scripts.fake_upstreams --items 200 --latency-ms 80 --error-rate 0.02 \\
+        --llm-latency-ms 600 --llm-rate-limit 20
+
+It prints the environment to start the API with so nothing leaves the machine,
+e.g. `HN_API_BASE_URL=http://127.0.0.1:8900/hn/v0 ... uvicorn app.main:app`.
+Drive load with `python -m scripts.load_test`.
+
+`GET /_stats` returns request counts per upstream and status; `PUT /_faults`
+(JSON body, same fields as `Faults`, keyed by "feeds" or "llm") changes fault
+injection while running.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from typing import Any, Dict, List, Optional
+from xml.sax.saxutils import escape
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+WORDS = [
+    "agent", "copilot", "vector", "realtime", "open-source", "privacy", "browser", "terminal", "notebook",
+    "voice", "video", "sql", "observability", "billing", "compliance", "robotics", "edge", "search",
+    "design", "workflow", "security", "analytics", "health", "finance", "education", "music",
+]
+CATEGORIES = ["GenAI", "DevTool", "SaaS", "FinTech", "HealthTech", "Consumer"]
+
+
+@dataclass
+class Faults:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0  # uniform extra delay in [0, jitter_ms]
+    error_rate: float = 0.0  # share of requests answered with 503
+    rate_limit: float = 0.0  # requests/second before answering 429 (0 = unlimited)
+
+
+class TokenBucket:
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class Catalog:
+    """Deterministic synthetic items. Each feed request slides the window by `churn` items."""
+
+    def __init__(self, items: int, churn: int, overlap: float, seed: int):
+        self.items = items
+        self.churn = churn
+        self.overlap = overlap
+        self.seed = seed
+        self.offsets: Counter = Counter()
+
+    def window(self, source: str, limit: Optional[int] = None) -> List[int]:
+        start = self.offsets[source]
+        self.offsets[source] += self.churn
+        return list(range(start + 1, start + 1 + min(limit or self.items, self.items)))
+
+    def product(self, n: int, source: str) -> Dict[str, Any]:
+        rng = random.Random(self.seed * 1_000_003 + n)
+        name = "".join(w.capitalize() for w in rng.sample(WORDS, 2)).replace("-", "") + str(n)
+        # A share of products show up on every platform with the same URL, to exercise dedupe
+        shared = rng.random() < self.overlap
+        url = f"https://{name.lower()}.example.com/" if shared else f"https://{source}.example.com/{name.lower()}"
+        return {
+            "n": n,
+            "name": name,
+            "url": url,
+            "title": f"{name}: {' '.join(rng.sample(WORDS, 4))}",
+            "score": int(rng.paretovariate(1.2) * 10),
+            "published": datetime(2024, 5, 1, tzinfo=timezone.utc) + timedelta(minutes=n),
+        }
+
+
+def _analysis_json(title: str) -> Dict[str, Any]:
+    rng = random.Random(title)
+    return {
+        "summary": f"{title[:60]} automates a common workflow for small teams.",
+        "category": rng.choice(CATEGORIES),
+        "score": rng.randint(30, 95),
+        "reasoning": "Synthetic analysis from the local fake LLM.",
+        "tags": rng.sample(WORDS, 3),
+    }
+
+
+def _evaluation_json(title: str) -> Dict[str, Any]:
+    rng = random.Random("eval:" + title)
+    return {
+        "overall_score": rng.randint(30, 95),
+        "product_view": "Clear wedge, thin moat.",
+        "investor_view": "Early; watch retention.",
+        "market_view": "Crowded but growing.",
+        "recommendation": "Track for two weeks.",
+    }
+
+
+def _chat_content(body: Dict[str, Any]) -> str:
+    messages = body.get("messages") or []
+    system = next((m.get("content", "") for m in messages if m.get("role") == "system"), "")
+    user = next((m.get("content", "") for m in messages if m.get("role") == "user"), "")
+    title = user.split("\n", 1)[0].removeprefix("Title: ")
+    if "venture capital analyst" in system:
+        return json.dumps(_analysis_json(title))
+    if (body.get("response_format") or {}).get("type") == "json_object":
+        return json.dumps(_evaluation_json(title))
+    return "\n\n".join(
+        f"{section}: synthetic narrative paragraph about {title}."
+        for section in ("Product view", "Investor view", "Market view", "Recommendation")
+    )
+
+
+def create_app(
+    catalog: Catalog,
+    feed_faults: Optional[Faults] = None,
+    llm_faults: Optional[Faults] = None,
+    seed: int = 0,
+) -> FastAPI:
+    app = FastAPI(title="Fake upstreams")
+    faults = {"feeds": feed_faults or Faults(), "llm": llm_faults or Faults()}
+    buckets: Dict[str, TokenBucket] = {}
+    stats: Counter = Counter()
+    rng = random.Random(seed)
+
+    @app.middleware("http")
+    async def inject_faults(request: Request, call_next):
+        path = request.url.path
+        if path.startswith("/_"):
+            return await call_next(request)
+        group = "llm" if path.startswith("/v1/") else "feeds"
+        upstream = path.strip("/").split("/", 1)[0]
+        f = faults[group]
+
+        if f.rate_limit > 0:
+            bucket = buckets.get(group)
+            if bucket is None or bucket.rate != f.rate_limit:
+                bucket = buckets[group] = TokenBucket(f.rate_limit)
+            if not bucket.take():
+                stats[f"{upstream} 429"] += 1
+                return JSONResponse({"error": "rate limited"}, status_code=429, headers={"Retry-After": "1"})
+        delay = f.latency_ms + rng.uniform(0, f.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        if f.error_rate > 0 and rng.random() < f.error_rate:
+            stats[f"{upstream} 503"] += 1
+            return JSONResponse({"error": "injected failure"}, status_code=503)
+
+        response = await call_next(request)
+        stats[f"{upstream} {response.status_code}"] += 1
+        return response
+
+    @app.get("/_stats")
+    async def get_stats():
+        return {"requests": dict(sorted(stats.items())), "faults": {k: asdict(v) for k, v in faults.items()}}
+
+    @app.put("/_faults")
+    async def put_faults(body: Dict[str, Dict[str, float]]):
+        names = {f.name for f in fields(Faults)}
+        for group, values in body.items():
+            if group in faults:
+                faults[group] = Faults(**{**asdict(faults[group]), **{k: v for k, v in values.items() if k in names}})
+        return {k: asdict(v) for k, v in faults.items()}
+
+    # --- Hacker News (Firebase API) ---
+
+    @app.get("/hn/v0/topstories.json")
+    async def hn_top():
+        return catalog.window("hn")
+
+    @app.get("/hn/v0/item/{item_id}.json")
+    async def hn_item(item_id: int):
+        p = catalog.product(item_id, "hn")
+        return {
+            "id": item_id, "type": "story", "by": "fake", "title": p["title"], "url": p["url"],
+            "score": p["score"], "time": int(p["published"].timestamp()), "descendants": p["score"] // 3,
+        }
+
+    # --- Product Hunt (Atom) ---
+
+    @app.get("/producthunt/feed")
+    async def ph_feed():
+        entries = []
+        for n in catalog.window("producthunt"):
+            p = catalog.product(n, "producthunt")
+            entries.append(
+                f"<entry><id>tag:fake,{n}</id><title>{escape(p['title'])}</title>"
+                f"<link rel=\"alternate\" href=\"{escape(p['url'])}?ref=fake\"/>"
+                f"<published>{p['published'].isoformat()}</published></entry>"
+            )
+        body = f'<?xml version="1.0" encoding="UTF-8"?><feed xmlns="http://www.w3.org/2005/Atom">{"".join(entries)}</feed>'
+        return Response(body, media_type="application/atom+xml")
+
+    # --- BetaList (RSS) ---
+
+    @app.get("/betalist/rss")
+    @app.get("/betalist/startups/feed")
+    async def betalist_rss():
+        items = []
+        for n in catalog.window("betalist"):
+            p = catalog.product(n, "betalist")
+            items.append(
+                f"<item><title>{escape(p['title'])}</title><link>{escape(p['url'])}</link>"
+                f"<guid>betalist-{n}</guid><pubDate>{format_datetime(p['published'])}</pubDate></item>"
+            )
+        body = f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>BetaList</title>{"".join(items)}</channel></rss>'
+        return Response(body, media_type="application/rss+xml")
+
+    # --- Hugging Face spaces API ---
+
+    @app.get("/huggingface/api/spaces")
+    async def hf_spaces(limit: int = 20):
+        out = []
+        for n in catalog.window("huggingface", limit):
+            p = catalog.product(n, "huggingface")
+            out.append({"id": f"fake/{p['name'].lower()}", "likes": p["score"]})
+        return out
+
+    # --- OpenAI-compatible chat completions (LLMAnalyzer, DeepSeekEvaluator) ---
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        content = _chat_content(body)
+        prompt_tokens = sum(len(str(m.get("content", ""))) for m in body.get("messages") or []) // 4
+        return {
+            "id": f"chatcmpl-fake-{rng.getrandbits(32):08x}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(content) // 4,
+                      "total_tokens": prompt_tokens + len(content) // 4},
+        }
+
+    return app
+
+
+def backend_env(base: str) -> Dict[str, str]:
+    """Environment that points the backend at a fake upstream server at `base`."""
+    return {
+        "HN_API_BASE_URL": f"{base}/hn/v0",
+        "PRODUCT_HUNT_FEED_URL": f"{base}/producthunt/feed",
+        "BETALIST_RSS_URL": f"{base}/betalist/rss",
+        "BETALIST_FALLBACK_URL": f"{base}/betalist/startups/feed",
+        "HUGGINGFACE_SPACES_URL": f"{base}/huggingface/api/spaces",
+        "OPENAI_API_KEY": "fake",
+        "OPENAI_BASE_URL": f"{base}/v1",
+        "DEEPSEEK_API_KEY": "fake",
+        "DEEPSEEK_BASE_URL": f"{base}/v1",
+        "GOOGLE_API_KEY": "",
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve fake HN/PH/BetaList/HF feeds and an OpenAI-compatible LLM.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--items", type=int, default=100, help="items per feed response")
+    parser.add_argument("--churn", type=int, default=10, help="new items per feed request (0 = same items every time)")
+    parser.add_argument("--overlap", type=float, default=0.2, help="share of products listed on every platform")
+    parser.add_argument("--seed", type=int, default=0)
+    for prefix, label in (("", "feed"), ("llm-", "LLM")):
+        parser.add_argument(f"--{prefix}latency-ms", type=float, default=0.0, help=f"{label} base latency")
+        parser.add_argument(f"--{prefix}jitter-ms", type=float, default=0.0, help=f"{label} extra random latency")
+        parser.add_argument(f"--{prefix}error-rate", type=float, default=0.0, help=f"{label} share of 503 answers")
+        parser.add_argument(f"--{prefix}rate-limit", type=float, default=0.0, help=f"{label} requests/s before 429")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    feed_faults = Faults(args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit)
+    llm_faults = Faults(args.llm_latency_ms, args.llm_jitter_ms, args.llm_error_rate, args.llm_rate_limit)
+    app = create_app(Catalog(args.items, args.churn, args.overlap, args.seed), feed_faults, llm_faults, args.seed)
+
+    print("Start the backend against these fakes with:\n")
+    print(" \\\n".join(f"  {k}={v}" for k, v in backend_env(f"http://{args.host}:{args.port}").items()), "\\")
+    print("  uvicorn app.main:app --port 8000\n", flush=True)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""Load driver: hits /ingest, /feed and the evaluate routes concurrently and
+reports throughput and p50/p95/p99 latency per operation.
+
+Run the API against local fakes (see `scripts/fake_upstreams.py`) so results
+are reproducible and nothing leaves the machine:
+
+    cd backend
+    python -m scripts.load_test --duration 60 --concurrency 32 \\
+        --mix feed=10,delta=4,article=4,ingest=1,evaluate=2,evaluate_full=1
+
+`--json results.json` also writes the raw summary for comparing runs.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+DEFAULT_MIX = "feed=10,delta=4,article=4,ingest=1,evaluate=2,evaluate_full=1"
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence (q in 0..100)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(-(-q * len(sorted_values) // 100)))  # ceil
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in OPERATIONS:
+            raise SystemExit(f"Unknown operation {name!r}; choose from {', '.join(OPERATIONS)}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+class Driver:
+    def __init__(self, client: httpx.AsyncClient, ingest_limit: int, seed: int):
+        self.client = client
+        self.ingest_limit = ingest_limit
+        self.rng = random.Random(seed)
+        self.article_ids: List[int] = []
+        self.cursor = 0
+        # op -> [(latency seconds, ok)]
+        self.samples: Dict[str, List[Tuple[float, bool]]] = defaultdict(list)
+        self.errors: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def _article_id(self) -> Optional[int]:
+        return self.rng.choice(self.article_ids) if self.article_ids else None
+
+    async def op_feed(self) -> httpx.Response:
+        resp = await self.client.get("/feed", headers={"Accept-Encoding": "gzip"})
+        if resp.status_code == 200:
+            self.article_ids = [a["id"] for a in resp.json()] or self.article_ids
+            self.cursor = int(resp.headers.get("X-Change-Cursor", self.cursor))
+        return resp
+
+    async def op_delta(self) -> httpx.Response:
+        return await self.client.get("/feed/delta", params={"since": max(0, self.cursor - 50)})
+
+    async def op_article(self) -> Optional[httpx.Response]:
+        article_id = self._article_id()
+        return None if article_id is None else await self.client.get(f"/articles/{article_id}")
+
+    async def op_ingest(self) -> httpx.Response:
+        return await self.client.post("/ingest", params={"limit": self.ingest_limit})
+
+    async def op_evaluate(self) -> Optional[httpx.Response]:
+        article_id = self._article_id()
+        return None if article_id is None else await self.client.post(f"/articles/{article_id}/evaluate")
+
+    async def op_evaluate_full(self) -> Optional[httpx.Response]:
+        article_id = self._article_id()
+        return None if article_id is None else await self.client.post(f"/articles/{article_id}/evaluate/full")
+
+    async def call(self, op: str) -> None:
+        started = time.perf_counter()
+        try:
+            resp = await getattr(self, f"op_{op}")()
+        except httpx.HTTPError as e:
+            self.samples[op].append((time.perf_counter() - started, False))
+            self.errors[op][type(e).__name__] += 1
+            return
+        if resp is None:
+            return  # nothing to evaluate yet
+        ok = resp.status_code < 400
+        self.samples[op].append((time.perf_counter() - started, ok))
+        if not ok:
+            self.errors[op][str(resp.status_code)] += 1
+
+
+OPERATIONS = [name[len("op_"):] for name in vars(Driver) if name.startswith("op_")]
+
+
+async def run_load(args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+    mix = parse_mix(args.mix)
+    ops, weights = list(mix), list(mix.values())
+    # Expire idle connections before uvicorn's 5s keep-alive does, or reuse races show up as ReadErrors
+    limits = httpx.Limits(
+        max_connections=args.concurrency, max_keepalive_connections=args.concurrency, keepalive_expiry=4.0
+    )
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits, trust_env=False) as client:
+        driver = Driver(client, args.ingest_limit, args.seed)
+
+        # Warm-up: make sure there are articles to read and evaluate
+        await driver.call("feed")
+        if not driver.article_ids:
+            await driver.call("ingest")
+            await driver.call("feed")
+        driver.samples.clear()
+        driver.errors.clear()
+
+        deadline = time.perf_counter() + args.duration
+        started = time.perf_counter()
+
+        async def worker():
+            while time.perf_counter() < deadline:
+                await driver.call(driver.rng.choices(ops, weights)[0])
+
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    summary: Dict[str, Dict[str, float]] = {}
+    for op in ops + ["total"]:
+        if op == "total":
+            samples = [s for op_samples in driver.samples.values() for s in op_samples]
+        else:
+            samples = driver.samples.get(op, [])
+        if not samples:
+            continue
+        latencies = sorted(s[0] * 1000 for s in samples)
+        summary[op] = {
+            "requests": len(samples),
+            "errors": sum(1 for s in samples if not s[1]),
+            "rps": len(samples) / elapsed,
+            "p50_ms": percentile(latencies, 50),
+            "p95_ms": percentile(latencies, 95),
+            "p99_ms": percentile(latencies, 99),
+            "max_ms": latencies[-1],
+        }
+    for op, errs in driver.errors.items():
+        summary[op]["error_kinds"] = dict(errs)
+    return summary
+
+
+def print_report(summary: Dict[str, Dict[str, float]]) -> None:
+    header = f"{'operation':<14}{'requests':>9}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+    print(header)
+    print("-" * len(header))
+    for op, s in summary.items():
+        print(
+            f"{op:<14}{s['requests']:>9}{s['errors']:>8}{s['rps']:>9.1f}"
+            f"{s['p50_ms']:>9.1f}{s['p95_ms']:>9.1f}{s['p99_ms']:>9.1f}{s['max_ms']:>9.1f}"
+        )
+        if s.get("error_kinds"):
+            print(f"{'':<14}errors: {s['error_kinds']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Concurrent load test for the Market Radar API.")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000/api/v1")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"op=weight list (ops: {', '.join(OPERATIONS)})")
+    parser.add_argument("--ingest-limit", type=int, default=20)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the summary to this file")
+    args = parser.parse_args()
+
+    summary = asyncio.run(run_load(args))
+    print_report(summary)
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(summary, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
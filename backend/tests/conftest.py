@@ -0,0 +1,32 @@
+import os
+import tempfile
+
+# Importing app.api.routes creates tables on DATABASE_URL: keep tests off any real server
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db")
+
+import pytest  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.db.database import Base  # noqa: E402
+
+
+@pytest.fixture
+def session_factory():
+    """Session factory over a fresh in-memory SQLite database with the full schema.
+
+    StaticPool keeps one connection, so sessions opened from other threads
+    (exports, `asyncio.to_thread`) see the same database.
+    """
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
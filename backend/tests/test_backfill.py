@@ -0,0 +1,74 @@
+import argparse
+import asyncio
+import time
+
+import pytest
+
+from app.db.models import ArticleModel
+from app.schemas.article import AIAnalysis
+from app.services.backfill import Checkpoint, RateLimiter, analyze_batch, checkpoint_filters
+from app.services.embeddings import EmbeddingIndex
+
+
+class FakeAnalyzer:
+    model_name = "gpt-test"
+
+    async def analyze(self, article, fallback=True):
+        assert fallback is False
+        if article.title == "broken":
+            raise RuntimeError("upstream 500")
+        return AIAnalysis(summary=f"about {article.title}", category="DevTool", score=70, reasoning="r", tags=["x"])
+
+
+@pytest.mark.asyncio
+async def test_analyze_batch_bulk_updates_successes_and_reports_failures(db, tmp_path):
+    for i, title in enumerate(["agent", "broken", "editor"]):
+        db.add(ArticleModel(title=title, url=f"https://{i}.dev", source="Hacker News", source_id=str(i),
+                            analysis_model="local-triage", change_seq=i))
+    db.commit()
+
+    index = EmbeddingIndex(str(tmp_path), dim=32)
+    ok, failed = await analyze_batch(db, [1, 2, 3], FakeAnalyzer(), RateLimiter(0), 2, index)
+
+    assert (ok, failed) == (2, [2])
+    rows = {a.id: a for a in db.query(ArticleModel).all()}
+    assert rows[1].analysis_model == "gpt-test" and rows[1].analysis_prompt_version == "v1"
+    assert rows[1].analysis_summary == "about agent"
+    assert rows[2].analysis_model == "local-triage" and rows[2].change_seq == 1  # untouched
+    assert sorted([rows[1].change_seq, rows[3].change_seq]) == [3, 4]
+    assert len(index) == 2
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_spaces_calls():
+    limiter = RateLimiter(50)
+    start = time.monotonic()
+    await asyncio.gather(*(limiter.wait() for _ in range(5)))
+    assert time.monotonic() - start >= 4 / 50 - 0.005
+
+
+def test_checkpoint_resumes_only_with_same_filters(tmp_path):
+    path = str(tmp_path / "cp.json")
+    cp = Checkpoint.load(path, {"mode": "analyze"}, restart=False)
+    cp.last_id, cp.done, cp.failed = 40, 38, [7, 9]
+    cp.save()
+
+    resumed = Checkpoint.load(path, {"mode": "analyze"}, restart=False)
+    assert (resumed.last_id, resumed.done, resumed.failed) == (40, 38, [7, 9])
+    assert Checkpoint.load(path, {"mode": "analyze"}, restart=True).last_id == 0
+    with pytest.raises(SystemExit):
+        Checkpoint.load(path, {"mode": "evaluate"}, restart=False)
+
+
+def test_resuming_with_another_limit_keeps_the_checkpoint(tmp_path):
+    path = str(tmp_path / "cp.json")
+
+    def args(**kw):
+        return argparse.Namespace(mode="analyze", stale=True, category=None, limit=kw.get("limit"),
+                                  concurrency=kw.get("concurrency", 4), checkpoint=path, restart=False)
+
+    cp = Checkpoint.load(path, checkpoint_filters(args(limit=100)), restart=False)
+    cp.last_id = 100
+    cp.save()
+    assert Checkpoint.load(path, checkpoint_filters(args(limit=5000, concurrency=8)), restart=False).last_id == 100
+    assert Checkpoint.load(path, checkpoint_filters(args()), restart=False).last_id == 100
@@ -0,0 +1,109 @@
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.db.database import Base
+from app.db.models import ArticleModel
+from app.services.changes import broker, current_change_seq, event_stream, mark_changed
+
+
+def parse(event: str) -> dict:
+    data = [line for line in event.splitlines() if line.startswith("data: ")][0]
+    return json.loads(data[len("data: "):])
+
+
+@pytest.mark.asyncio
+async def test_stream_catches_up_then_forwards_published_changes():
+    disconnected = False
+
+    async def is_disconnected():
+        return disconnected
+
+    stream = event_stream(since=3, read_cursor=lambda: 5, is_disconnected=is_disconnected, keepalive=5)
+
+    # Client is behind the current cursor: immediate catch-up event
+    assert parse(await stream.__anext__()) == {"cursor": 5, "article_ids": []}
+
+    next_event = asyncio.ensure_future(stream.__anext__())
+    await asyncio.sleep(0)
+    assert broker.subscriber_count == 1
+    broker.publish(4, [9])  # stale, already covered by cursor 5
+    broker.publish(7, [2, 1, 2])
+    assert parse(await asyncio.wait_for(next_event, timeout=1)) == {"cursor": 7, "article_ids": [1, 2]}
+
+    await stream.aclose()
+    assert broker.subscriber_count == 0
+
+
+@pytest.mark.asyncio
+async def test_stream_polls_cursor_when_idle():
+    cursor = {"value": 1}
+
+    async def is_disconnected():
+        return False
+
+    stream = event_stream(since=1, read_cursor=lambda: cursor["value"], is_disconnected=is_disconnected, keepalive=0.01)
+
+    assert await stream.__anext__() == ": keepalive\n\n"
+    # A write made by another worker shows up on the next idle poll
+    cursor["value"] = 4
+    assert parse(await stream.__anext__())["cursor"] == 4
+    await stream.aclose()
+
+
+@pytest.fixture(scope="module")
+def pg_sessions(tmp_path_factory):
+    """Sessions on a throwaway PostgreSQL server (needs the optional `pgserver` package)."""
+    pgserver = pytest.importorskip("pgserver")
+    server = pgserver.get_server(str(tmp_path_factory.mktemp("pg")), cleanup_mode="stop")
+    server.psql("CREATE DATABASE changes_test;")
+    engine = create_engine(server.get_uri("changes_test").replace("postgresql://", "postgresql+psycopg2://"))
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def test_delta_cursor_never_skips_a_late_commit(pg_sessions):
+    setup = pg_sessions()
+    first, second = ArticleModel(title="A", url="https://a.dev/", source="hn", source_id="a"), \
+        ArticleModel(title="B", url="https://b.dev/", source="hn", source_id="b")
+    setup.add_all([first, second])
+    setup.flush()
+    mark_changed(setup, first)
+    mark_changed(setup, second)
+    setup.commit()
+    since = current_change_seq(setup)
+    first_id, second_id = first.id, second.id
+    setup.close()
+
+    def delta(since):
+        reader = pg_sessions()
+        try:
+            cursor = current_change_seq(reader)
+            ids = reader.scalars(select(ArticleModel.id).where(
+                ArticleModel.change_seq > since, ArticleModel.change_seq <= cursor,
+            )).all()
+            return max(cursor, since), sorted(ids)
+        finally:
+            reader.close()
+
+    # T1 stamps first but commits last; T2 stamps after it and commits straight away
+    t1, t2 = pg_sessions(), pg_sessions()
+    mark_changed(t1, t1.get(ArticleModel, first_id))
+    t1.flush()
+    mark_changed(t2, t2.get(ArticleModel, second_id))
+    t2.commit()
+
+    # T2's change is visible, but the cursor must not move past T1 while it can still commit
+    since, ids = delta(since)
+    assert ids == []
+
+    t1.commit()
+    since, ids = delta(since)
+    assert ids == [first_id, second_id]
+    assert delta(since)[1] == []
+    t1.close()
+    t2.close()
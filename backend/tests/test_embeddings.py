@@ -0,0 +1,114 @@
+import numpy as np
+
+from app.db.models import ArticleModel
+from app.services.embeddings import EmbeddingIndex, embed_texts, index_articles, rebuild
+
+
+def test_embeddings_are_deterministic_and_topical():
+    vecs = embed_texts([
+        "Open source coding agent for the terminal",
+        "Terminal coding agent, open source",
+        "Meal planning app for busy families",
+    ], dim=128)
+
+    assert vecs.dtype == np.float32 and vecs.shape == (3, 128)
+    assert np.allclose(np.linalg.norm(vecs, axis=1), 1.0, atol=1e-5)
+    assert vecs[0] @ vecs[1] > vecs[0] @ vecs[2]
+    assert np.array_equal(vecs, embed_texts([
+        "Open source coding agent for the terminal",
+        "Terminal coding agent, open source",
+        "Meal planning app for busy families",
+    ], dim=128))
+
+
+def test_index_appends_overwrites_and_searches(tmp_path):
+    index = EmbeddingIndex(str(tmp_path), dim=64, approx_threshold=1000)
+    index_articles(index, [
+        (1, "AI coding agent", "Writes code for you", ""),
+        (2, "Coding agent for teams", "AI pair programmer", ""),
+        (3, "Recipe planner", "Meal plans", ""),
+    ])
+    assert len(index) == 3
+
+    hits = index.search(index.vector(1), k=2, exclude=[1])
+    assert [h[0] for h in hits] == [2, 3]
+
+    # Overwriting keeps one row per id, and a fresh reader sees the new vector
+    index_articles(index, [(3, "AI coding agent", "Writes code for you", "")])
+    reader = EmbeddingIndex(str(tmp_path), dim=64, approx_threshold=1000)
+    assert len(reader) == 3
+    assert reader.search(reader.vector(1), k=1, exclude=[1])[0][0] == 3
+
+
+def test_approximate_search_matches_exact_on_clustered_data(tmp_path):
+    rng = np.random.default_rng(1)
+    centers = rng.normal(size=(10, 32))
+    points = np.repeat(centers, 50, axis=0) + 0.05 * rng.normal(size=(500, 32))
+    points /= np.linalg.norm(points, axis=1, keepdims=True)
+
+    exact = EmbeddingIndex(str(tmp_path / "exact"), dim=32, approx_threshold=10_000)
+    approx = EmbeddingIndex(str(tmp_path / "approx"), dim=32, approx_threshold=100, nprobe=4)
+    for index in (exact, approx):
+        index.add(list(range(500)), points.astype(np.float32))
+
+    query = points[7]
+    assert [h[0] for h in approx.search(query, k=5)] == [h[0] for h in exact.search(query, k=5)]
+
+
+def test_reader_notices_rebuild_with_same_row_count(tmp_path, db):
+    directory = str(tmp_path / "emb")
+    reader = EmbeddingIndex(directory)
+    index_articles(EmbeddingIndex(directory), [(1, "Recipe planner", "", ""), (2, "Meal plans", "", "")])
+    assert len(reader) == 2 and reader.vector(1) is not None
+
+    db.add_all([
+        ArticleModel(id=7, title="AI coding agent", url="https://7.dev/", source="hn", source_id="7"),
+        ArticleModel(id=8, title="Coding agent for teams", url="https://8.dev/", source="hn", source_id="8"),
+    ])
+    db.commit()
+    assert rebuild(db, directory) == 2
+
+    # Same number of rows, different articles: the reader must re-map
+    assert len(reader) == 2
+    assert reader.vector(1) is None
+    assert reader.search(reader.vector(7), k=1, exclude=[7])[0][0] == 8
+
+
+def test_rebuild_keeps_the_lock_and_rows_appended_meanwhile(tmp_path, db, monkeypatch):
+    directory = str(tmp_path / "emb")
+    live = EmbeddingIndex(directory)
+    index_articles(live, [(1, "Recipe planner", "", "")])
+    db.add(ArticleModel(id=1, title="Recipe planner", url="https://1.dev/", source="hn", source_id="1"))
+    db.commit()
+
+    # An ingest appends while the rebuild is re-embedding the database
+    real_index_articles = index_articles
+
+    def index_and_race(index, rows):
+        rows = list(rows)
+        if rows:
+            real_index_articles(live, [(2, "AI coding agent", "", "")])
+        return real_index_articles(index, rows)
+
+    monkeypatch.setattr("app.services.embeddings.index_articles", index_and_race)
+    assert rebuild(db, directory) == 1
+
+    assert sorted(tmp.name for tmp in tmp_path.iterdir()) == ["emb", "emb.lock"]
+    reader = EmbeddingIndex(directory)
+    assert len(reader) == 2 and reader.vector(2) is not None
+
+
+def test_ivf_is_prepared_ahead_and_empty_cells_return_nothing(tmp_path):
+    rng = np.random.default_rng(2)
+    points = rng.normal(size=(300, 16)).astype(np.float32)
+    points /= np.linalg.norm(points, axis=1, keepdims=True)
+    index = EmbeddingIndex(str(tmp_path), dim=16, approx_threshold=100, nprobe=1)
+    index.add(list(range(300)), points)
+
+    index.prepare()
+    assert (tmp_path / EmbeddingIndex.IVF).exists()
+
+    # The probed cell holds no rows (and nothing was appended since training)
+    centroids, lists, covered = index._ivf
+    index._ivf = (centroids, [np.zeros(0, dtype=np.int64)] * len(lists), covered)
+    assert index.search(points[0], k=5) == []
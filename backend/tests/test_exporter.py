@@ -0,0 +1,99 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from app.core.config import settings
+from app.db.models import ArticleModel, ArticleMetricModel
+from app.services.changes import mark_changed
+from app.services.exporter import DATASETS, ExportError, check_format, resolve_window, stream_export
+
+
+T0 = datetime(2024, 5, 1, 10, 0, 0)
+
+
+@pytest.fixture(autouse=True)
+def metrics(session_factory):
+    db = session_factory()
+    article = ArticleModel(title="A", url="https://a.dev", source="Hacker News", source_id="1")
+    db.add(article)
+    db.flush()
+    for i in range(5):
+        db.add(ArticleMetricModel(article_id=article.id, recorded_at=T0 + timedelta(hours=i), metric_value=i * 10,
+                                  source="Hacker News"))
+    db.commit()
+    db.close()
+
+
+def test_ndjson_streams_in_batches_within_window(session_factory):
+    chunks = list(stream_export(
+        session_factory, "metrics", "ndjson",
+        since=T0 + timedelta(hours=1), until=T0 + timedelta(hours=4), batch_size=2,
+    ))
+
+    assert len(chunks) == 2
+    rows = [json.loads(line) for line in b"".join(chunks).splitlines()]
+    assert [r["metric_value"] for r in rows] == [10, 20, 30]
+    assert rows[0]["recorded_at"] == "2024-05-01T11:00:00"
+
+
+def test_csv_has_header_and_rows(session_factory):
+    body = b"".join(stream_export(session_factory, "metrics", "csv", since=None, until=datetime.utcnow()))
+    lines = body.decode().splitlines()
+    assert lines[0] == "id,article_id,recorded_at,metric_value,rank,source"
+    assert len(lines) == 6 and lines[1].endswith(",Hacker News")
+
+
+def test_since_last_resumes_after_complete_export(session_factory):
+    db = session_factory()
+    since, until = resolve_window(db, "metrics", None, T0 + timedelta(hours=2), "nb")
+    assert since is None
+    first = b"".join(stream_export(session_factory, "metrics", "ndjson", since, until, since_last="nb"))
+    assert len(first.splitlines()) == 2
+
+    since, until = resolve_window(db, "metrics", None, None, "nb")
+    assert since == T0 + timedelta(hours=2)
+    second = b"".join(stream_export(session_factory, "metrics", "ndjson", since, until, since_last="nb"))
+    assert len(second.splitlines()) == 3
+    db.close()
+
+
+def test_articles_since_last_follows_change_cursor(session_factory):
+    db = session_factory()
+    other = ArticleModel(title="B", url="https://b.dev", source="Hacker News", source_id="2", heat_score=41.5)
+    db.add(other)
+    db.flush()
+    for article in db.query(ArticleModel).all():
+        mark_changed(db, article)
+    db.commit()
+
+    def export():
+        since, until = resolve_window(db, "articles", None, None, "nb")
+        body = b"".join(stream_export(session_factory, "articles", "ndjson", since, until, since_last="nb"))
+        return [json.loads(line) for line in body.splitlines()]
+
+    rows = export()
+    assert [r["title"] for r in rows] == ["A", "B"]
+    assert set(DATASETS["articles"].columns) >= {"heat_score", "analysis_prompt_version", "change_seq"}
+    assert rows[1]["heat_score"] == 41.5
+    assert export() == []
+
+    # Re-analyzed in place: last_seen_at is unchanged, but the row is exported again
+    article = db.get(ArticleModel, rows[0]["id"])
+    article.analysis_score = 90
+    mark_changed(db, article)
+    db.commit()
+    assert [(r["title"], r["analysis_score"]) for r in export()] == [("A", 90)]
+    db.close()
+
+
+def test_window_ends_before_rows_still_committing(session_factory):
+    before = datetime.utcnow()
+    _, until = resolve_window(session_factory(), "metrics", None, None, None)
+    assert until <= before - timedelta(seconds=settings.EXPORT_LAG_SECONDS) + timedelta(seconds=1)
+
+
+def test_rejects_unknown_dataset_and_format(session_factory):
+    with pytest.raises(ExportError):
+        check_format("xml")
+    with pytest.raises(ExportError):
+        resolve_window(session_factory(), "users", None, None, None)
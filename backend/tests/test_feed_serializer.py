@@ -0,0 +1,85 @@
+import gzip
+from datetime import datetime, timezone
+from typing import List
+
+from pydantic import TypeAdapter
+
+from app.schemas.article import Article, AIAnalysis, DeepSeekEvaluation, MetricPoint, SourceRef
+from app.services.feed_serializer import build_article_payloads, dumps, json_response, negotiate_encoding
+
+
+T0 = datetime(2024, 5, 1, 10, 0, 0)
+T1 = datetime(2024, 5, 2, 11, 30, 0, 123000)
+T_UTC = datetime(2024, 5, 3, 8, 0, 0, tzinfo=timezone.utc)
+
+ARTICLE_ROWS = [
+    # id, title, url, source, source_id, publish_date, platforms_count, heat_score,
+    # first_seen_at, last_seen_at, seen_count, analyzed_at,
+    # summary, category, score, reasoning, tags
+    (1, "Agent «One»", "https://a.dev/", "Hacker News", "101", T0, 2, 73.5, T0, T1, 2, T0, "Sum", "DevTool", 88, "Why", ["AI"]),
+    (2, "Bare", "https://b.dev/", "BetaList", "b", None, 1, None,
+     T_UTC, T_UTC, 1, None, None, None, None, None, None),
+]
+METRIC_ROWS = [
+    (1, T1, 120, 3),
+    (1, T0, 80, None),
+]
+SOURCE_ROWS = [
+    (1, "Hacker News", "101"),
+    (1, "Product Hunt", "a-dev"),
+]
+EVAL_ROWS = [
+    (1, 1, "deepseek-chat", 70,
+     {"overall_score": 75, "product_view": "p", "investor_view": "i", "market_view": "m", "recommendation": "r"},
+     None, T1),
+]
+
+
+def expected_articles() -> List[Article]:
+    return [
+        Article(
+            id=1, title="Agent «One»", url="https://a.dev/", source="Hacker News", source_id="101",
+            publish_date=T0, first_seen_at=T0, last_seen_at=T1, seen_count=2,
+            sources=[SourceRef(source="Hacker News", source_id="101"), SourceRef(source="Product Hunt", source_id="a-dev")],
+            platforms_count=2, heat_score=73.5, analyzed_at=T0,
+            analysis=AIAnalysis(summary="Sum", category="DevTool", score=88, reasoning="Why", tags=["AI"]),
+            metrics_history=[
+                MetricPoint(recorded_at=T1, value=120, rank=3),
+                MetricPoint(recorded_at=T0, value=80, rank=None),
+            ],
+            evaluations=[
+                DeepSeekEvaluation(
+                    version=1, model="deepseek-chat", overall_score=75, product_view="p", investor_view="i",
+                    market_view="m", recommendation="r", full_evaluation="", created_at=T1,
+                )
+            ],
+        ),
+        Article(
+            id=2, title="Bare", url="https://b.dev/", source="BetaList", source_id="b",
+            publish_date=None, first_seen_at=T_UTC, last_seen_at=T_UTC, seen_count=1,
+            sources=[SourceRef(source="BetaList", source_id="b")], platforms_count=1,
+        ),
+    ]
+
+
+def test_fast_path_is_byte_identical_to_pydantic():
+    payload = build_article_payloads(ARTICLE_ROWS, METRIC_ROWS, EVAL_ROWS, SOURCE_ROWS)
+    expected = TypeAdapter(List[Article]).dump_json(expected_articles())
+    assert dumps(payload) == expected
+
+
+def test_negotiate_encoding_honours_q_values():
+    assert negotiate_encoding(None) is None
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("gzip;q=0") is None
+    assert negotiate_encoding("identity") is None
+
+
+def test_json_response_compresses_large_bodies():
+    payload = build_article_payloads(ARTICLE_ROWS * 20, METRIC_ROWS, EVAL_ROWS)
+    resp = json_response(payload, "gzip")
+    assert resp.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(resp.body) == dumps(payload)
+
+    small = json_response([], "gzip")
+    assert "content-encoding" not in small.headers
@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app.db.models import ArticleModel, ArticleMetricModel
+from app.services.heat import SourceMetrics, article_heat, listing_heat, percentile_ranks, refresh_heat
+
+NOW = datetime(2024, 5, 10, 12, 0, 0)
+
+
+def test_percentile_ranks_share_ties():
+    assert percentile_ranks(np.array([3.0, 1.0, 2.0])).tolist() == [1.0, 0.0, 0.5]
+    assert percentile_ranks(np.zeros(4)).tolist() == [0.5] * 4
+
+
+def test_listing_heat_rewards_level_and_growth():
+    hour = 3600.0
+    metrics = SourceMetrics(
+        "hn",
+        article_ids=np.array([1, 1, 2, 2, 3], dtype=np.int64),
+        recorded_at=np.array([0, 24 * hour, 0, 24 * hour, 0], dtype=np.float64),
+        values=np.array([10, 400, 300, 310, 5], dtype=np.float64),
+    )
+    ids, heat = listing_heat(metrics)
+    assert ids.tolist() == [1, 2, 3]
+    assert heat[0] > heat[1] > heat[2]
+    assert ((heat >= 0) & (heat <= 100)).all()
+
+    # No spread (Product Hunt / BetaList store zeros): no heat at all rather than a neutral 50
+    flat = SourceMetrics("ph", np.array([7, 8]), np.zeros(2), np.zeros(2))
+    assert listing_heat(flat)[0].tolist() == []
+
+
+def test_article_heat_takes_hottest_listing():
+    ids, heat = article_heat([
+        (np.array([1, 2]), np.array([30.0, 80.0])),
+        (np.array([1]), np.array([60.0])),
+    ])
+    assert ids.tolist() == [1, 2] and heat.tolist() == [60.0, 80.0]
+
+
+def test_cross_listing_on_a_zero_metric_source_does_not_lift_a_cold_article():
+    hn = SourceMetrics("hn", np.array([1, 2]), np.zeros(2), np.array([500.0, 3.0]))
+    ph = SourceMetrics("ph", np.array([2, 9]), np.zeros(2), np.zeros(2))
+    _, hn_heat = listing_heat(hn)
+    ids, heat = article_heat([listing_heat(hn), listing_heat(ph)])
+    assert ids.tolist() == [1, 2]  # 9 is only on Product Hunt: no heat
+    assert heat.tolist() == hn_heat.tolist() and heat[1] < 50
+
+
+def test_refresh_heat_writes_changes_and_clears_stale(db):
+    hot = ArticleModel(title="Hot", url="https://hot.dev/", source="hn", source_id="1")
+    cold = ArticleModel(title="Cold", url="https://cold.dev/", source="hn", source_id="2")
+    quiet = ArticleModel(title="Quiet", url="https://quiet.dev/", source="ph", source_id="q")
+    old = ArticleModel(title="Old", url="https://old.dev/", source="hn", source_id="3", heat_score=90.0)
+    db.add_all([hot, cold, quiet, old])
+    db.flush()
+    db.add_all([
+        ArticleMetricModel(article_id=hot.id, source="hn", metric_value=50, recorded_at=NOW - timedelta(days=1)),
+        ArticleMetricModel(article_id=hot.id, source="hn", metric_value=500, recorded_at=NOW),
+        ArticleMetricModel(article_id=cold.id, source="hn", metric_value=3, recorded_at=NOW),
+        ArticleMetricModel(article_id=quiet.id, source="ph", metric_value=0, recorded_at=NOW),
+        ArticleMetricModel(article_id=old.id, source="hn", metric_value=900, recorded_at=NOW - timedelta(days=30)),
+    ])
+    db.commit()
+
+    stats = refresh_heat(db, window_days=7, now=NOW)
+    assert stats["metric_rows"] == 4 and stats["updated"] == 2 and stats["cleared"] == 1
+    db.expire_all()
+    assert hot.heat_score > cold.heat_score
+    assert quiet.heat_score is None
+    assert old.heat_score is None
+    assert hot.change_seq is not None
+
+    # Nothing moved: nothing is written or re-stamped
+    seq = hot.change_seq
+    assert refresh_heat(db, window_days=7, now=NOW)["updated"] == 0
+    db.expire_all()
+    assert hot.change_seq == seq
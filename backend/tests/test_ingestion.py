@@ -0,0 +1,117 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from app.db.models import ArticleModel, NotificationModel, WatchlistRuleModel
+from app.schemas.article import AIAnalysis, ArticleCreate
+from app.services.fetcher_base import BaseFetcher
+from app.services.ingestion import IngestRun, Stage, upsert_article_sources
+from app.services.watchlist import Watchlists
+
+
+def item(source, n, url=None):
+    return ArticleCreate(title=f"{source} {n}", url=url or f"https://{source}.dev/{n}", source=source,
+                         source_id=str(n), current_metric_value=n)
+
+
+class ListFetcher(BaseFetcher):
+    def __init__(self, name, items):
+        self.name, self.items = name, items
+
+    @property
+    def source_name(self):
+        return self.name
+
+    async def fetch_latest(self, limit=10):
+        return self.items[:limit]
+
+
+class SlowFetcher(ListFetcher):
+    """Yields one item, then waits until the fast source's items are already committed."""
+
+    def __init__(self, name, items, db):
+        super().__init__(name, items)
+        self.db = db
+        self.saw_committed = None
+
+    async def stream_latest(self, limit=10):
+        yield self.items[0]
+        for _ in range(200):
+            await asyncio.sleep(0.01)
+            if self.db.query(ArticleModel).filter(ArticleModel.source == "fast").count() == 3:
+                break
+        self.saw_committed = self.db.query(ArticleModel).filter(ArticleModel.source == "fast").count()
+        for it in self.items[1:limit]:
+            yield it
+
+
+class FakeAnalyzer:
+    model_name = "gpt-test"
+
+    async def analyze(self, article, fallback=True):
+        await asyncio.sleep(0.01)
+        return AIAnalysis(summary=article.title, category="DevTool", score=50, reasoning="", tags=[])
+
+
+class SendAll:
+    def select(self, items, budget=None):
+        return [True] * len(items), [None] * len(items)
+
+
+@pytest.mark.asyncio
+async def test_pipeline_persists_fast_sources_while_slow_ones_fetch(db):
+    db.add(WatchlistRuleModel(name="cross-platform", min_platforms=2))
+    db.commit()
+
+    fast = ListFetcher("fast", [item("fast", 1), item("fast", 2), item("fast", 3, url="https://shared.dev")])
+    slow = SlowFetcher("slow", [item("slow", 1), item("slow", 2, url="https://shared.dev/")], db)
+    run = IngestRun(db, [fast, slow], limit=10, analyzer=FakeAnalyzer(), triage=SendAll(),
+                    watchlist=Watchlists(), queue_size=2, batch_size=2, analyze_workers=3)
+    articles = await run.run()
+
+    assert slow.saw_committed == 3
+    assert len(articles) == 4
+    shared = db.query(ArticleModel).filter(ArticleModel.url == "https://shared.dev/").one()
+    assert shared.seen_count == 2
+    assert [(s.source, s.source_id) for s in shared.source_entries] == [("fast", "3"), ("slow", "2")]
+    assert shared.platforms_count == 2
+    assert [n.article_id for n in db.query(NotificationModel)] == [shared.id]
+    assert len(shared.metrics_history) == 2
+
+    snap = run.snapshot()
+    assert snap["running"] is False and snap["llm_calls"] == 4
+    assert snap["sources"]["slow"] == {"status": "done", "items": 2}
+    assert snap["stages"]["normalize"]["processed"] == 5
+    assert all(s["depth"] == 0 and s["high_water"] <= 2 for s in snap["stages"].values())
+
+
+def test_upsert_article_sources_moves_known_listings(db):
+    article = ArticleModel(title="A", url="https://a.dev/", source="hn", source_id="1")
+    db.add(article)
+    db.flush()
+
+    t0, t1 = datetime(2024, 5, 1), datetime(2024, 5, 2)
+    upsert_article_sources(db, [{"article_id": article.id, "source": "hn", "source_id": "1", "seen_at": t0, "metric": 5}])
+    upsert_article_sources(db, [
+        {"article_id": article.id, "source": "hn", "source_id": "1", "seen_at": t0, "metric": 7},
+        {"article_id": article.id, "source": "hn", "source_id": "1", "seen_at": t1, "metric": 9},
+        {"article_id": article.id, "source": "ph", "source_id": "a", "seen_at": t1, "metric": 1},
+    ])
+    db.commit()
+
+    rows = {(s.source, s.source_id): s for s in article.source_entries}
+    assert len(rows) == 2
+    assert (rows["hn", "1"].first_seen, rows["hn", "1"].last_seen, rows["hn", "1"].last_metric) == (t0, t1, 9)
+    assert article.platforms_count == 2
+
+
+@pytest.mark.asyncio
+async def test_stage_batches_and_closes_per_consumer():
+    stage = Stage("s", maxsize=10, consumers=2)
+    for i in range(3):
+        await stage.put(i)
+    await stage.close()
+    assert await stage.get_batch(10) == [0, 1, 2]
+    assert await stage.get_batch(10) == []
+    assert await stage.get_batch(10) == []
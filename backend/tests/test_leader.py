@@ -0,0 +1,123 @@
+import pytest
+from sqlalchemy import create_engine
+
+from app.core import scheduler
+from app.core.leader import LeaderElector
+
+
+class FakeServer:
+    """Just enough of Postgres for advisory locks: one lock table, connections that can die."""
+
+    def __init__(self):
+        self.locks = {}
+
+
+class FakeConnection:
+    def __init__(self, server):
+        self.server = server
+        self.in_transaction = False
+        self.dead = False
+        self.closed = False
+
+    def execute(self, stmt, params=None):
+        if self.dead:
+            raise ConnectionError("server closed the connection unexpectedly")
+        self.in_transaction = True
+        sql = str(stmt)
+        if "pg_try_advisory_lock" in sql:
+            holder = self.server.locks.setdefault(params["key"], self)
+            return FakeResult(holder is self)
+        if "pg_advisory_unlock" in sql:
+            self.server.locks.pop(params["key"], None)
+        return FakeResult(1)
+
+    def commit(self):
+        self.in_transaction = False
+
+    def rollback(self):
+        self.in_transaction = False
+
+    def close(self):
+        self.closed = True
+        # Session gone: Postgres drops its advisory locks
+        self.server.locks = {k: c for k, c in self.server.locks.items() if c is not self}
+
+
+class FakeResult:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar(self):
+        return self.value
+
+
+class FakeEngine:
+    class dialect:
+        name = "postgresql"
+
+    def __init__(self, server):
+        self.server = server
+        self.connections = []
+
+    def connect(self):
+        conn = FakeConnection(self.server)
+        self.connections.append(conn)
+        return conn
+
+
+def test_one_leader_and_failover_when_its_session_dies():
+    server = FakeServer()
+    a, b = LeaderElector(FakeEngine(server), 42), LeaderElector(FakeEngine(server), 42)
+
+    assert a.try_acquire() and not b.try_acquire()
+    assert a.try_acquire()  # liveness check while holding the lock
+    assert not a._conn.in_transaction  # never left "idle in transaction"
+    assert not b._conn.in_transaction
+
+    a._conn.dead = True
+    assert not a.try_acquire() and not a.is_leader
+    assert b.try_acquire() and b.is_leader
+
+
+def test_release_hands_over_leadership():
+    server = FakeServer()
+    a, b = LeaderElector(FakeEngine(server), 7), LeaderElector(FakeEngine(server), 7)
+    assert a.try_acquire()
+    a.release()
+    assert not a.is_leader and a._conn is None
+    assert b.try_acquire()
+
+
+def test_non_postgres_database_is_always_leader():
+    elector = LeaderElector(create_engine("sqlite://"), 1)
+    assert elector.is_leader and elector.try_acquire()
+    assert elector._conn is None
+
+
+class Gate:
+    def __init__(self, is_leader):
+        self.is_leader = is_leader
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("is_leader", [True, False])
+async def test_scheduled_jobs_only_run_on_the_leader(monkeypatch, session_factory, is_leader):
+    calls = []
+
+    async def fake_ingest(limit, db):
+        calls.append("ingest")
+
+    monkeypatch.setattr(scheduler, "leader", Gate(is_leader))
+    monkeypatch.setattr(scheduler, "SessionLocal", session_factory)
+    monkeypatch.setattr(scheduler, "ingest_all_sources", fake_ingest)
+    monkeypatch.setattr(scheduler, "refresh_heat", lambda db: calls.append("heat"))
+
+    async def fake_deliver(db):
+        calls.append("deliver")
+
+    monkeypatch.setattr(scheduler, "deliver_pending", fake_deliver)
+
+    await scheduler._run_ingestion_job()
+    await scheduler._run_heat_job()
+    await scheduler._run_watchlist_delivery()
+    assert calls == (["ingest", "heat", "deliver"] if is_leader else [])
@@ -0,0 +1,42 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from scripts.fake_upstreams import Catalog, Faults, create_app
+from scripts.load_test import percentile
+
+
+def test_fake_upstreams_serve_feeds_and_chat_completions():
+    client = TestClient(create_app(Catalog(items=5, churn=5, overlap=1.0, seed=1)))
+
+    first, second = client.get("/hn/v0/topstories.json").json(), client.get("/hn/v0/topstories.json").json()
+    assert first == [1, 2, 3, 4, 5] and second == [6, 7, 8, 9, 10]
+    story = client.get("/hn/v0/item/3.json").json()
+    assert story["type"] == "story" and story["url"].startswith("https://")
+    assert client.get("/huggingface/api/spaces", params={"limit": 2}).json()[0]["id"].startswith("fake/")
+    assert "<entry>" in client.get("/producthunt/feed").text
+
+    resp = client.post("/v1/chat/completions", json={"model": "m", "messages": [
+        {"role": "system", "content": "You are a venture capital analyst."},
+        {"role": "user", "content": "Title: Foo\nURL: https://foo.dev"},
+    ]})
+    analysis = json.loads(resp.json()["choices"][0]["message"]["content"])
+    assert set(analysis) == {"summary", "category", "score", "reasoning", "tags"}
+
+
+def test_fake_upstreams_inject_errors_and_throttling():
+    app = create_app(Catalog(5, 0, 0.0, 0), Faults(error_rate=1.0), Faults(rate_limit=1.0))
+    client = TestClient(app)
+    assert client.get("/producthunt/feed").status_code == 503
+
+    chat = {"model": "m", "messages": [{"role": "user", "content": "hi"}]}
+    assert client.post("/v1/chat/completions", json=chat).status_code == 200
+    throttled = client.post("/v1/chat/completions", json=chat)
+    assert throttled.status_code == 429 and throttled.headers["Retry-After"] == "1"
+    assert client.get("/_stats").json()["requests"]["v1 429"] == 1
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert (percentile(values, 50), percentile(values, 95), percentile(values, 99)) == (50, 95, 99)
+    assert percentile([7.0], 99) == 7.0 and percentile([], 50) == 0.0
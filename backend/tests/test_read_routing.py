@@ -0,0 +1,60 @@
+import time
+
+from fastapi import Request, Response
+
+from app.core.config import settings
+from app.db import database
+from app.db.database import (
+    PRIMARY_READ_COOKIE, PRIMARY_READ_HEADER, get_read_db, primary_read_token, reads_from_primary, stick_to_primary,
+)
+
+
+def make_request(headers=None):
+    raw = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+def test_write_response_pins_reads_to_primary_via_cookie_or_header():
+    response = Response()
+    stick_to_primary(response)
+    until = response.headers[PRIMARY_READ_HEADER]
+    assert f"{PRIMARY_READ_COOKIE}={until}" in response.headers["set-cookie"]
+
+    assert reads_from_primary(make_request({"Cookie": f"{PRIMARY_READ_COOKIE}={until}"}))
+    assert reads_from_primary(make_request({PRIMARY_READ_HEADER: until}))
+    assert not reads_from_primary(make_request())
+    assert not reads_from_primary(make_request({PRIMARY_READ_HEADER: primary_read_token(time.time() - 1)}))
+    # A far-future value can't pin a client to the primary forever
+    far = time.time() + settings.READ_YOUR_WRITES_SECONDS + 60
+    assert not reads_from_primary(make_request({PRIMARY_READ_HEADER: primary_read_token(far)}))
+    assert not reads_from_primary(make_request({PRIMARY_READ_HEADER: "garbage"}))
+
+
+def test_unsigned_or_altered_deadlines_are_ignored():
+    soon = time.time() + 5
+    assert reads_from_primary(make_request({PRIMARY_READ_HEADER: primary_read_token(soon)}))
+    assert not reads_from_primary(make_request({PRIMARY_READ_HEADER: f"{soon:.3f}"}))
+    # Client pushes its own deadline further out, keeping the old signature
+    _, _, signature = primary_read_token(soon).rpartition(".")
+    assert not reads_from_primary(make_request({PRIMARY_READ_HEADER: f"{soon + 3:.3f}.{signature}"}))
+
+
+def test_get_read_db_picks_session_factory(monkeypatch):
+    class FakeSession:
+        def __init__(self, name):
+            self.name = name
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(database, "SessionLocal", lambda: FakeSession("writer"))
+    monkeypatch.setattr(database, "ReadSessionLocal", lambda: FakeSession("reader"))
+
+    def session_for(request):
+        gen = get_read_db(request)
+        db = next(gen)
+        gen.close()
+        return db.name
+
+    assert session_for(make_request()) == "reader"
+    assert session_for(make_request({PRIMARY_READ_HEADER: primary_read_token(time.time() + 1)})) == "writer"
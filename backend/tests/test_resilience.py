@@ -0,0 +1,189 @@
+import asyncio
+import json
+from datetime import datetime
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+from app.schemas.article import Article
+from app.services.deepseek import DeepSeekEvaluator
+from app.services.resilience import (
+    BreakerRegistry, CircuitBreaker, CircuitOpenError, RetryPolicy, is_host_failure, request_with_resilience,
+)
+
+
+NO_WAIT = RetryPolicy(attempts=3, base_delay=0)
+
+
+@pytest.mark.asyncio
+async def test_retries_transient_status_then_succeeds():
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url)
+        return httpx.Response(503) if len(calls) < 3 else httpx.Response(200, json={"ok": True})
+
+    registry = BreakerRegistry(failure_threshold=5, reset_timeout=30)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        resp = await request_with_resilience(client, "GET", "https://hn.test/x", policy=NO_WAIT, registry=registry)
+
+    assert resp.status_code == 200
+    assert len(calls) == 3
+    assert registry.get("hn.test").state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_and_fails_fast():
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url)
+        raise httpx.ConnectError("down", request=request)
+
+    registry = BreakerRegistry(failure_threshold=2, reset_timeout=60)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        with pytest.raises(CircuitOpenError):
+            await request_with_resilience(client, "GET", "https://bad.test/", policy=NO_WAIT, registry=registry)
+        with pytest.raises(CircuitOpenError):
+            await request_with_resilience(client, "GET", "https://bad.test/other", policy=NO_WAIT, registry=registry)
+
+    # Two failures opened the breaker; nothing else reached the host
+    assert len(calls) == 2
+    snapshot = registry.snapshot()[0]
+    assert snapshot["host"] == "bad.test"
+    assert snapshot["state"] == "open"
+    assert snapshot["rejected"] == 2
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_returned_without_retry():
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url)
+        return httpx.Response(404)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        resp = await request_with_resilience(client, "GET", "https://ph.test/", policy=NO_WAIT, registry=BreakerRegistry())
+
+    assert resp.status_code == 404
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_hedged_request_returns_fastest_answer():
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url)
+        if len(calls) == 1:
+            await asyncio.sleep(5)  # slow primary
+        return httpx.Response(200, json={"n": len(calls)})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        resp = await asyncio.wait_for(
+            request_with_resilience(
+                client, "GET", "https://hn.test/item/1.json",
+                policy=NO_WAIT, hedge_after=0.05, registry=BreakerRegistry(),
+            ),
+            timeout=2,
+        )
+
+    assert resp.json() == {"n": 2}
+
+
+@pytest.mark.asyncio
+async def test_cancelled_hedged_request_leaves_no_task_behind():
+    started, cancelled = asyncio.Event(), asyncio.Event()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        started.set()
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return httpx.Response(200)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        call = asyncio.ensure_future(request_with_resilience(
+            client, "GET", "https://hn.test/slow", policy=NO_WAIT, hedge_after=1, registry=BreakerRegistry(),
+        ))
+        await started.wait()
+        call.cancel()  # before the hedge delay is up
+        with pytest.raises(asyncio.CancelledError):
+            await call
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+
+def test_only_outages_count_as_host_failures():
+    request = httpx.Request("POST", "https://api.deepseek.com/chat/completions")
+    assert is_host_failure(httpx.ReadTimeout("slow", request=request))
+    assert is_host_failure(openai.APITimeoutError(request=request))
+    assert is_host_failure(openai.InternalServerError("boom", response=httpx.Response(502, request=request), body=None))
+    assert is_host_failure(openai.RateLimitError("slow down", response=httpx.Response(429, request=request), body=None))
+    assert not is_host_failure(openai.BadRequestError("bad", response=httpx.Response(400, request=request), body=None))
+    assert not is_host_failure(json.JSONDecodeError("Expecting value", "", 0))
+    assert not is_host_failure(ValueError("score must be an int"))
+
+    wrapped = RuntimeError("provider call failed")
+    wrapped.__cause__ = httpx.ConnectError("down", request=request)
+    assert is_host_failure(wrapped)
+
+
+class FakeCompletions:
+    def __init__(self, *answers):
+        self.answers = list(answers)
+
+    async def create(self, **kwargs):
+        answer = self.answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=answer))])
+
+
+def deepseek(*answers):
+    evaluator = DeepSeekEvaluator()
+    evaluator.client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(*answers)))
+    evaluator.breaker = CircuitBreaker("api.deepseek.test", failure_threshold=5, reset_timeout=30)
+    return evaluator
+
+
+ARTICLE = Article(id=1, title="Agent kit", url="https://a.dev/", source="hn", source_id="1", first_seen_at=datetime(2024, 5, 1),
+                  last_seen_at=datetime(2024, 5, 1), seen_count=1)
+
+
+@pytest.mark.asyncio
+async def test_deepseek_breaker_counts_each_outage_once_and_ignores_bad_json():
+    evaluator = deepseek("not json")
+    with pytest.raises(json.JSONDecodeError):
+        await evaluator.evaluate(ARTICLE, 1, fallback=False)
+    assert (evaluator.breaker.total_successes, evaluator.breaker.total_failures) == (0, 0)
+
+    request = httpx.Request("POST", "https://api.deepseek.test/")
+    # Long-form answer fine, nested short evaluation times out: one failure, not two
+    evaluator = deepseek("Narrative...", openai.APITimeoutError(request=request))
+    with pytest.raises(openai.APITimeoutError):
+        await evaluator.evaluate_full(ARTICLE, 1, fallback=False)
+    assert (evaluator.breaker.total_successes, evaluator.breaker.total_failures) == (1, 1)
+
+    evaluator = deepseek("Narrative...", json.dumps({"overall_score": 80}))
+    result = await evaluator.evaluate_full(ARTICLE, 1)
+    assert result.overall_score == 80 and result.full_evaluation == "Narrative..."
+    assert evaluator.breaker.total_successes == 2
+
+
+@pytest.mark.asyncio
+async def test_half_open_probe_answered_with_bad_json_closes_the_breaker():
+    request = httpx.Request("POST", "https://api.deepseek.test/")
+    evaluator = deepseek(*[openai.APITimeoutError(request=request)] * 5, "not json", json.dumps({"overall_score": 70}))
+    for _ in range(5):
+        await evaluator.evaluate(ARTICLE, 1)
+    assert evaluator.breaker.state == CircuitBreaker.OPEN
+
+    evaluator.breaker.opened_at -= evaluator.breaker.reset_timeout
+    await evaluator.evaluate(ARTICLE, 1)  # the probe: host answered, just not with JSON
+    assert evaluator.breaker.state == CircuitBreaker.CLOSED
+    assert (await evaluator.evaluate(ARTICLE, 1, fallback=False)).overall_score == 70
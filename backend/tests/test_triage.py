@@ -0,0 +1,67 @@
+from app.core.config import settings
+from app.db.models import ArticleModel
+from app.schemas.article import ArticleCreate
+from app.services.analyzer import MOCK_MODEL, MOCK_REASONING
+from app.services.triage import PROVISIONAL_MODEL, Triage, TriageModel, load_training_rows
+
+
+def training_rows():
+    rows = []
+    for i in range(40):
+        rows.append((f"Open source AI agent framework {i}", f"https://github.com/org/agent{i}", "Hacker News", 300, 90, "GenAI"))
+        rows.append((f"Weekly newsletter roundup {i}", f"https://betalist.com/startups/news{i}", "BetaList", 0, 30, "SaaS"))
+    return rows
+
+
+def item(title: str, url: str, source: str, metric: int = 0) -> ArticleCreate:
+    return ArticleCreate(title=title, url=url, source=source, source_id="x", current_metric_value=metric)
+
+
+def test_model_learns_score_and_category(tmp_path):
+    model = TriageModel.fit(training_rows())
+    path = str(tmp_path / "triage.npz")
+    model.save(path)
+    loaded = TriageModel.load(path)
+
+    scores, categories = loaded.predict([
+        item("New AI agent framework", "https://github.com/other/agent", "Hacker News", 250),
+        item("Newsletter roundup", "https://betalist.com/startups/x", "BetaList"),
+    ])
+
+    assert scores[0] > 75 and scores[1] < 45
+    assert categories == ["GenAI", "SaaS"]
+
+
+def test_select_applies_threshold_and_top_k(monkeypatch):
+    triage = Triage(model_path="/nonexistent")
+    items = [
+        item("AI agent framework A", "https://github.com/a/agent", "Hacker News", 300),
+        item("AI agent framework B", "https://github.com/b/agent", "Hacker News", 200),
+        item("Newsletter roundup", "https://betalist.com/startups/y", "BetaList"),
+    ]
+
+    # Without a trained model everything goes to the LLM
+    send, provisional = triage.select(items)
+    assert send == [True, True, True] and provisional == [None, None, None]
+
+    triage.model = TriageModel.fit(training_rows())
+    monkeypatch.setattr(settings, "TRIAGE_THRESHOLD", 60)
+    monkeypatch.setattr(settings, "TRIAGE_TOP_K", 1)
+    send, provisional = triage.select(items)
+
+    assert send == [True, False, False]
+    assert provisional[0] is None
+    assert provisional[2].tags == ["Provisional"]
+    assert provisional[2].category == "SaaS"
+
+
+def test_training_rows_skip_provisional_and_mock_analyses(db):
+    for i, model in enumerate(["gpt-3.5-turbo", None, PROVISIONAL_MODEL, MOCK_MODEL]):
+        db.add(ArticleModel(title=f"Article {i}", url=f"https://a{i}.dev/", source="hn", source_id=str(i),
+                            analysis_score=70, analysis_model=model))
+    # Keyword-mock analysis stored before analysis_model existed
+    db.add(ArticleModel(title="Legacy mock", url="https://mock.dev/", source="hn", source_id="m", analysis_score=85,
+                        analysis_model=None, analysis_reasoning=MOCK_REASONING,
+                        analysis_tags=["Startup", "Tech", "MockData"]))
+    db.commit()
+    assert sorted(r[0] for r in load_training_rows(db)) == ["Article 0", "Article 1"]
@@ -0,0 +1,153 @@
+import json
+
+import httpx
+import pytest
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.db.models import ArticleModel, ArticleSourceModel, NotificationModel, WatchlistRuleModel
+from app.schemas.watchlist import WatchlistRuleCreate
+from app.services.changes import current_change_seq, mark_changed
+from app.services.watchlist import Rule, RuleIndex, Subject, Watchlists, deliver_pending
+
+
+def subject(article_id=1, title="Open agent toolkit", summary="", category="DevTool", tags=(), sources=("hacker news",),
+            score=85, platforms_count=2, heat_score=None):
+    return Subject(article_id, title, summary, category, frozenset(tags), frozenset(sources), score,
+                   platforms_count, heat_score)
+
+
+def test_rule_conditions_are_anded():
+    rule = Rule(1, "hot devtools", categories=frozenset({"devtool"}), min_score=81, min_platforms=2)
+    assert rule.matches(subject())
+    assert not rule.matches(subject(score=80))
+    assert not rule.matches(subject(platforms_count=1))
+    assert not rule.matches(subject(category="Productivity"))
+
+    phrase = Rule(2, "coding agents", keywords=(("coding", "agent"),))
+    assert phrase.matches(subject(title="A Coding-Agent for teams"))
+    assert not phrase.matches(subject(title="Agent for coding"))
+
+
+def test_keywords_the_tokenizer_cannot_see_are_rejected():
+    for keyword in ["智能体", "C++", "   "]:
+        with pytest.raises(ValidationError):
+            WatchlistRuleCreate(name="bad", keywords=[keyword])
+    assert WatchlistRuleCreate(name="ok", keywords=["node.js", "coding-agent"]).keywords == ["node.js", "coding-agent"]
+
+
+def test_webhook_urls_must_be_http_and_allowlisted(monkeypatch):
+    monkeypatch.setattr(settings, "WATCHLIST_WEBHOOK_URL", "https://alerts.internal/hook")
+    monkeypatch.setattr(settings, "WATCHLIST_WEBHOOK_ALLOWED_HOSTS", ["hooks.slack.com"])
+    for url in ["file:///etc/passwd", "gopher://hooks.slack.com/", "http://169.254.169.254/latest/meta-data/",
+                "https://hooks.slack.com@10.0.0.1/", "https://alerts.internal/other"]:
+        with pytest.raises(ValidationError):
+            WatchlistRuleCreate(name="bad", keywords=["agent"], webhook_url=url)
+    for url in ["https://HOOKS.slack.com/services/T0/B0", "https://alerts.internal/hook"]:
+        assert WatchlistRuleCreate(name="ok", keywords=["agent"], webhook_url=url).webhook_url == url
+    assert WatchlistRuleCreate(name="default", keywords=["agent"], webhook_url="").webhook_url is None
+
+
+def test_rule_left_without_conditions_matches_nothing():
+    # Stored before keywords were validated: compiling must not widen it to "everything"
+    legacy = Rule.from_model(WatchlistRuleModel(id=1, name="agents (zh)", keywords=["智能体"]))
+    narrowed = Rule.from_model(WatchlistRuleModel(id=2, name="c++ tools", keywords=["C++"], min_score=10))
+    empty = Rule(3, "nothing")
+    index = RuleIndex([legacy, narrowed, empty])
+
+    article = subject(title="智能体 C++ toolkit")
+    assert not any(rule.matches(article) for rule in (legacy, narrowed, empty))
+    assert index.candidates(article) == [] and len(index) == 0
+
+
+def test_index_only_returns_plausible_rules():
+    rules = [Rule(i, f"kw {i}", keywords=((f"word{i}",),)) for i in range(10_000)]
+    rules += [Rule(10_000 + i, f"tag {i}", tags=frozenset({f"tag{i}"})) for i in range(5_000)]
+    rules.append(Rule(99_999, "anything scoring 90+", min_score=90))
+    index = RuleIndex(rules)
+
+    article = subject(title="word7 and word42", tags={"tag3"}, score=95)
+    assert sorted(r.id for r in index.candidates(article)) == [7, 42, 10_003, 99_999]
+    assert sorted(r.id for r in index.match(article)) == [7, 42, 10_003, 99_999]
+
+
+def test_record_matches_notifies_once_per_rule_and_article(db):
+    article = ArticleModel(title="Agent kit", url="https://a.dev/", source="Hacker News", source_id="1",
+                           analysis_category="DevTool", analysis_score=88, platforms_count=2)
+    db.add(article)
+    db.flush()
+    db.add_all([
+        ArticleSourceModel(article_id=article.id, source="Hacker News", source_id="1"),
+        ArticleSourceModel(article_id=article.id, source="Product Hunt", source_id="agent-kit"),
+        WatchlistRuleModel(name="devtools", categories=["DevTool"], min_score=81, min_platforms=2),
+        WatchlistRuleModel(name="on PH", sources=["product hunt"], keywords=["agent"], webhook_url="http://hook.local/"),
+        WatchlistRuleModel(name="disabled", keywords=["agent"], enabled=False),
+    ])
+    db.commit()
+
+    watchlists = Watchlists()
+    assert watchlists.record_matches(db, [article.id]) == 2
+    watchlists.record_matches(db, [article.id])  # seen again: no duplicate notification
+    rows = db.query(NotificationModel).order_by(NotificationModel.rule_id).all()
+    assert [(n.rule_id, n.webhook_url) for n in rows] == [(1, None), (2, "http://hook.local/")]
+
+
+def test_min_heat_rules_are_checked_again_after_the_heat_job(db):
+    article = ArticleModel(title="Agent kit", url="https://a.dev/", source="Hacker News", source_id="1")
+    db.add(article)
+    db.add_all([
+        WatchlistRuleModel(name="hot", min_heat=60),
+        WatchlistRuleModel(name="agents", keywords=["agent"]),
+    ])
+    db.commit()
+    watchlists = Watchlists()
+    assert watchlists.record_matches(db, [article.id]) == 1  # heat is still NULL at ingest
+
+    before = current_change_seq(db)
+    article.heat_score = 75.0
+    mark_changed(db, article)
+    db.commit()
+    assert watchlists.record_heat_matches(db, before) == 1
+    assert sorted(n.rule_id for n in db.query(NotificationModel)) == [1, 2]
+    assert watchlists.record_heat_matches(db, current_change_seq(db)) == 0
+
+
+@pytest.mark.asyncio
+async def test_deliver_pending_batches_per_webhook_and_retries_failures(db, monkeypatch):
+    monkeypatch.setattr(settings, "WATCHLIST_WEBHOOK_ALLOWED_HOSTS", ["ok.local", "down.local"])
+    article = ArticleModel(title="Agent kit", url="https://a.dev/", source="Hacker News", source_id="1")
+    db.add(article)
+    db.add_all([WatchlistRuleModel(name=f"rule {i}", keywords=["agent"]) for i in range(5)])
+    db.flush()
+    db.add_all([
+        NotificationModel(rule_id=1, article_id=article.id, webhook_url="http://ok.local/"),
+        NotificationModel(rule_id=2, article_id=article.id, webhook_url="http://ok.local/"),
+        NotificationModel(rule_id=3, article_id=article.id, webhook_url="http://down.local/"),
+        NotificationModel(rule_id=4, article_id=article.id, webhook_url=None),
+        # Saved straight into the table, bypassing the schema: must never be called
+        NotificationModel(rule_id=5, article_id=article.id, webhook_url="http://169.254.169.254/latest/"),
+    ])
+    db.commit()
+
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append((request.url.host, json.loads(request.content)))
+        return httpx.Response(200 if request.url.host == "ok.local" else 500)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        assert await deliver_pending(db, client) == 2
+        assert [(host, len(body["matches"])) for host, body in requests] == [("ok.local", 2), ("down.local", 1)]
+        assert requests[0][1]["matches"][0]["article"]["url"] == "https://a.dev/"
+
+        # Only the failed one is retried, until WATCHLIST_DELIVERY_ATTEMPTS is used up
+        requests.clear()
+        for _ in range(5):
+            await deliver_pending(db, client)
+        assert [host for host, _ in requests] == ["down.local", "down.local"]
+
+    failed = db.get(NotificationModel, 3)
+    assert failed.delivered_at is None and failed.attempts == 3 and failed.last_error == "HTTP 500"
+    assert db.get(NotificationModel, 4).attempts == 0
+    blocked = db.get(NotificationModel, 5)
+    assert blocked.delivered_at is None and blocked.attempts == 3 and blocked.last_error == "webhook host not allowed"
@@ -3,16 +3,17 @@
 import { useEffect, useState, useCallback, useRef } from "react";
 import Link from "next/link";
 import { useParams } from "next/navigation";
-import { Article, DeepSeekEvaluation } from "@/types";
+import { Article, DeepSeekEvaluation, RelatedArticle } from "@/types";
+import { apiFetch } from "@/lib/api";
 import ReactMarkdown from "react-markdown";
 import remarkGfm from "remark-gfm";
 
-const API_BASE = "http://127.0.0.1:8000/api/v1";
 
 export default function DetailPage() {
   const params = useParams<{ id: string }>();
   const articleId = Number(params.id);
   const [article, setArticle] = useState<Article | null>(null);
+  const [related, setRelated] = useState<RelatedArticle[]>([]);
   const [loading, setLoading] = useState(true);
   const [evaluating, setEvaluating] = useState(false);
   const [streamingText, setStreamingText] = useState("");
@@ -21,11 +22,12 @@ export default function DetailPage() {
   const fetchDetail = useCallback(async () => {
     try {
       setLoading(true);
-      const res = await fetch(`${API_BASE}/feed`);
+      const res = await apiFetch(`/articles/${articleId}`);
       if (!res.ok) return;
-      const data: Article[] = await res.json();
-      const found = data.find(a => a.id === articleId);
-      if (found) setArticle(found);
+      const found: Article = await res.json();
+      setArticle(found);
+      const relatedRes = await apiFetch(`/articles/${articleId}/related?k=5`);
+      if (relatedRes.ok) setRelated(await relatedRes.json());
     } finally {
       setLoading(false);
     }
@@ -55,7 +57,7 @@ export default function DetailPage() {
     if (!article) return;
     try {
       setEvaluating(true);
-      const res = await fetch(`${API_BASE}/articles/${article.id}/evaluate/full`, { method: "POST" });
+      const res = await apiFetch(`/articles/${article.id}/evaluate/full`, { method: "POST" });
       if (!res.ok) return;
       const evalResult: DeepSeekEvaluation = await res.json();
       const updated: Article = {
@@ -204,6 +206,24 @@ export default function DetailPage() {
             <p className="text-xs text-gray-500">No full evaluation yet.</p>
           )}
         </div>
+
+        <div className="border border-gray-800 bg-[#0c0c0c] p-6 space-y-3">
+          <h3 className="text-sm font-semibold text-gray-100 uppercase tracking-widest">Related products</h3>
+          {related.length > 0 ? (
+            <ul className="space-y-2 text-sm">
+              {related.map(r => (
+                <li key={r.id} className="flex items-center justify-between gap-3">
+                  <Link href={`/detail/${r.id}`} className="text-green-500 hover:text-green-300 underline">{r.title}</Link>
+                  <span className="text-[10px] text-gray-500 uppercase tracking-wider">
+                    {r.category ?? "--"} · {r.score ?? "--"} · sim {r.similarity.toFixed(2)}
+                  </span>
+                </li>
+              ))}
+            </ul>
+          ) : (
+            <p className="text-xs text-gray-500">No related products yet.</p>
+          )}
+        </div>
       </div>
     </main>
   );
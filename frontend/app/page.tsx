@@ -1,10 +1,19 @@
 "use client";
 
-import { useState, useEffect, useCallback } from "react";
-import { Article, DeepSeekEvaluation } from "@/types";
+import { useState, useEffect, useCallback, useRef } from "react";
+import { Article, DeepSeekEvaluation, FeedDelta } from "@/types";
+import { API_BASE, apiFetch } from "@/lib/api";
 import Link from "next/link";
 
-const API_BASE = "http://127.0.0.1:8000/api/v1";
+
+// Replace changed articles by id, append new ones, keep the feed's score ordering
+function mergeArticles(prev: Article[], changed: Article[]): Article[] {
+  const byId = new Map(prev.map(a => [a.id, a]));
+  changed.forEach(a => byId.set(a.id, a));
+  return Array.from(byId.values()).sort(
+    (a, b) => (b.analysis?.score ?? -1) - (a.analysis?.score ?? -1)
+  );
+}
 
 export default function Home() {
   const [articles, setArticles] = useState<Article[]>([]);
@@ -13,6 +22,8 @@ export default function Home() {
   const [evaluatingId, setEvaluatingId] = useState<number | null>(null);
   // Simple state for a "terminal typing" effect log
   const [logs, setLogs] = useState<string[]>(["> System initialized.", "> Awaiting command..."]);
+  // Change cursor of the data we hold; the delta API returns only what changed after it
+  const cursorRef = useRef(0);
 
   const addLog = useCallback((msg: string) => {
     setLogs(prev => [...prev.slice(-4), `> ${msg}`]);
@@ -22,9 +33,10 @@ export default function Home() {
     try {
       setLoading(true);
       addLog("Fetching intelligence feed...");
-      const res = await fetch(`${API_BASE}/feed`);
+      const res = await apiFetch(`/feed`);
       if (res.ok) {
         const data = await res.json();
+        cursorRef.current = Number(res.headers.get("X-Change-Cursor") ?? 0);
         setArticles(data);
         addLog(`Feed updated. ${data.length} items loaded.`);
       }
@@ -36,16 +48,31 @@ export default function Home() {
     }
   }, [addLog]);
 
+  const applyDelta = useCallback(async () => {
+    try {
+      const res = await apiFetch(`/feed/delta?since=${cursorRef.current}`);
+      if (!res.ok) return;
+      const delta: FeedDelta = await res.json();
+      cursorRef.current = Math.max(cursorRef.current, delta.cursor);
+      if (delta.articles.length > 0) {
+        setArticles(prev => mergeArticles(prev, delta.articles));
+        addLog(`Feed patched. ${delta.articles.length} items changed.`);
+      }
+    } catch (error) {
+      console.error("Failed to fetch feed delta", error);
+    }
+  }, [addLog]);
+
   const triggerIngest = async () => {
     try {
       setIngesting(true);
       addLog("Initiating deep scan (Sources: HN, PH)...");
-      const res = await fetch(`${API_BASE}/ingest?limit=5`, {
+      const res = await apiFetch(`/ingest?limit=5`, {
         method: "POST",
       });
       if (res.ok) {
         addLog("Scan complete. Analyzing data...");
-        await fetchFeed();
+        await applyDelta();
       } else {
         addLog("Scan failed.");
       }
@@ -58,15 +85,28 @@ export default function Home() {
   };
 
   useEffect(() => {
-    fetchFeed();
-  }, [fetchFeed]);
+    let source: EventSource | null = null;
+    let closed = false;
+    // Full load once, then follow server-sent change events with deltas
+    fetchFeed().then(() => {
+      if (closed) return;
+      source = new EventSource(`${API_BASE}/feed/stream?since=${cursorRef.current}`);
+      source.addEventListener("change", () => {
+        applyDelta();
+      });
+    });
+    return () => {
+      closed = true;
+      source?.close();
+    };
+  }, [fetchFeed, applyDelta]);
 
   const triggerEvaluation = useCallback(
     async (articleId: number) => {
       try {
         setEvaluatingId(articleId);
         addLog(`Running DeepSeek evaluation for #${articleId}...`);
-        const res = await fetch(`${API_BASE}/articles/${articleId}/evaluate`, { method: "POST" });
+        const res = await apiFetch(`/articles/${articleId}/evaluate`, { method: "POST" });
         if (!res.ok) {
           addLog(`Evaluation failed for #${articleId}.`);
           return;
@@ -219,6 +259,11 @@ function TerminalRow({
                  {article.source}
                </span>
                <span className="text-[10px] opacity-50 mt-1">{new Date(article.publish_date).toLocaleDateString()}</span>
+               {article.heat_score != null && (
+                 <span className="text-[10px] text-red-500/80 mt-1" title="Popularity normalized across platforms (0-100)">
+                   HEAT {Math.round(article.heat_score)}
+                 </span>
+               )}
             </div>
 
             {/* Main Content (Col 6) */}
@@ -0,0 +1,16 @@
+export const API_BASE = "http://127.0.0.1:8000/api/v1";
+
+// Read-your-writes: write routes answer with X-Read-Primary-Until; echoing it makes the
+// API serve our reads from the primary until replicas have caught up.
+let readPrimaryUntil = 0;
+
+export async function apiFetch(path: string, init: RequestInit = {}): Promise<Response> {
+  const headers = new Headers(init.headers);
+  if (readPrimaryUntil > Date.now() / 1000) {
+    headers.set("X-Read-Primary-Until", String(readPrimaryUntil));
+  }
+  const res = await fetch(`${API_BASE}${path}`, { ...init, headers, credentials: "include" });
+  const until = Number(res.headers.get("X-Read-Primary-Until"));
+  if (until) readPrimaryUntil = until;
+  return res;
+}
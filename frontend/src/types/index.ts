@@ -41,7 +41,22 @@ export interface Article {
   seen_count?: number;
   sources?: SourceRef[];
   platforms_count?: number;
+  heat_score?: number | null;
   analysis?: AIAnalysis;
   metrics_history?: MetricPoint[];
   evaluations?: DeepSeekEvaluation[];
 }
+
+export interface FeedDelta {
+  cursor: number;
+  articles: Article[];
+}
+
+export interface RelatedArticle {
+  id: number;
+  title: string;
+  url: string;
+  category?: string;
+  score?: number;
+  similarity: number;
+}
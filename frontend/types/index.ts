@@ -45,3 +45,17 @@ export interface Article {
   metrics_history?: MetricPoint[];
   evaluations?: DeepSeekEvaluation[];
 }
+
+export interface FeedDelta {
+  cursor: number;
+  articles: Article[];
+}
+
+export interface RelatedArticle {
+  id: number;
+  title: string;
+  url: string;
+  category?: string;
+  score?: number;
+  similarity: number;
+}
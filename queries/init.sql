@@ -10,28 +10,48 @@ CREATE TABLE IF NOT EXISTS articles (
     first_seen_at   TIMESTAMPTZ DEFAULT NOW(),
     last_seen_at    TIMESTAMPTZ DEFAULT NOW(),
     seen_count      INTEGER DEFAULT 1,
-    sources         JSONB DEFAULT '[]'::jsonb,
+    platforms_count INTEGER NOT NULL DEFAULT 1,
+    heat_score      DOUBLE PRECISION,
     analyzed_at     TIMESTAMPTZ,
     analysis_summary    TEXT,
     analysis_category   TEXT,
     analysis_score      INTEGER,
     analysis_reasoning  TEXT,
-    analysis_tags       JSONB
+    analysis_tags       JSONB,
+    analysis_model      TEXT,
+    analysis_prompt_version TEXT,
+    change_seq          BIGINT
 );
 
 CREATE INDEX IF NOT EXISTS idx_articles_analysis_score ON articles (analysis_score);
 CREATE INDEX IF NOT EXISTS idx_articles_last_seen ON articles (last_seen_at DESC);
+CREATE INDEX IF NOT EXISTS idx_articles_change_seq ON articles (change_seq);
 
 CREATE TABLE IF NOT EXISTS article_metrics (
     id              SERIAL PRIMARY KEY,
     article_id      INTEGER REFERENCES articles(id) ON DELETE CASCADE,
     recorded_at     TIMESTAMPTZ DEFAULT NOW(),
     metric_value    INTEGER DEFAULT 0,
-    rank            INTEGER
+    rank            INTEGER,
+    source          TEXT
 );
 
 CREATE INDEX IF NOT EXISTS idx_article_metrics_article_id ON article_metrics (article_id);
 CREATE INDEX IF NOT EXISTS idx_article_metrics_recorded_at ON article_metrics (recorded_at DESC);
+CREATE INDEX IF NOT EXISTS idx_article_metrics_source_recorded_at ON article_metrics (source, recorded_at);
+
+CREATE TABLE IF NOT EXISTS article_sources (
+    id              SERIAL PRIMARY KEY,
+    article_id      INTEGER NOT NULL REFERENCES articles(id) ON DELETE CASCADE,
+    source          TEXT NOT NULL,
+    source_id       TEXT NOT NULL,
+    first_seen      TIMESTAMP NOT NULL DEFAULT NOW(),
+    last_seen       TIMESTAMP NOT NULL DEFAULT NOW(),
+    last_metric     INTEGER,
+    CONSTRAINT uq_article_sources_article_source UNIQUE (article_id, source, source_id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_article_sources_source_source_id ON article_sources (source, source_id);
 
 CREATE TABLE IF NOT EXISTS article_evaluations (
     id              SERIAL PRIMARY KEY,
@@ -46,3 +66,45 @@ CREATE TABLE IF NOT EXISTS article_evaluations (
 );
 
 CREATE INDEX IF NOT EXISTS idx_article_evals_article_id ON article_evaluations (article_id);
+
+CREATE TABLE IF NOT EXISTS export_cursors (
+    name            TEXT NOT NULL,
+    dataset         TEXT NOT NULL,
+    last_until      TIMESTAMP NOT NULL,
+    last_change_seq BIGINT,
+    updated_at      TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (name, dataset)
+);
+
+CREATE TABLE IF NOT EXISTS watchlist_rules (
+    id              SERIAL PRIMARY KEY,
+    name            TEXT NOT NULL,
+    categories      JSONB NOT NULL DEFAULT '[]',
+    tags            JSONB NOT NULL DEFAULT '[]',
+    sources         JSONB NOT NULL DEFAULT '[]',
+    keywords        JSONB NOT NULL DEFAULT '[]',
+    min_score       INTEGER,
+    min_platforms   INTEGER,
+    min_heat        DOUBLE PRECISION,
+    webhook_url     TEXT,
+    enabled         BOOLEAN NOT NULL DEFAULT TRUE,
+    created_at      TIMESTAMP DEFAULT NOW(),
+    updated_at      TIMESTAMP DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS notifications (
+    id              SERIAL PRIMARY KEY,
+    rule_id         INTEGER NOT NULL REFERENCES watchlist_rules(id) ON DELETE CASCADE,
+    article_id      INTEGER NOT NULL REFERENCES articles(id) ON DELETE CASCADE,
+    created_at      TIMESTAMP DEFAULT NOW(),
+    webhook_url     TEXT,
+    delivered_at    TIMESTAMP,
+    attempts        INTEGER NOT NULL DEFAULT 0,
+    last_error      TEXT,
+    CONSTRAINT uq_notifications_rule_article UNIQUE (rule_id, article_id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_notifications_created_at ON notifications (created_at);
+-- Delivery queue: only undelivered notifications that have somewhere to go
+CREATE INDEX IF NOT EXISTS idx_notifications_pending ON notifications (id)
+    WHERE delivered_at IS NULL AND webhook_url IS NOT NULL;
@@ -0,0 +1,2 @@
+-- Record which analyzer produced articles.analysis_* ("local-triage" = provisional pre-score)
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS analysis_model TEXT;
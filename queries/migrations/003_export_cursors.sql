@@ -0,0 +1,8 @@
+-- Named cursors for incremental ("since last export") bulk exports
+CREATE TABLE IF NOT EXISTS export_cursors (
+    name            TEXT NOT NULL,
+    dataset         TEXT NOT NULL,
+    last_until      TIMESTAMP NOT NULL,
+    updated_at      TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (name, dataset)
+);
@@ -0,0 +1,5 @@
+-- Change sequence behind GET /feed/delta and GET /feed/stream
+CREATE SEQUENCE IF NOT EXISTS article_change_seq;
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS change_seq BIGINT;
+UPDATE articles SET change_seq = nextval('article_change_seq') WHERE change_seq IS NULL;
+CREATE INDEX IF NOT EXISTS idx_articles_change_seq ON articles (change_seq);
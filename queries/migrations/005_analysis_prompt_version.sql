@@ -0,0 +1,2 @@
+-- Record which LLMAnalyzer.PROMPT_VERSION produced articles.analysis_* (NULL for provisional pre-scores)
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS analysis_prompt_version TEXT;
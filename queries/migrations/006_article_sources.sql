@@ -0,0 +1,51 @@
+-- Normalize articles.sources (JSON list) into article_sources, and keep a platforms_count column.
+-- Idempotent; safe to re-run. articles.sources is no longer read or written afterwards: once
+-- verified, drop it with `ALTER TABLE articles DROP COLUMN sources;`.
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS article_sources (
+    id              SERIAL PRIMARY KEY,
+    article_id      INTEGER NOT NULL REFERENCES articles(id) ON DELETE CASCADE,
+    source          TEXT NOT NULL,
+    source_id       TEXT NOT NULL,
+    first_seen      TIMESTAMP NOT NULL DEFAULT NOW(),
+    last_seen       TIMESTAMP NOT NULL DEFAULT NOW(),
+    last_metric     INTEGER,
+    CONSTRAINT uq_article_sources_article_source UNIQUE (article_id, source, source_id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_article_sources_source_source_id ON article_sources (source, source_id);
+
+-- One row per JSON entry, in list order; articles with an empty list get their primary source.
+-- Per-platform sighting times were never recorded, so the article's own timestamps are used.
+INSERT INTO article_sources (article_id, source, source_id, first_seen, last_seen)
+SELECT a.id, e.source, e.source_id, COALESCE(a.first_seen_at, NOW()), COALESCE(a.last_seen_at, NOW())
+FROM articles a
+CROSS JOIN LATERAL (
+    SELECT elem->>'source' AS source, elem->>'source_id' AS source_id, ord
+    FROM jsonb_array_elements(COALESCE(a.sources::jsonb, '[]'::jsonb)) WITH ORDINALITY AS t(elem, ord)
+    UNION ALL
+    SELECT a.source, a.source_id, 0
+    WHERE jsonb_array_length(COALESCE(a.sources::jsonb, '[]'::jsonb)) = 0
+) e
+WHERE e.source IS NOT NULL AND e.source_id IS NOT NULL
+ORDER BY a.id, e.ord
+ON CONFLICT (article_id, source, source_id) DO NOTHING;
+
+-- Latest metric of the primary listing
+UPDATE article_sources s
+SET last_metric = m.metric_value
+FROM articles a
+JOIN LATERAL (
+    SELECT metric_value FROM article_metrics
+    WHERE article_id = a.id ORDER BY recorded_at DESC, id DESC LIMIT 1
+) m ON TRUE
+WHERE s.article_id = a.id AND s.source = a.source AND s.source_id = a.source_id AND s.last_metric IS NULL;
+
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS platforms_count INTEGER NOT NULL DEFAULT 1;
+UPDATE articles a
+SET platforms_count = c.n
+FROM (SELECT article_id, COUNT(*) AS n FROM article_sources GROUP BY article_id) c
+WHERE c.article_id = a.id AND a.platforms_count <> c.n;
+
+COMMIT;
@@ -0,0 +1,20 @@
+-- Cross-source heat (see backend/app/services/heat.py). Idempotent; safe to re-run.
+BEGIN;
+
+-- Platform that reported each metric point
+ALTER TABLE article_metrics ADD COLUMN IF NOT EXISTS source TEXT;
+
+-- Older points were not attributed: credit them to the article's primary source.
+-- For articles merged across platforms this is approximate until the window rolls over.
+UPDATE article_metrics m
+SET source = a.source
+FROM articles a
+WHERE m.article_id = a.id
+  AND m.source IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_article_metrics_source_recorded_at ON article_metrics (source, recorded_at);
+
+-- Normalized 0-100 heat, filled by the heat job (NULL until then)
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS heat_score DOUBLE PRECISION;
+
+COMMIT;
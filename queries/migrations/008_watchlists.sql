@@ -0,0 +1,38 @@
+-- Watchlist alert rules and the notifications they produce (see backend/app/services/watchlist.py).
+-- Idempotent; safe to re-run.
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS watchlist_rules (
+    id              SERIAL PRIMARY KEY,
+    name            TEXT NOT NULL,
+    categories      JSONB NOT NULL DEFAULT '[]',
+    tags            JSONB NOT NULL DEFAULT '[]',
+    sources         JSONB NOT NULL DEFAULT '[]',
+    keywords        JSONB NOT NULL DEFAULT '[]',
+    min_score       INTEGER,
+    min_platforms   INTEGER,
+    min_heat        DOUBLE PRECISION,
+    webhook_url     TEXT,
+    enabled         BOOLEAN NOT NULL DEFAULT TRUE,
+    created_at      TIMESTAMP DEFAULT NOW(),
+    updated_at      TIMESTAMP DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS notifications (
+    id              SERIAL PRIMARY KEY,
+    rule_id         INTEGER NOT NULL REFERENCES watchlist_rules(id) ON DELETE CASCADE,
+    article_id      INTEGER NOT NULL REFERENCES articles(id) ON DELETE CASCADE,
+    created_at      TIMESTAMP DEFAULT NOW(),
+    webhook_url     TEXT,
+    delivered_at    TIMESTAMP,
+    attempts        INTEGER NOT NULL DEFAULT 0,
+    last_error      TEXT,
+    CONSTRAINT uq_notifications_rule_article UNIQUE (rule_id, article_id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_notifications_created_at ON notifications (created_at);
+-- Delivery queue: only undelivered notifications that have somewhere to go
+CREATE INDEX IF NOT EXISTS idx_notifications_pending ON notifications (id)
+    WHERE delivered_at IS NULL AND webhook_url IS NOT NULL;
+
+COMMIT;
@@ -0,0 +1,5 @@
+-- Change stamps now come from pg_current_xact_id() (offset by 2^40) instead of a
+-- sequence, so the delta cursor can be capped at pg_snapshot_xmin and never skips a
+-- transaction that commits late (see backend/app/services/changes.py).
+-- Existing stamps are below 2^40 and stay valid as cursors. Idempotent; safe to re-run.
+DROP SEQUENCE IF EXISTS article_change_seq;
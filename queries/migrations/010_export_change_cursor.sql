@@ -0,0 +1,4 @@
+-- Incremental article exports follow the change cursor instead of last_seen_at
+-- (see backend/app/services/exporter.py). An existing "articles" cursor starts
+-- over once, with a full export. Idempotent; safe to re-run.
+ALTER TABLE export_cursors ADD COLUMN IF NOT EXISTS last_change_seq BIGINT;
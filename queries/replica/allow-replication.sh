@@ -0,0 +1,4 @@
+#!/bin/bash
+# Allow the db-replica container to stream WAL from the primary (see docker-compose.yml)
+set -e
+echo "host replication all all scram-sha-256" >> "$PGDATA/pg_hba.conf"